@@ -1,11 +1,18 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+from datetime import datetime
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
 from typing import Optional
 
-from app.services.approvals_store import set_approval, get_all_approvals
+from app.services.approvals_store import (
+    get_all_approvals_async,
+    set_approval_async,
+    set_approvals_bulk_async,
+)
 
 router = APIRouter(prefix="/approvals", tags=["approvals"])
 
+VALID_STATUSES = {"approved", "rejected", "proposed"}
+
 
 class ApprovalSetRequest(BaseModel):
     draft_id: str
@@ -13,12 +20,17 @@ class ApprovalSetRequest(BaseModel):
     note: Optional[str] = None
 
 
+class ApprovalBulkRequest(BaseModel):
+    decisions: list[ApprovalSetRequest] = Field(default_factory=list)
+    decided_by: str = "local"
+
+
 @router.post("/set")
-def set_approval_endpoint(payload: ApprovalSetRequest):
-    if payload.status not in {"approved", "rejected", "proposed"}:
+async def set_approval_endpoint(payload: ApprovalSetRequest):
+    if payload.status not in VALID_STATUSES:
         return {"error": "Invalid status"}
 
-    set_approval(
+    await set_approval_async(
         draft_id=payload.draft_id,
         status=payload.status,
         note=payload.note,
@@ -27,6 +39,20 @@ def set_approval_endpoint(payload: ApprovalSetRequest):
     return {"status": "ok"}
 
 
+@router.post("/bulk")
+async def set_approvals_bulk_endpoint(payload: ApprovalBulkRequest):
+    # All or nothing: one bad status rejects the batch before the database is touched.
+    invalid = sorted({d.draft_id for d in payload.decisions if d.status not in VALID_STATUSES})
+    if invalid:
+        raise HTTPException(status_code=422, detail=f"Invalid status for: {', '.join(invalid)}")
+
+    applied = await set_approvals_bulk_async(
+        [(d.draft_id, d.status, d.note) for d in payload.decisions],
+        decided_by=payload.decided_by,
+    )
+
+    return {"status": "ok", "applied": applied}
+
 @router.get("/list")
-def list_approvals():
-    return get_all_approvals()
\ No newline at end of file
+async def list_approvals(status: Optional[str] = None, decided_since: Optional[datetime] = None):
+    return await get_all_approvals_async(status=status, decided_since=decided_since)
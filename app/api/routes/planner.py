@@ -1,32 +1,407 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Body
+import asyncio
+import logging
+import os
+import time
+
+import redis
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Any
+from starlette.types import Receive, Scope, Send
+from typing import Any, Callable, Iterable, Iterator
 
+from app.api.routes.approvals import VALID_STATUSES
 from app.core.config_loader import ConfigLoader
+from app.core.db import DATABASE_URL
+from app.core.instrumentation import Trace, count, profiled, profiling_requested, use_trace
+from app.core.serialization import PlannerJSONResponse, dumps
 from app.models.planner import PlannerResult
-from app.services.planner import run_planner
+from app.services.cadence_scheduler import resolve_schedule_options
+from app.services.plan_store import iter_and_store_plan, list_plans_async, load_plan_async, store_plan
+from app.services.planner import iter_planner_events, run_planner
+from app.core.redis_client import get_redis
+from app.services.approvals_store import threadsafe_approval_lookup
+from app.services.planner_cache import get_planner_cache
+from app.services.planner_executor import PlannerBusy, get_planner_executor
+from app.services.planner_jobs import enqueue_job, get_job, queue_metrics
+from app.services.planner_config import get_planner_config
+from app.services.replanner import iter_and_store, replan, run_and_store
+from app.services.slot_calendar import local_now
+
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/planner", tags=["planner"])
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# streamed lines are sent in chunks of this size, or sooner once the oldest line has waited this long
+STREAM_CHUNK_BYTES = int(os.getenv("PLANNER_STREAM_CHUNK_BYTES", "65536"))
+STREAM_FLUSH_MS = float(os.getenv("PLANNER_STREAM_FLUSH_MS", "50"))
+
 
 class RunPlannerRequest(BaseModel):
     items: list[dict[str, Any]] = Field(default_factory=list)
     campaigns: list[dict[str, Any]] = Field(default_factory=list)
     objectives: list[dict[str, Any]] = Field(default_factory=list)
+    # default to planner_settings_v1 (modes.default / planning.default_horizon_days)
+    mode: str | None = None
+    horizon_days: int | None = Field(default=None, gt=0)
+    # run pass 1 on the process pool (large catalogs); the plan is the same either way
+    parallel: bool = False
+
+
+class ReplanRequest(BaseModel):
+    plan_id: str
+    # new items, or new versions of existing items (matched by id)
+    upsert_items: list[dict[str, Any]] = Field(default_factory=list)
+    remove_item_ids: list[str] = Field(default_factory=list)
+    # draft_id -> status, on top of the approvals store (which is read again on every re-plan)
+    approvals: dict[str, str] = Field(default_factory=dict)
+
+
+def _validate_schedule_options(payload: RunPlannerRequest, planner_config) -> None:
+    try:
+        resolve_schedule_options(planner_config, payload.mode, payload.horizon_days)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+def _ndjson_lines(events: Iterator[tuple[str, Any]], extra_metadata: dict[str, Any]) -> Iterator[bytes]:
+    for kind, payload in events:
+        if kind == "metadata":
+            payload = {**payload, **extra_metadata}
+        yield b'{"type":"' + kind.encode() + b'","data":' + dumps(payload) + b"}\n"
+
+
+def _chunked(lines: Iterator[bytes]) -> Iterator[bytes]:
+    # one executor hop per chunk rather than per line
+    buffer: list[bytes] = []
+    size = 0
+    first = 0.0
+    for line in lines:
+        if not buffer:
+            first = time.perf_counter()
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_BYTES or (time.perf_counter() - first) * 1000 >= STREAM_FLUSH_MS:
+            yield b"".join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+class _HeldStreamingResponse(StreamingResponse):
+    """Gives the executor slot back once the response is done, however it ends."""
+
+    def __init__(self, content: Any, release: Callable[[], None], **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+def _busy(exc: PlannerBusy) -> HTTPException:
+    return HTTPException(status_code=exc.status_code, detail=exc.detail, headers={"Retry-After": str(exc.retry_after)})
 
 
 @router.post("/run", response_model=PlannerResult)
-def run_planner_endpoint(
+async def run_planner_endpoint(
+    request: Request,
     payload: RunPlannerRequest = Body(default_factory=RunPlannerRequest),
+    stream: bool = Query(False, description="Stream NDJSON events instead of one JSON document"),
+    include_blocked: bool = Query(True, description="Streaming only: emit blocked candidates"),
+    include_breakdowns: bool = Query(True, description="Streaming only: emit score breakdowns"),
+    timings: bool = Query(False, description="Add per-phase timings and counters to the metadata"),
+) -> Response:
+    trace = Trace() if timings else None
+    # only honoured when PLANNER_DEBUG_PROFILING=1
+    profile = profiling_requested(request.headers)
+    executor = get_planner_executor()
+    # planner threads query approvals on this loop's async pool instead of blocking on a sync connection
+    approval_lookup = threadsafe_approval_lookup(asyncio.get_running_loop())
+
+    with use_trace(trace):
+        loader = ConfigLoader()
+        configs = await loader.load_all_async()
+        planner_config = get_planner_config(configs, loader.last_fingerprint)
+        _validate_schedule_options(payload, planner_config)
+
+        if stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+            run_kwargs = dict(
+                items=payload.items,
+                campaigns=payload.campaigns,
+                objectives=payload.objectives,
+                planner_config=planner_config,
+                include_blocked=include_blocked,
+                include_breakdowns=include_breakdowns,
+                mode=payload.mode,
+                horizon_days=payload.horizon_days,
+                approval_lookup=approval_lookup,
+                trace=trace,
+                parallel=payload.parallel,
+            )
+            client = get_redis()
+            # streamed plans are kept like computed ones: state for /planner/replan and the plan store
+            events = (
+                iter_and_store(client, keep_going=True, **run_kwargs)
+                if client is not None
+                else iter_planner_events(**run_kwargs)
+            )
+            events = iter_and_store_plan(
+                events, planner_config.fingerprint, complete=include_blocked and include_breakdowns
+            )
+            content = executor.iterate(_chunked(_ndjson_lines(events, {"config_cache": loader.last_stats})))
+            # nothing above has run any of the pipeline; take the slot last so that
+            # only the response can hold it
+            try:
+                release = executor.hold()
+            except PlannerBusy as exc:
+                raise _busy(exc) from None
+            try:
+                # produced on the executor pool after this handler returns, holding the
+                # slot until the response closes (finished, failed or disconnected)
+                return _HeldStreamingResponse(content, release, media_type=NDJSON_MEDIA_TYPE)
+            except BaseException:
+                release()
+                raise
+
+        cache = get_planner_cache()
+        key = None
+        token = None
+        result = None
+        cache_hit = False
+        if cache is not None:
+            try:
+                # plans depend on the local calendar day, not the time of day
+                ref_date = local_now(planner_config.cadence.timezone).date()
+                # parallel doesn't change the plan, so it shares the serial run's entry
+                key = await asyncio.to_thread(
+                    cache.make_key, payload.model_dump(exclude={"parallel"}), loader.last_fingerprint, ref_date
+                )
+                # hits, and waits on an identical request already computing, take no executor slot
+                result = await asyncio.to_thread(cache.peek, key)
+                if result is None:
+                    token = await asyncio.to_thread(cache.acquire, key)
+                    if token is None:
+                        result = await cache.wait(key)
+                cache_hit = result is not None
+            except redis.RedisError:
+                logger.warning("Planner result cache unavailable; computing without it", exc_info=True)
+                key = None
+
+        profile_out: dict[str, Any] = {}
+        if result is None:
+            try:
+                result, profile_out = await executor.run(
+                    _compute_planner_result, payload, planner_config, cache, key, trace, approval_lookup, profile
+                )
+            except PlannerBusy as exc:
+                raise _busy(exc) from None
+            finally:
+                if token is not None:
+                    await asyncio.to_thread(_release_cache_lock, cache, key, token)
+
+        result.metadata["config_cache"] = loader.last_stats
+        result.metadata["result_cache"] = {"enabled": cache is not None, "hit": cache_hit}
+        if cache is not None:
+            count("result_cache_hits" if cache_hit else "result_cache_misses")
+    # cached results carry the timings of the run that computed them
+    result.metadata.pop("timings", None)
+    if trace is not None:
+        result.metadata["timings"] = trace.summary()
+    if profile_out:
+        result.metadata["profile"] = profile_out
+    # returning a Response skips response_model re-validation; the model stays for the docs
+    return await asyncio.to_thread(PlannerJSONResponse, result, request.headers.get("accept-encoding"))
+
+
+def _compute_planner_result(
+    payload: RunPlannerRequest,
+    planner_config,
+    cache,
+    key: str | None,
+    trace: Trace | None,
+    approval_lookup: Callable[[Iterable[str]], dict[str, str]],
+    profile: bool,
+) -> tuple[PlannerResult, dict[str, Any]]:
+    """Runs on the planner executor: (result, profile stats). Puts the result in the
+    cache under ``key``, when given."""
+
+    def plan() -> PlannerResult:
+        client = get_redis()
+        if client is not None:
+            # keep the plan's state so /planner/replan can build on it
+            try:
+                return run_and_store(
+                    client,
+                    items=payload.items,
+                    campaigns=payload.campaigns,
+                    objectives=payload.objectives,
+                    planner_config=planner_config,
+                    mode=payload.mode,
+                    horizon_days=payload.horizon_days,
+                    approval_lookup=approval_lookup,
+                    trace=trace,
+                    parallel=payload.parallel,
+                )
+            except redis.RedisError:
+                logger.warning("Could not store plan state; /planner/replan will not find this plan", exc_info=True)
+        return run_planner(
+            items=payload.items,
+            campaigns=payload.campaigns,
+            objectives=payload.objectives,
+            planner_config=planner_config,
+            mode=payload.mode,
+            horizon_days=payload.horizon_days,
+            approval_lookup=approval_lookup,
+            trace=trace,
+            parallel=payload.parallel,
+        )
+
+    with profiled(profile) as profile_out:
+        result = plan()
+        store_plan(result, planner_config.fingerprint)
+        if key is not None:
+            try:
+                cache.store(key, result)
+            except redis.RedisError:
+                logger.warning("Could not cache planner result", exc_info=True)
+    return result, profile_out
+
+
+def _release_cache_lock(cache, key: str, token: str) -> None:
+    try:
+        cache.release(key, token)
+    except redis.RedisError:
+        # the lock expires after PLANNER_CACHE_LOCK_SECONDS
+        logger.warning("Could not release planner cache lock", exc_info=True)
+
+
+@router.post("/replan", response_model=PlannerResult)
+async def replan_endpoint(
+    request: Request,
+    payload: ReplanRequest,
+    timings: bool = Query(False, description="Add per-phase timings and counters to the metadata"),
+) -> Response:
+    invalid = sorted({s for s in payload.approvals.values() if s not in VALID_STATUSES})
+    if invalid:
+        raise HTTPException(status_code=422, detail=f"Invalid approval status: {', '.join(invalid)}")
+    client = get_redis()
+    if client is None:
+        raise HTTPException(status_code=503, detail="Re-planning unavailable: REDIS_URL not set")
+
+    trace = Trace() if timings else None
+    # stored approvals are read again on the loop's async pool, as in /planner/run
+    approval_lookup = threadsafe_approval_lookup(asyncio.get_running_loop())
+    loader = ConfigLoader()
+    with use_trace(trace):
+        configs = await loader.load_all_async()
+        planner_config = get_planner_config(configs, loader.last_fingerprint)
+        try:
+            result = await get_planner_executor().run(
+                _replan_and_store, client, payload, planner_config, trace, approval_lookup
+            )
+        except PlannerBusy as exc:
+            raise _busy(exc) from None
+        except LookupError:
+            raise HTTPException(status_code=404, detail="Unknown or expired plan_id")
+    result.metadata["config_cache"] = loader.last_stats
+    if trace is not None:
+        result.metadata["timings"] = trace.summary()
+    return await asyncio.to_thread(PlannerJSONResponse, result, request.headers.get("accept-encoding"))
+
+
+def _replan_and_store(
+    client,
+    payload: ReplanRequest,
+    planner_config,
+    trace: Trace | None,
+    approval_lookup: Callable[[Iterable[str]], dict[str, str]],
 ) -> PlannerResult:
-    configs = ConfigLoader().load_all()
-    return run_planner(
-        items=payload.items,
-        campaigns=payload.campaigns,
-        objectives=payload.objectives,
-        configs=configs,
+    """Runs on the planner executor."""
+    result = replan(
+        client,
+        payload.plan_id,
+        planner_config=planner_config,
+        upsert_items=payload.upsert_items,
+        remove_item_ids=payload.remove_item_ids,
+        approvals=payload.approvals,
+        approval_lookup=approval_lookup,
+        trace=trace,
     )
+    store_plan(result, planner_config.fingerprint)
+    return result
+
+
+def _require_plan_store() -> None:
+    if not DATABASE_URL:
+        raise HTTPException(status_code=503, detail="Plan store unavailable: DATABASE_URL not set")
+
+
+@router.get("/plans")
+async def list_stored_plans(limit: int = Query(20, gt=0, le=500)) -> list[dict[str, Any]]:
+    _require_plan_store()
+    return await list_plans_async(limit)
+
+
+@router.get("/plans/latest", response_model=PlannerResult)
+async def get_latest_plan(
+    request: Request,
+    include_candidates: bool = Query(True, description="Also return every draft candidate"),
+) -> Response:
+    return await _stored_plan_response(request, None, include_candidates)
+
+
+@router.get("/plans/{plan_id}", response_model=PlannerResult)
+async def get_stored_plan(
+    request: Request,
+    plan_id: str,
+    include_candidates: bool = Query(True, description="Also return every draft candidate"),
+) -> Response:
+    return await _stored_plan_response(request, plan_id, include_candidates)
+
+
+async def _stored_plan_response(request: Request, plan_id: str | None, include_candidates: bool) -> Response:
+    _require_plan_store()
+    result = await load_plan_async(plan_id, include_candidates)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No stored plan" if plan_id is None else "Unknown plan_id")
+    return await asyncio.to_thread(PlannerJSONResponse, result, request.headers.get("accept-encoding"))
+
+
+def _jobs_redis():
+    client = get_redis()
+    if client is None:
+        raise HTTPException(status_code=503, detail="Job queue unavailable: REDIS_URL not set")
+    return client
+
+
+@router.post("/jobs", status_code=202)
+def enqueue_planner_job(
+    payload: RunPlannerRequest = Body(default_factory=RunPlannerRequest),
+) -> dict[str, Any]:
+    loader = ConfigLoader()
+    configs = loader.load_all()
+    _validate_schedule_options(payload, get_planner_config(configs, loader.last_fingerprint))
+    job_id = enqueue_job(_jobs_redis(), payload.model_dump())
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/jobs/metrics")
+def planner_job_metrics() -> dict[str, Any]:
+    return queue_metrics(_jobs_redis())
+
 
+@router.get("/jobs/{job_id}")
+def get_planner_job(job_id: str) -> dict[str, Any]:
+    job = get_job(_jobs_redis(), job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job_id")
+    return job
@@ -1,22 +1,100 @@
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+from datetime import date, datetime, timezone
 import os
+import threading
 import psycopg
+from psycopg import sql
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# seconds a caller waits for a free connection before PoolTimeout
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# seconds an idle connection above min_size is kept before being closed
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+
+# stored plans: each table is range-partitioned by plan_date, one partition per month
+PLAN_TABLES = ("plans", "plan_candidates", "plan_weekly_entries", "plan_approval_queue", "plan_export_jobs")
+# serializes schema changes between processes: concurrent CREATE ... IF NOT EXISTS can still collide
+_SCHEMA_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('socialops_schema'));"
+
+_pool: ConnectionPool | None = None
+_async_pool: AsyncConnectionPool | None = None
+
+
+def _pool_kwargs() -> dict:
+    return {
+        "min_size": DB_POOL_MIN_SIZE,
+        "max_size": DB_POOL_MAX_SIZE,
+        "timeout": DB_POOL_TIMEOUT,
+        "max_idle": DB_POOL_MAX_IDLE,
+        "open": False,
+    }
+
+
+def open_pool() -> None:
+    global _pool
+    if _pool is None and DATABASE_URL:
+        _pool = ConnectionPool(DATABASE_URL, name="socialops", **_pool_kwargs())
+        _pool.open()
+
+
+def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+async def open_async_pool() -> None:
+    global _async_pool
+    if _async_pool is None and DATABASE_URL:
+        _async_pool = AsyncConnectionPool(DATABASE_URL, name="socialops-async", **_pool_kwargs())
+        await _async_pool.open()
+
+
+async def close_async_pool() -> None:
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+
 
 @contextmanager
 def get_conn():
     if not DATABASE_URL:
         raise RuntimeError("DATABASE_URL not set")
 
+    if _pool is not None:
+        with _pool.connection() as conn:
+            yield conn
+        return
+
+    # no pool (scripts, worker before startup): one-off connection
     with psycopg.connect(DATABASE_URL) as conn:
         yield conn
 
 
+@asynccontextmanager
+async def get_async_conn():
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL not set")
+
+    if _async_pool is not None:
+        async with _async_pool.connection() as conn:
+            yield conn
+        return
+
+    async with await psycopg.AsyncConnection.connect(DATABASE_URL) as conn:
+        yield conn
+
+
 def ensure_tables():
     with get_conn() as conn:
         with conn.cursor() as cur:
+            cur.execute(_SCHEMA_LOCK_SQL)
             cur.execute(
                 """
                 CREATE TABLE IF NOT EXISTS approvals (
@@ -28,4 +106,132 @@ def ensure_tables():
                 );
                 """
             )
-        conn.commit()
\ No newline at end of file
+            cur.execute(
+                """
+                CREATE INDEX IF NOT EXISTS approvals_status_decided_at_idx
+                    ON approvals (status, decided_at DESC);
+                """
+            )
+            for statement in _PLAN_TABLES_DDL:
+                cur.execute(statement)
+        conn.commit()
+    today = datetime.now(timezone.utc).date()
+    ensure_plan_partitions(today)
+    ensure_plan_partitions(_next_month(today))
+
+
+# Child rows keep the plan's order in `position`; every read is
+# `WHERE plan_date = ... AND plan_id = ...`, so it touches one partition and one index range.
+# Breakdowns and destinations are json (kept verbatim, no jsonb parse on the bulk path).
+_PLAN_TABLES_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS plans (
+        plan_id TEXT NOT NULL,
+        plan_date DATE NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        parent_plan_id TEXT,
+        mode TEXT,
+        horizon_days INT,
+        timezone TEXT NOT NULL,
+        config_fingerprint TEXT,
+        scheduled_slots INT NOT NULL,
+        total_candidates INT NOT NULL,
+        metadata JSONB NOT NULL,
+        PRIMARY KEY (plan_date, plan_id)
+    ) PARTITION BY RANGE (plan_date);
+    """,
+    # latest plan and plan history
+    "CREATE INDEX IF NOT EXISTS plans_latest_idx ON plans (plan_date DESC, created_at DESC);",
+    "CREATE INDEX IF NOT EXISTS plans_plan_id_idx ON plans (plan_id);",
+    """
+    CREATE TABLE IF NOT EXISTS plan_candidates (
+        plan_id TEXT NOT NULL,
+        plan_date DATE NOT NULL,
+        position INT NOT NULL,
+        item_id TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        format TEXT NOT NULL,
+        blocked BOOLEAN NOT NULL,
+        block_reason TEXT,
+        score DOUBLE PRECISION,
+        score_breakdown JSON NOT NULL,
+        suggested_schedule_datetime TIMESTAMPTZ,
+        dependency_warnings TEXT[] NOT NULL
+    ) PARTITION BY RANGE (plan_date);
+    """,
+    "CREATE INDEX IF NOT EXISTS plan_candidates_plan_idx ON plan_candidates (plan_id, position);",
+    """
+    CREATE TABLE IF NOT EXISTS plan_weekly_entries (
+        plan_id TEXT NOT NULL,
+        plan_date DATE NOT NULL,
+        position INT NOT NULL,
+        draft_id TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        scheduled_datetime TIMESTAMPTZ NOT NULL
+    ) PARTITION BY RANGE (plan_date);
+    """,
+    "CREATE INDEX IF NOT EXISTS plan_weekly_entries_plan_idx ON plan_weekly_entries (plan_id, position);",
+    """
+    CREATE TABLE IF NOT EXISTS plan_approval_queue (
+        plan_id TEXT NOT NULL,
+        plan_date DATE NOT NULL,
+        position INT NOT NULL,
+        draft_id TEXT NOT NULL,
+        item_id TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        scheduled_datetime TIMESTAMPTZ,
+        status TEXT NOT NULL
+    ) PARTITION BY RANGE (plan_date);
+    """,
+    "CREATE INDEX IF NOT EXISTS plan_approval_queue_plan_idx ON plan_approval_queue (plan_id, position);",
+    # dashboard: a plan's drafts still waiting on a decision
+    "CREATE INDEX IF NOT EXISTS plan_approval_queue_status_idx ON plan_approval_queue (plan_id, status);",
+    """
+    CREATE TABLE IF NOT EXISTS plan_export_jobs (
+        plan_id TEXT NOT NULL,
+        plan_date DATE NOT NULL,
+        position INT NOT NULL,
+        job_id TEXT NOT NULL,
+        item_id TEXT NOT NULL,
+        media_type TEXT NOT NULL,
+        ratio TEXT NOT NULL,
+        resolution TEXT NOT NULL,
+        specs TEXT[] NOT NULL,
+        destinations JSON NOT NULL,
+        needed_by TIMESTAMPTZ,
+        batch INT NOT NULL
+    ) PARTITION BY RANGE (plan_date);
+    """,
+    "CREATE INDEX IF NOT EXISTS plan_export_jobs_plan_idx ON plan_export_jobs (plan_id, position);",
+)
+
+# months whose partitions this process has created or seen
+_PARTITIONS: set[date] = set()
+_PARTITIONS_LOCK = threading.Lock()
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def ensure_plan_partitions(plan_date: date) -> None:
+    """Create the month partitions of the plan tables that hold ``plan_date``, if missing."""
+    month = plan_date.replace(day=1)
+    with _PARTITIONS_LOCK:
+        if month in _PARTITIONS:
+            return
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(_SCHEMA_LOCK_SQL)
+            for table in PLAN_TABLES:
+                cur.execute(
+                    sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM ({}) TO ({});").format(
+                        sql.Identifier(f"{table}_p{month:%Y%m}"),
+                        sql.Identifier(table),
+                        sql.Literal(month),
+                        sql.Literal(_next_month(month)),
+                    )
+                )
+        conn.commit()
+    with _PARTITIONS_LOCK:
+        _PARTITIONS.add(month)
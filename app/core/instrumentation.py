@@ -0,0 +1,235 @@
+"""Timing spans, counters and Prometheus text-format metrics.
+
+A ``Trace`` collects the spans and counters of one request or planner run; every
+span and count also feeds the process-wide metrics served on ``/metrics``. Code
+that cannot be handed a trace (ConfigLoader, approvals_store) uses the module
+level ``span``/``count``, which record into the trace activated with
+``use_trace`` on the current thread, if any.
+
+Metrics are kept in-process (no prometheus_client dependency); with several
+uvicorn workers each process exposes its own.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# cProfile capture via the X-Debug-Profile header is off unless this is set
+DEBUG_PROFILING = os.getenv("PLANNER_DEBUG_PROFILING", "0") == "1"
+PROFILE_HEADER = "x-debug-profile"
+PROFILE_TOP_N = int(os.getenv("PLANNER_PROFILE_TOP_N", "40"))
+
+_DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _labels_text(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._values: dict[tuple[tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self._values.items())
+        lines += [f"{self.name}{_labels_text(k)} {v:g}" for k, v in values]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = _DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values: dict[tuple[tuple[str, str], ...], list[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            values = [(k, list(counts), total) for k, (counts, total) in self._values.items()]
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_labels_text(key + (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(key)} {total:g}")
+            lines.append(f"{self.name}_count{_labels_text(key)} {cumulative}")
+        return lines
+
+
+class CallbackGauge:
+    """Gauge whose labelled values are read from ``fn()`` at render time."""
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], dict[tuple[tuple[str, str], ...], float]]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.fn = fn
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        lines += [f"{self.name}{_labels_text(k)} {v:g}" for k, v in self.fn().items()]
+        return lines
+
+
+SPAN_SECONDS = Histogram("planner_span_seconds", "Time spent per instrumented phase.")
+EVENTS = Counter("planner_events_total", "Instrumentation counters (rules evaluated, rescoring, cache hits).")
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route.")
+_REGISTRY: list[Any] = [SPAN_SECONDS, EVENTS, HTTP_REQUEST_SECONDS]
+
+
+def register_metric(metric: Any) -> None:
+    if all(m.name != metric.name for m in _REGISTRY):
+        _REGISTRY.append(metric)
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in _REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+class Trace:
+    """Spans and counters of one run. Repeated spans with the same name add up."""
+
+    def __init__(self) -> None:
+        self.spans: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        SPAN_SECONDS.observe(seconds, span=name)
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        if not amount:
+            return
+        EVENTS.inc(amount, event=name)
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def timed_iter(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Iterate, counting only the time spent producing items (not the consumer's)."""
+        iterator = iter(iterable)
+        elapsed = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    value = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - started
+                    return
+                elapsed += time.perf_counter() - started
+                yield value
+        finally:
+            self.add(name, elapsed)
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "spans_ms": {name: round(s * 1000, 3) for name, s in self.spans.items()},
+                "counters": dict(self.counters),
+            }
+
+
+_active: ContextVar[Trace | None] = ContextVar("planner_trace", default=None)
+
+
+@contextmanager
+def use_trace(trace: Trace | None) -> Iterator[Trace | None]:
+    token = _active.set(trace)
+    try:
+        yield trace
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        trace = _active.get()
+        if trace is not None:
+            trace.add(name, seconds)
+        else:
+            SPAN_SECONDS.observe(seconds, span=name)
+
+
+def count(name: str, amount: int = 1) -> None:
+    trace = _active.get()
+    if trace is not None:
+        trace.count(name, amount)
+    elif amount:
+        EVENTS.inc(amount, event=name)
+
+
+@contextmanager
+def profiled(enabled: bool) -> Iterator[dict[str, Any]]:
+    """cProfile the block when ``enabled``; the yielded dict gets the stats text."""
+    out: dict[str, Any] = {}
+    if not enabled:
+        yield out
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield out
+    finally:
+        profiler.disable()
+        buf = io.StringIO()
+        pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+        out["sort"] = "cumulative"
+        out["stats"] = buf.getvalue()
+
+
+def profiling_requested(headers: Any) -> bool:
+    return DEBUG_PROFILING and headers.get(PROFILE_HEADER, "").lower() in {"1", "true", "yes"}
@@ -0,0 +1,21 @@
+import os
+
+import redis
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+_client: redis.Redis | None = None
+
+
+def get_redis() -> redis.Redis | None:
+    """Shared Redis client, or None when REDIS_URL is not configured."""
+    global _client
+    if _client is None and REDIS_URL:
+        _client = redis.Redis.from_url(REDIS_URL)
+    return _client
+
+
+def set_redis(client: redis.Redis | None) -> None:
+    """Swap the shared client (e.g. for an in-process fakeredis instance)."""
+    global _client
+    _client = client
@@ -0,0 +1,124 @@
+"""JSON encoding and compressed responses for large planner results.
+
+``dumps`` encodes result models straight from their attributes, with orjson when
+it is installed: ``PlannerResult`` and the models in it have no aliases or custom
+serializers, so a model's ``__dict__`` is its JSON shape and the bytes match
+``model_dump_json()``. Routes return ``PlannerJSONResponse`` rather than the model,
+which skips FastAPI's ``response_model`` pass (validating the result again, then
+re-serializing it through the stdlib encoder).
+
+Bodies of ``PLANNER_RESPONSE_MIN_COMPRESS_BYTES`` or more are compressed with
+whichever of zstd (when ``zstandard`` is installed) and gzip the client's
+Accept-Encoding prefers; zstd wins ties.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from datetime import date, datetime, time
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.core.instrumentation import count, span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - gzip only
+    zstandard = None
+
+
+MIN_COMPRESS_BYTES = int(os.getenv("PLANNER_RESPONSE_MIN_COMPRESS_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("PLANNER_RESPONSE_GZIP_LEVEL", "5"))
+ZSTD_LEVEL = int(os.getenv("PLANNER_RESPONSE_ZSTD_LEVEL", "3"))
+
+# server preference, best first
+ENCODINGS = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    # numeric subclasses (numpy scalars without orjson) keep their JSON type
+    if isinstance(value, float):
+        return float(value)
+    if isinstance(value, int):
+        return int(value)
+    return str(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+
+else:  # pragma: no cover
+
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """The encoding to use for an Accept-Encoding header, or None for identity."""
+    accepted: dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        # compressors are not thread-safe; they are cheap to create
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class PlannerJSONResponse(Response):
+    """``content`` encoded with ``dumps`` and compressed as ``accept_encoding`` allows.
+
+    Encoding a large plan takes tens of milliseconds: build it off the event loop.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, accept_encoding: str | None = None, status_code: int = 200) -> None:
+        with span("response_encode"):
+            body = dumps(content)
+        headers = {"Vary": "Accept-Encoding"}
+        encoding = negotiate_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_BYTES else None
+        if encoding is not None:
+            with span("response_compress"):
+                body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+        count(f"response_encoding_{encoding or 'identity'}")
+        super().__init__(body, status_code=status_code, headers=headers)
@@ -1,21 +1,67 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+import psycopg
 
 from app.api.routes.planner import router as planner_router
 
 from app.api.routes.approvals import router as approvals_router
-from app.core.db import ensure_tables
+from app.core.db import DATABASE_URL, close_async_pool, close_pool, ensure_tables, open_async_pool, open_pool
+from app.core.instrumentation import HTTP_REQUEST_SECONDS, render_metrics
+from app.services.pass1_pool import shutdown_pool
+from app.services.planner_executor import shutdown_planner_executor
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="PVTV Social Ops API", version="0.1.0")
 
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    # label by route template so path parameters don't explode the label set
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code),
+    )
+    return response
+
+
 @app.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 app.include_router(planner_router)
 app.include_router(approvals_router)
 
 @app.on_event("startup")
-def startup():
-    pass
\ No newline at end of file
+async def startup():
+    open_pool()
+    await open_async_pool()
+    if DATABASE_URL:
+        try:
+            await asyncio.to_thread(ensure_tables)
+        except psycopg.Error:
+            # the API still serves planner runs; approvals and the plan store fail until Postgres is back
+            logger.exception("Could not create database tables")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_planner_executor()
+    await close_async_pool()
+    close_pool()
+    shutdown_pool()
@@ -50,9 +50,25 @@ class ApprovalQueueEntry(BaseModel):
     status: str = "proposed"
 
 
-class ExportJob(BaseModel):
+class ExportDestination(BaseModel):
     draft_id: str
+    platform: str
+    format: str
+    spec: str
+    scheduled_datetime: str | None = None
+
+
+class ExportJob(BaseModel):
+    # one physical render (media_type + ratio + resolution) of one item
+    job_id: str
+    item_id: str
+    media_type: str
+    ratio: str
+    resolution: str
     specs: list[str] = Field(default_factory=list)
+    destinations: list[ExportDestination] = Field(default_factory=list)
+    needed_by: str | None = None
+    batch: int = 0
 
 
 class PlannerResult(BaseModel):
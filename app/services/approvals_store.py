@@ -1,38 +1,142 @@
-from typing import Optional, Dict
+import asyncio
+from datetime import datetime
+from typing import Iterable, Optional, Dict, Sequence, Tuple
 
-from app.core.db import get_conn
+from app.core.db import get_async_conn, get_conn
+from app.core.instrumentation import span
+from app.services.planner_cache import invalidate_planner_cache
+
+_UPSERT_APPROVAL_SQL = """
+    INSERT INTO approvals (draft_id, status, decision_note, decided_by)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (draft_id)
+    DO UPDATE SET
+        status = EXCLUDED.status,
+        decision_note = EXCLUDED.decision_note,
+        decided_by = EXCLUDED.decided_by,
+        decided_at = CURRENT_TIMESTAMP;
+"""
+_GET_APPROVAL_SQL = "SELECT status FROM approvals WHERE draft_id = %s;"
+_GET_ALL_APPROVALS_SQL = "SELECT draft_id, status FROM approvals;"
+# one primary-key index probe (plus heap fetch) per draft_id
+_GET_APPROVAL_STATUSES_SQL = "SELECT draft_id, status FROM approvals WHERE draft_id = ANY(%s);"
+
+
+def _filtered_approvals_query(status: Optional[str], decided_since: Optional[datetime]):
+    if status is None and decided_since is None:
+        return _GET_ALL_APPROVALS_SQL, ()
+    clauses, params = [], []
+    if status is not None:
+        clauses.append("status = %s")
+        params.append(status)
+    if decided_since is not None:
+        clauses.append("decided_at >= %s")
+        params.append(decided_since)
+    return f"SELECT draft_id, status FROM approvals WHERE {' AND '.join(clauses)};", tuple(params)
 
 
 def set_approval(draft_id: str, status: str, note: Optional[str] = None, decided_by: str = "local"):
-    with get_conn() as conn:
+    with span("approvals_store.set_approval"), get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO approvals (draft_id, status, decision_note, decided_by)
-                VALUES (%s, %s, %s, %s)
-                ON CONFLICT (draft_id)
-                DO UPDATE SET
-                    status = EXCLUDED.status,
-                    decision_note = EXCLUDED.decision_note,
-                    decided_by = EXCLUDED.decided_by,
-                    decided_at = CURRENT_TIMESTAMP;
-                """,
-                (draft_id, status, note, decided_by),
-            )
+            cur.execute(_UPSERT_APPROVAL_SQL, (draft_id, status, note, decided_by))
         conn.commit()
+    invalidate_planner_cache()
 
 
 def get_approval(draft_id: str) -> Optional[str]:
-    with get_conn() as conn:
+    with span("approvals_store.get_approval"), get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute("SELECT status FROM approvals WHERE draft_id = %s;", (draft_id,))
+            cur.execute(_GET_APPROVAL_SQL, (draft_id,))
             row = cur.fetchone()
             return row[0] if row else None
 
 
-def get_all_approvals() -> Dict[str, str]:
-    with get_conn() as conn:
+def get_all_approvals(status: Optional[str] = None, decided_since: Optional[datetime] = None) -> Dict[str, str]:
+    sql, params = _filtered_approvals_query(status, decided_since)
+    with span("approvals_store.get_all_approvals"), get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute("SELECT draft_id, status FROM approvals;")
+            cur.execute(sql, params)
             rows = cur.fetchall()
-            return {r[0]: r[1] for r in rows}
\ No newline at end of file
+            return {r[0]: r[1] for r in rows}
+
+
+def get_approval_statuses(draft_ids: Iterable[str]) -> Dict[str, str]:
+    """Stored statuses for the given draft IDs only; IDs without a decision are omitted."""
+    ids = list(dict.fromkeys(draft_ids))
+    if not ids:
+        return {}
+    with span("approvals_store.get_approval_statuses"), get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(_GET_APPROVAL_STATUSES_SQL, (ids,))
+            return {r[0]: r[1] for r in cur.fetchall()}
+
+
+def threadsafe_approval_lookup(loop: asyncio.AbstractEventLoop):
+    """get_approval_statuses for worker threads: the query runs on ``loop``'s async pool."""
+
+    def lookup(draft_ids: Iterable[str]) -> Dict[str, str]:
+        ids = list(draft_ids)
+        return asyncio.run_coroutine_threadsafe(get_approval_statuses_async(ids), loop).result()
+
+    return lookup
+
+
+async def set_approval_async(draft_id: str, status: str, note: Optional[str] = None, decided_by: str = "local"):
+    with span("approvals_store.set_approval_async"):
+        async with get_async_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(_UPSERT_APPROVAL_SQL, (draft_id, status, note, decided_by))
+            await conn.commit()
+    await asyncio.to_thread(invalidate_planner_cache)
+
+
+async def set_approvals_bulk_async(
+    decisions: Sequence[Tuple[str, str, Optional[str]]], decided_by: str = "local"
+) -> int:
+    """Upsert (draft_id, status, note) decisions in one transaction.
+
+    executemany() pipelines the statements, so N decisions cost one round-trip
+    and one commit rather than N of each.
+    """
+    rows = [(draft_id, status, note, decided_by) for draft_id, status, note in decisions]
+    if not rows:
+        return 0
+    with span("approvals_store.set_approvals_bulk_async"):
+        async with get_async_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.executemany(_UPSERT_APPROVAL_SQL, rows)
+            await conn.commit()
+    await asyncio.to_thread(invalidate_planner_cache)
+    return len(rows)
+
+
+async def get_approval_async(draft_id: str) -> Optional[str]:
+    with span("approvals_store.get_approval_async"):
+        async with get_async_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(_GET_APPROVAL_SQL, (draft_id,))
+                row = await cur.fetchone()
+                return row[0] if row else None
+
+
+async def get_all_approvals_async(
+    status: Optional[str] = None, decided_since: Optional[datetime] = None
+) -> Dict[str, str]:
+    sql, params = _filtered_approvals_query(status, decided_since)
+    with span("approvals_store.get_all_approvals_async"):
+        async with get_async_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(sql, params)
+                rows = await cur.fetchall()
+                return {r[0]: r[1] for r in rows}
+
+
+async def get_approval_statuses_async(draft_ids: Iterable[str]) -> Dict[str, str]:
+    ids = list(dict.fromkeys(draft_ids))
+    if not ids:
+        return {}
+    with span("approvals_store.get_approval_statuses_async"):
+        async with get_async_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(_GET_APPROVAL_STATUSES_SQL, (ids,))
+                return {r[0]: r[1] for r in await cur.fetchall()}
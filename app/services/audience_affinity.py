@@ -0,0 +1,94 @@
+"""Audience affinity scoring from audience_schema.yaml.
+
+An item's audiences combine into one affinity per platform: the mean of the
+known audiences' affinities, with platforms an audience doesn't list counting
+as neutral (1.0). The score component is the distance from neutral times
+``scoring_rules.audience_affinity.points_per_unit``.
+
+Distinct audience sets are interned: each normalised set gets an id and its
+points across platforms are computed once, so items sharing a combination
+(most of them) cost one dict lookup per candidate.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Sequence
+
+
+# Upper bound on raw audience lists remembered per engine (interned sets are kept).
+MEMO_MAX_ENTRIES = 50_000
+
+
+@dataclass(frozen=True)
+class AudienceSet:
+    set_id: int
+    # known audiences, sorted and deduplicated
+    audiences: tuple[str, ...]
+    # platform -> score points; platforms not listed score 0.0
+    points: Mapping[str, float]
+
+
+class AudienceAffinity:
+    def __init__(self, affinities: Mapping[str, Mapping[str, float]], points_per_unit: float) -> None:
+        self.affinities = affinities
+        self.points_per_unit = points_per_unit
+        self.platforms = tuple(dict.fromkeys(p for by_platform in affinities.values() for p in by_platform))
+        self._sets: dict[tuple[str, ...], AudienceSet] = {}
+        self._memo: dict[tuple[str, ...], AudienceSet] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_configs(cls, configs: Mapping[str, Any]) -> "AudienceAffinity":
+        affinities: dict[str, Mapping[str, float]] = {}
+        for audience, spec in ((configs.get("audience_schema") or {}).get("audiences") or {}).items():
+            by_platform = {}
+            for platform, value in ((spec or {}).get("affinities") or {}).items():
+                try:
+                    by_platform[platform] = float(value)
+                except (TypeError, ValueError):
+                    continue
+            affinities[audience] = MappingProxyType(by_platform)
+        settings = (configs.get("scoring_rules") or {}).get("audience_affinity") or {}
+        try:
+            points_per_unit = float(settings.get("points_per_unit", 0))
+        except (TypeError, ValueError):
+            points_per_unit = 0.0
+        return cls(MappingProxyType(affinities), points_per_unit)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # interned sets are a per-process cache; ship only the config
+        affinities = {audience: dict(by_platform) for audience, by_platform in self.affinities.items()}
+        return {"affinities": affinities, "points_per_unit": self.points_per_unit}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        affinities = {audience: MappingProxyType(by_platform) for audience, by_platform in state["affinities"].items()}
+        self.__init__(MappingProxyType(affinities), state["points_per_unit"])
+
+    def _combine(self, audiences: tuple[str, ...]) -> Mapping[str, float]:
+        if not audiences or not self.points_per_unit:
+            return MappingProxyType({})
+        points = {}
+        for platform in self.platforms:
+            mean = sum(self.affinities[a].get(platform, 1.0) for a in audiences) / len(audiences)
+            if mean != 1.0:
+                # rounded so shared affinities like 1.1 don't leak float noise into scores
+                points[platform] = round((mean - 1.0) * self.points_per_unit, 6)
+        return MappingProxyType(points)
+
+    def intern(self, audiences: Sequence[str]) -> AudienceSet:
+        raw = tuple(audiences)
+        cached = self._memo.get(raw)
+        if cached is not None:
+            return cached
+
+        key = tuple(sorted({a for a in raw if a in self.affinities}))
+        with self._lock:
+            audience_set = self._sets.get(key)
+            if audience_set is None:
+                audience_set = self._sets[key] = AudienceSet(len(self._sets), key, self._combine(key))
+            if len(self._memo) >= MEMO_MAX_ENTRIES:
+                self._memo.clear()
+            self._memo[raw] = audience_set
+        return audience_set
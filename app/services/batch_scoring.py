@@ -0,0 +1,109 @@
+"""Optional NumPy backend for pass-1 scoring.
+
+Items are encoded as columns (fit key, audience set, event day ordinal, objective
+score) and every Item × platform × format score is computed as one array
+expression. Totals
+are summed in the same order as the scalar ``_score_candidate`` so both paths
+produce identical floats.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+from app.models.planner import Item
+from app.services.planner_config import PlannerConfig, map_item_type_to_fit_key, pick_primary_objective
+from app.services.slot_engine import URGENCY_NO_EVENT, URGENCY_PAST_EVENT, URGENCY_STEPS
+
+
+# Below this many items the array setup costs more than the scalar loop saves.
+BATCH_MIN_ITEMS = 200
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+@dataclass
+class BatchScores:
+    """Pass-1 score matrix: one row per item, one column per (platform, format).
+
+    Only totals are kept; breakdowns are built by the scalar path for the
+    candidates that are returned.
+    """
+
+    columns: list[tuple[str, str]]
+    total: Any
+
+    def score(self, row: int, col: int) -> float:
+        return float(self.total[row, col])
+
+
+def score_items_batch(
+    items: Sequence[Item],
+    pc: PlannerConfig,
+    objective_weights: Mapping[str, float],
+    ref_ordinal: int,
+    event_ordinals: Sequence[int | None],
+) -> BatchScores:
+    if np is None:
+        raise RuntimeError("numpy is not installed; use the scalar scoring backend")
+
+    columns = list(pc.columns)
+    platform_w = np.array([pc.base_weights.get(p, 0.0) for p, _ in columns], dtype=np.float64)
+    bias_w = np.array([pc.format_biases.get((p, f), 0.0) for p, f in columns], dtype=np.float64)
+
+    # fit key → row of the (fit_key × column) content fit table
+    fit_index: dict[str, int] = {}
+    item_fit = np.empty(len(items), dtype=np.int64)
+    # interned audience set id → row of the (audience set × column) points table
+    audience_index: dict[int, int] = {}
+    audience_rows = []
+    item_audience = np.empty(len(items), dtype=np.int64)
+    has_event = np.zeros(len(items), dtype=bool)
+    event_ord = np.zeros(len(items), dtype=np.int64)
+    objective = np.empty(len(items), dtype=np.float64)
+
+    for row, item in enumerate(items):
+        fit_key = map_item_type_to_fit_key(item.item_type)
+        item_fit[row] = fit_index.setdefault(fit_key, len(fit_index))
+        audience_set = pc.audience_affinity.intern(item.audiences)
+        audience_row = audience_index.get(audience_set.set_id)
+        if audience_row is None:
+            audience_row = audience_index[audience_set.set_id] = len(audience_rows)
+            audience_rows.append(audience_set)
+        item_audience[row] = audience_row
+        if event_ordinals[row] is not None:
+            has_event[row] = True
+            event_ord[row] = event_ordinals[row]
+        obj_key = pick_primary_objective(item)
+        objective[row] = float(objective_weights.get(obj_key, 0.0)) if obj_key else 0.0
+
+    fit_table = np.zeros((max(len(fit_index), 1), len(columns)), dtype=np.float64)
+    for fit_key, fit_row in fit_index.items():
+        for col, (p, _) in enumerate(columns):
+            fit_table[fit_row, col] = pc.content_fit.get((p, fit_key), 0.0)
+    content_fit = fit_table[item_fit]
+
+    audience_table = np.zeros((max(len(audience_rows), 1), len(columns)), dtype=np.float64)
+    for audience_row, audience_set in enumerate(audience_rows):
+        for col, (p, _) in enumerate(columns):
+            audience_table[audience_row, col] = audience_set.points.get(p, 0.0)
+    audience = audience_table[item_audience]
+
+    days_until = event_ord - ref_ordinal
+    urgency = np.full(len(items), URGENCY_PAST_EVENT, dtype=np.float64)
+    for lowest, value in reversed(URGENCY_STEPS):
+        urgency = np.where(days_until >= lowest, value, urgency)
+    urgency = np.where(has_event, urgency, URGENCY_NO_EVENT)
+
+    total = (
+        urgency[:, None] + objective[:, None] + platform_w[None, :] + bias_w[None, :]
+    ) + content_fit + audience
+
+    return BatchScores(columns=columns, total=total)
@@ -0,0 +1,398 @@
+"""Multi-platform slot assignment driven by cadence_policy_v1.
+
+Slots come from the local-time calendar in ``slot_calendar``. Candidates are assigned to slots globally with a
+min-cost flow that maximises total score under the platform caps; a
+chronological repair pass then enforces the exact per-post constraints
+(cooldowns, eligibility windows, max posts, email spacing) and fills any gaps
+greedily. The flow is skipped when its graph (one eligibility check per
+candidate per slot) is too large to build within the time budget; if building
+it still runs out of time the whole horizon is scheduled greedily, and if the
+solve does, the flow found so far is kept.
+"""
+from __future__ import annotations
+
+import heapq
+import os
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator
+
+from app.services.planner_config import CadencePolicy, PlannerConfig
+from app.services.slot_calendar import Slot
+from app.services.slot_engine import PlatformSlotPicker, SlotCandidate
+
+EVENT_PUSH = "event_push"
+
+SCHEDULE_TIME_BUDGET_MS = float(os.getenv("PLANNER_SCHEDULE_BUDGET_MS", "250"))
+# best candidates per slot offered to the flow; the repair pass can still pick others
+FLOW_CANDIDATES_PER_SLOT = int(os.getenv("PLANNER_FLOW_CANDIDATES_PER_SLOT", "20"))
+# candidate x slot eligibility checks the graph build gets through per ms of budget (~1us each)
+FLOW_EVALUATIONS_PER_MS = float(os.getenv("PLANNER_FLOW_EVALUATIONS_PER_MS", "1000"))
+
+# flow costs are integers so Dijkstra's reduced costs stay exact
+_COST_SCALE = 1000
+
+
+def resolve_schedule_options(pc: PlannerConfig, mode: str | None, horizon_days: int | None) -> tuple[str, int]:
+    policy = pc.cadence
+    mode = mode or policy.default_mode
+    if policy.allowed_modes and mode not in policy.allowed_modes:
+        raise ValueError(f"Unknown planner mode {mode!r}; expected one of {', '.join(policy.allowed_modes)}")
+    horizon_days = policy.default_horizon_days if horizon_days is None else int(horizon_days)
+    if horizon_days <= 0:
+        raise ValueError("horizon_days must be positive")
+    if policy.allowed_horizon_days and horizon_days not in policy.allowed_horizon_days:
+        allowed = ", ".join(map(str, policy.allowed_horizon_days))
+        raise ValueError(f"horizon_days must be one of {allowed}, not {horizon_days}")
+    return mode, horizon_days
+
+
+class ExtraPostGate:
+    """Decides which candidates may take an "extra" slot (extra_post_triggers).
+
+    A candidate qualifies when its event is close enough or its score is near the
+    platform's best; with ``campaign_phase_boost_required`` it must also be inside
+    a boosted campaign phase, which ``event_push`` mode waives.
+    """
+
+    def __init__(
+        self,
+        policy: CadencePolicy,
+        mode: str,
+        pickers: dict[str, PlatformSlotPicker],
+        ref_ordinal: int,
+        phase_boosted: Callable[[SlotCandidate, datetime], bool] | None = None,
+    ) -> None:
+        self.policy = policy
+        self.require_boost = policy.campaign_phase_boost_required and mode != EVENT_PUSH
+        self.phase_boosted = phase_boosted
+        self.top_scores = {
+            platform: max((c.score_at(ref_ordinal) for c in picker.candidates), default=0.0)
+            for platform, picker in pickers.items()
+        }
+
+    def allows(self, cand: SlotCandidate, slot_dt: datetime) -> bool:
+        policy = self.policy
+        if self.require_boost and (self.phase_boosted is None or not self.phase_boosted(cand, slot_dt)):
+            return False
+
+        slot_ordinal = slot_dt.toordinal()  # slot_dt is local time
+        if policy.urgent_event_within_days is not None and cand.event_ordinal is not None:
+            if 0 <= cand.event_ordinal - slot_ordinal <= policy.urgent_event_within_days:
+                return True
+        threshold = policy.high_score_relative_threshold
+        top = self.top_scores.get(cand.platform, 0.0)
+        return threshold is not None and top > 0 and cand.score_at(slot_ordinal) >= threshold * top
+
+
+class _CadenceState:
+    """Platform cap usage and email send times of the schedule built so far."""
+
+    def __init__(self, policy: CadencePolicy) -> None:
+        self.policy = policy
+        self.used: dict[tuple[str, tuple[str, int, int]], int] = {}
+        self.email_sends: list[datetime] = []
+        self.email_spacing = timedelta(hours=policy.email_min_spacing_hours)
+
+    def slot_open(self, slot: Slot) -> bool:
+        if slot.period is not None:
+            cap_max = self.policy.caps[slot.platform][2]
+            if cap_max is not None and self.used.get((slot.platform, slot.period), 0) >= cap_max:
+                return False
+        if slot.platform in self.policy.email_platforms and self.email_sends:
+            i = bisect_left(self.email_sends, slot.dt)
+            if i > 0 and slot.dt - self.email_sends[i - 1] < self.email_spacing:
+                return False
+            if i < len(self.email_sends) and self.email_sends[i] - slot.dt < self.email_spacing:
+                return False
+        return True
+
+    def record(self, slot: Slot) -> None:
+        if slot.period is not None:
+            key = (slot.platform, slot.period)
+            self.used[key] = self.used.get(key, 0) + 1
+        if slot.platform in self.policy.email_platforms:
+            self.email_sends.insert(bisect_left(self.email_sends, slot.dt), slot.dt)
+
+    def under_minimum(self, slots: list[Slot]) -> list[dict[str, Any]]:
+        """Cap periods in the horizon that got fewer posts than the platform minimum."""
+        out = []
+        for platform, period in dict.fromkeys((s.platform, s.period) for s in slots if s.period is not None):
+            scheduled = self.used.get((platform, period), 0)
+            if scheduled < self.policy.caps[platform][1]:
+                out.append({"platform": platform, "period": list(period), "scheduled": scheduled})
+        return out
+
+
+class _FlowTimeout(Exception):
+    pass
+
+
+class _MinCostFlow:
+    """Successive shortest paths with Johnson potentials (integer costs)."""
+
+    def __init__(self) -> None:
+        self.adj: list[list[int]] = []
+        self.to: list[int] = []
+        self.cap: list[int] = []
+        self.cost: list[int] = []
+        self.timed_out = False
+
+    def add_node(self) -> int:
+        self.adj.append([])
+        return len(self.adj) - 1
+
+    def add_edge(self, u: int, v: int, cap: int, cost: int) -> int:
+        e = len(self.to)
+        self.to += [v, u]
+        self.cap += [cap, 0]
+        self.cost += [cost, -cost]
+        self.adj[u].append(e)
+        self.adj[v].append(e + 1)
+        return e
+
+    def _initial_potentials(self, source: int) -> list[float]:
+        # Bellman-Ford; edges were added in topological order, so this settles quickly
+        inf = float("inf")
+        h = [inf] * len(self.adj)
+        h[source] = 0
+        for _ in range(len(self.adj)):
+            changed = False
+            for e in range(0, len(self.to), 2):
+                u = self.to[e + 1]
+                if h[u] != inf and self.cap[e] > 0 and h[u] + self.cost[e] < h[self.to[e]]:
+                    h[self.to[e]] = h[u] + self.cost[e]
+                    changed = True
+            if not changed:
+                break
+        return h
+
+    def solve(self, source: int, sink: int, deadline: float) -> int:
+        """Augment while it lowers total cost; returns units of flow sent.
+
+        Each augmentation leaves a feasible flow, so at ``deadline`` this stops
+        with the flow found so far and sets ``timed_out``.
+        """
+        inf = float("inf")
+        n = len(self.adj)
+        adj, to, cap, cost = self.adj, self.to, self.cap, self.cost
+        h = self._initial_potentials(source)
+        sent = 0
+        while True:
+            if time.perf_counter() > deadline:
+                self.timed_out = True
+                return sent
+            dist = [inf] * n
+            prev_edge = [-1] * n
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                hu = h[u]
+                for e in adj[u]:
+                    if cap[e] <= 0:
+                        continue
+                    v = to[e]
+                    nd = d + cost[e] + hu - h[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        prev_edge[v] = e
+                        heapq.heappush(heap, (nd, v))
+            if dist[sink] == inf:
+                return sent
+            for v in range(n):
+                if dist[v] != inf:
+                    h[v] += dist[v]
+            if h[sink] - h[source] >= 0:
+                # no remaining path improves the total score
+                return sent
+
+            push = inf
+            v = sink
+            while v != source:
+                e = prev_edge[v]
+                push = min(push, cap[e])
+                v = to[e ^ 1]
+            v = sink
+            while v != source:
+                e = prev_edge[v]
+                cap[e] -= push
+                cap[e ^ 1] += push
+                v = to[e ^ 1]
+            sent += push
+
+
+def _flow_assignments(
+    slots: list[Slot],
+    pickers: dict[str, PlatformSlotPicker],
+    pc: PlannerConfig,
+    gate: ExtraPostGate,
+    deadline: float,
+    start: int = 0,
+) -> tuple[dict[int, SlotCandidate], bool]:
+    """slot index -> candidate maximising total score under the platform caps,
+    and whether the solve finished before ``deadline``.
+
+    Cooldowns are approximated by letting each (series, platform) post at most once
+    per cooldown-length block of days; the repair pass enforces the exact rule.
+    """
+    policy = pc.cadence
+    flow = _MinCostFlow()
+    source, sink = flow.add_node(), flow.add_node()
+
+    group_nodes: dict[tuple[str, str, int], int] = {}
+    slot_nodes: list[int | None] = []
+    offers: list[tuple[int, int, int, int]] = []  # (group node, slot index, cost, candidate pos)
+    for i, slot in enumerate(slots):
+        if i < start:
+            slot_nodes.append(None)
+            continue
+        if time.perf_counter() > deadline:
+            raise _FlowTimeout()
+        picker = pickers.get(slot.platform)
+        if picker is None or not picker.candidates:
+            slot_nodes.append(None)
+            continue
+
+        slot_ordinal = slot.ordinal
+        eligible = []
+        for cand in picker.candidates:
+            if not cand.window.status_at(slot.dt)[0]:
+                continue
+            if slot.kind == "extra" and not gate.allows(cand, slot.dt):
+                continue
+            eligible.append((cand.score_at(slot_ordinal), -cand.pos, cand))
+        if not eligible:
+            slot_nodes.append(None)
+            continue
+        slot_nodes.append(flow.add_node())
+
+        block = pc.base_cooldown_days(slot.platform) + 1
+        best_by_group: dict[tuple[str, str, int], tuple[float, int, SlotCandidate]] = {}
+        for entry in heapq.nlargest(FLOW_CANDIDATES_PER_SLOT, eligible, key=lambda e: (e[0], e[1])):
+            group = (entry[2].key_id, slot.platform, slot_ordinal // block)
+            if group not in best_by_group:
+                best_by_group[group] = entry
+        for group, (score, _, cand) in best_by_group.items():
+            node = group_nodes.get(group)
+            if node is None:
+                node = group_nodes[group] = flow.add_node()
+            offers.append((node, i, -round(score * _COST_SCALE), cand.pos))
+
+    # edges in topological order: source -> group -> slot -> cap period -> sink
+    for node in group_nodes.values():
+        flow.add_edge(source, node, 1, 0)
+    offer_edges = [flow.add_edge(node, slot_nodes[i], 1, cost) for node, i, cost, _ in offers]
+    period_nodes: dict[tuple[str, tuple[str, int, int]], int] = {}
+    for slot, node in zip(slots, slot_nodes):
+        if node is None:
+            continue
+        if slot.period is None:
+            flow.add_edge(node, sink, 1, 0)
+            continue
+        key = (slot.platform, slot.period)
+        period_node = period_nodes.get(key)
+        if period_node is None:
+            period_node = period_nodes[key] = flow.add_node()
+        flow.add_edge(node, period_node, 1, 0)
+    for (platform, _), period_node in period_nodes.items():
+        cap_max = policy.caps[platform][2]
+        flow.add_edge(period_node, sink, len(slots) if cap_max is None else cap_max, 0)
+
+    flow.solve(source, sink, deadline)
+
+    assigned: dict[int, SlotCandidate] = {}
+    for (_, i, _, pos), e in zip(offers, offer_edges):
+        if flow.cap[e] == 0:
+            assigned[i] = pickers[slots[i].platform].candidates[pos]
+    return assigned, not flow.timed_out
+
+
+def _flow_evaluations(slots: list[Slot], pickers: dict[str, PlatformSlotPicker], start: int = 0) -> int:
+    """Eligibility checks building the flow graph takes: every candidate of the platform, per slot."""
+    sizes = {platform: len(picker.candidates) for platform, picker in pickers.items()}
+    return sum(sizes.get(slot.platform, 0) for slot in slots[start:])
+
+
+def assign_slots(
+    slots: list[Slot],
+    pickers: dict[str, PlatformSlotPicker],
+    pc: PlannerConfig,
+    gate: ExtraPostGate,
+    stats: dict[str, Any],
+    *,
+    optimize: bool = True,
+    time_budget_ms: float = SCHEDULE_TIME_BUDGET_MS,
+    fixed: dict[int, SlotCandidate] | None = None,
+    start: int = 0,
+) -> Iterator[tuple[int, Slot, SlotCandidate]]:
+    """Yield (slot index, slot, candidate) in time order; ``stats`` is filled in as a side effect.
+
+    Slots before ``start`` are not scheduled; they only keep the assignments in
+    ``fixed`` (a previous plan's prefix), which still count towards caps and cooldowns.
+    """
+    started = time.perf_counter()
+    planned: dict[int, SlotCandidate] = {}
+    algorithm = "greedy"
+    evaluations = _flow_evaluations(slots, pickers, start)
+    if optimize and start < len(slots):
+        if evaluations > time_budget_ms * FLOW_EVALUATIONS_PER_MS:
+            # building the graph alone would use up the budget; don't start it
+            algorithm = "greedy_size_limit"
+        else:
+            try:
+                planned, complete = _flow_assignments(
+                    slots, pickers, pc, gate, started + time_budget_ms / 1000, start
+                )
+                algorithm = "min_cost_flow" if complete else "min_cost_flow_partial"
+            except _FlowTimeout:
+                planned = {}
+                algorithm = "greedy_fallback"
+    solve_ms = (time.perf_counter() - started) * 1000
+    flow_assignments = len(planned)
+    if fixed:
+        planned.update((i, cand) for i, cand in fixed.items() if i < start)
+
+    state = _CadenceState(pc.cadence)
+    filled: dict[str, int] = {}
+    repaired = 0
+    for i, slot in enumerate(slots):
+        picker = pickers.get(slot.platform)
+        if picker is None or not state.slot_open(slot):
+            continue
+
+        cand = planned.get(i)
+        if cand is not None and picker.admits(cand, slot.dt):
+            picker.record(cand, slot.dt)
+        elif i < start:
+            continue
+        else:
+            if cand is not None:
+                repaired += 1
+            accept = (lambda c, dt=slot.dt: gate.allows(c, dt)) if slot.kind == "extra" else None
+            cand = picker.pick(slot.dt, accept)
+        if cand is None:
+            continue
+
+        state.record(slot)
+        filled[slot.platform] = filled.get(slot.platform, 0) + 1
+        yield i, slot, cand
+
+    totals: dict[str, int] = {}
+    for slot in slots:
+        totals[slot.platform] = totals.get(slot.platform, 0) + 1
+    stats.update(
+        {
+            "algorithm": algorithm,
+            "time_budget_ms": time_budget_ms,
+            "flow_evaluations": evaluations,
+            "solve_ms": round(solve_ms, 3),
+            "flow_assignments": flow_assignments,
+            "repaired": repaired,
+            "slots": {p: {"total": n, "filled": filled.get(p, 0)} for p, n in totals.items()},
+            "under_minimum": state.under_minimum(slots),
+        }
+    )
@@ -0,0 +1,203 @@
+"""Campaign phase calendars from campaign_templates.yaml.
+
+Each template is compiled once per config (``CampaignTemplate``). Per run, every
+campaign in the request is expanded into local day ordinals around its anchor
+day and indexed by item and platform as a ``PhaseBoost``: a day -> multiplier
+table the scorer reads in O(1) per candidate and slot. Items in the same set of
+campaigns share their boosts, so hundreds of campaigns over many items only
+expand each distinct combination once.
+
+A phase covers the days from its first offset up to the day before the next
+phase starts (the last phase ends at its last offset), so a template's phases
+form one contiguous stretch. Where campaigns overlap on a day, the highest
+multiplier wins.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Any, Mapping, Sequence
+from zoneinfo import ZoneInfo
+
+
+@dataclass(frozen=True)
+class CampaignTemplate:
+    name: str
+    # (phase, first day offset, last day offset) relative to the anchor day, in day order
+    phases: tuple[tuple[str, int, int], ...]
+    multipliers: Mapping[str, float]
+
+    @classmethod
+    def from_dict(cls, name: str, template: Mapping[str, Any]) -> "CampaignTemplate":
+        spans = []
+        for phase, spec in (template.get("phases") or {}).items():
+            spec = spec or {}
+            offsets = [-int(d) for d in spec.get("days_before") or ()] + [int(d) for d in spec.get("days_after") or ()]
+            if offsets:
+                spans.append((min(offsets), max(offsets), str(phase)))
+        spans.sort()
+
+        phases = []
+        for i, (first, last, phase) in enumerate(spans):
+            if i + 1 < len(spans):
+                # gaps up to the next phase belong to this one
+                last = max(last, spans[i + 1][0] - 1)
+            phases.append((phase, first, last))
+
+        multipliers = {}
+        for platform, value in (template.get("multipliers") or {}).items():
+            try:
+                multipliers[platform] = float(value)
+            except (TypeError, ValueError):
+                continue
+        return cls(name=name, phases=tuple(phases), multipliers=MappingProxyType(multipliers))
+
+
+def compile_campaign_templates(configs: Mapping[str, Any]) -> Mapping[str, CampaignTemplate]:
+    templates = (configs.get("campaign_templates") or {}).get("templates") or {}
+    return MappingProxyType({name: CampaignTemplate.from_dict(name, t or {}) for name, t in templates.items()})
+
+
+@dataclass(frozen=True, slots=True)
+class PhaseBoost:
+    """One item's campaign phases on one platform, by local day ordinal."""
+
+    # day ordinal -> (multiplier, campaign id, phase)
+    days: Mapping[int, tuple[float, str, str]]
+    # ordinals where the multiplier differs from the day before, ascending
+    changes: tuple[int, ...]
+
+    def multiplier(self, ordinal: int) -> float:
+        day = self.days.get(ordinal)
+        return 1.0 if day is None else day[0]
+
+    def boosted(self, ordinal: int) -> bool:
+        return self.multiplier(ordinal) > 1.0
+
+    def next_change(self, ordinal: int) -> int | None:
+        i = bisect_right(self.changes, ordinal)
+        return self.changes[i] if i < len(self.changes) else None
+
+    def breakdown(self, ordinal: int) -> dict[str, Any] | None:
+        day = self.days.get(ordinal)
+        if day is None:
+            return None
+        multiplier, campaign_id, phase = day
+        return {"id": campaign_id, "phase": phase, "multiplier": multiplier}
+
+
+def _build_boost(expanded: Sequence[tuple[str, CampaignTemplate, list[tuple[int, str]]]], platform: str) -> PhaseBoost:
+    days: dict[int, tuple[float, str, str]] = {}
+    for campaign_id, template, campaign_days in expanded:
+        multiplier = template.multipliers.get(platform)
+        if multiplier is None:
+            continue
+        for ordinal, phase in campaign_days:
+            current = days.get(ordinal)
+            if current is None or multiplier > current[0]:
+                days[ordinal] = (multiplier, campaign_id, phase)
+
+    changes = []
+    previous, previous_multiplier = None, 1.0
+    for ordinal in sorted(days):
+        if previous is not None and ordinal != previous + 1 and previous_multiplier != 1.0:
+            # a gap between campaigns drops back to no boost
+            changes.append(previous + 1)
+            previous_multiplier = 1.0
+        multiplier = days[ordinal][0]
+        if multiplier != previous_multiplier:
+            changes.append(ordinal)
+        previous, previous_multiplier = ordinal, multiplier
+    if previous is not None and previous_multiplier != 1.0:
+        changes.append(previous + 1)
+    return PhaseBoost(days=days, changes=tuple(changes))
+
+
+def _anchor_ordinal(value: Any, tz: ZoneInfo) -> int:
+    """Local day of a date or datetime (naive datetimes are local wall time)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value) if "T" in value or " " in value else date.fromisoformat(value)
+    if isinstance(value, datetime):
+        return (value.astimezone(tz) if value.tzinfo is not None else value).toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    raise TypeError(f"anchor_date must be a date or datetime, not {type(value).__name__}")
+
+
+@dataclass
+class CampaignCalendar:
+    """Campaign boosts of one run: item id -> platform -> PhaseBoost."""
+
+    boosts: dict[str, Mapping[str, PhaseBoost]]
+    stats: dict[str, Any]
+
+    def for_items(self, item_ids: Sequence[str]) -> list[Mapping[str, PhaseBoost] | None] | None:
+        """Boosts per item row, or None when no item is in a campaign."""
+        if not self.boosts:
+            return None
+        return [self.boosts.get(item_id) for item_id in item_ids]
+
+
+def build_campaign_calendar(
+    campaigns: Sequence[Mapping[str, Any]],
+    templates: Mapping[str, CampaignTemplate],
+    tz: ZoneInfo,
+    first_day: int,
+    last_day: int,
+) -> CampaignCalendar:
+    """Expand ``campaigns`` (``id``, ``template``, ``anchor_date``, ``item_ids``) for one run.
+
+    Only days in ``first_day..last_day`` (the run's horizon, as local ordinals) are
+    expanded; nothing outside it is ever scored. Campaigns with an unknown template
+    or a missing/invalid anchor are skipped and listed under ``stats["skipped"]``.
+    """
+    expanded: list[tuple[str, CampaignTemplate, list[tuple[int, str]]]] = []
+    campaigns_by_item: dict[str, list[int]] = {}
+    skipped = []
+    outside_horizon = 0
+    for n, campaign in enumerate(campaigns):
+        campaign_id = str(campaign.get("id") or campaign.get("name") or n)
+        template = templates.get(campaign.get("template") or "")
+        if template is None:
+            skipped.append({"id": campaign_id, "reason": "unknown_template"})
+            continue
+        try:
+            anchor = _anchor_ordinal(campaign["anchor_date"], tz)
+        except (KeyError, TypeError, ValueError):
+            skipped.append({"id": campaign_id, "reason": "invalid_anchor_date"})
+            continue
+        days = [
+            (ordinal, phase)
+            for phase, first, last in template.phases
+            for ordinal in range(max(anchor + first, first_day), min(anchor + last, last_day) + 1)
+        ]
+        if not days:
+            outside_horizon += 1
+            continue
+        for item_id in dict.fromkeys(str(i) for i in campaign.get("item_ids") or ()):
+            campaigns_by_item.setdefault(item_id, []).append(len(expanded))
+        expanded.append((campaign_id, template, days))
+
+    shared: dict[tuple[int, ...], Mapping[str, PhaseBoost]] = {}
+    boosts: dict[str, Mapping[str, PhaseBoost]] = {}
+    for item_id, indices in campaigns_by_item.items():
+        key = tuple(indices)
+        by_platform = shared.get(key)
+        if by_platform is None:
+            members = [expanded[i] for i in indices]
+            platforms = dict.fromkeys(p for _, template, _ in members for p in template.multipliers)
+            # plain dicts: these are shipped to pass-1 pool workers
+            by_platform = shared[key] = {p: _build_boost(members, p) for p in platforms}
+        if by_platform:
+            boosts[item_id] = by_platform
+
+    stats = {
+        "active": len(expanded),
+        "outside_horizon": outside_horizon,
+        "skipped": skipped,
+        "items": len(boosts),
+        "distinct_calendars": len(shared),
+    }
+    return CampaignCalendar(boosts=boosts, stats=stats)
@@ -0,0 +1,90 @@
+"""Array-backed store for pass-1 draft candidates.
+
+Every item gets one candidate per ``PlannerConfig.columns`` entry, stored
+row-major: candidate ``i`` is item ``i // n_columns`` in column ``i % n_columns``.
+The engine reads and writes these arrays directly; ``DraftCandidate`` models are
+only built when a result leaves the planner.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Sequence
+
+from app.models.planner import DraftCandidate, Item
+
+
+class CandidateStore:
+    __slots__ = (
+        "items",
+        "columns",
+        "n_columns",
+        "blocked",
+        "block_reasons",
+        "scores",
+        "score_ordinals",
+        "scheduled_at",
+    )
+
+    def __init__(self, items: Sequence[Item], columns: Sequence[tuple[str, str]], ref_ordinal: int) -> None:
+        n = len(items) * len(columns)
+        self.items = items
+        self.columns = columns
+        self.n_columns = len(columns)
+        self.blocked = bytearray(n)
+        # sparse: only blocked candidates have a reason
+        self.block_reasons: dict[int, str | None] = {}
+        self.scores = array("d", bytes(8 * n))
+        # local day each score was computed for (pass 1: today; scheduled: the slot's day)
+        self.score_ordinals = array("q", [ref_ordinal]) * n
+        self.scheduled_at: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def item(self, i: int) -> Item:
+        return self.items[i // self.n_columns]
+
+    def column(self, i: int) -> tuple[str, str]:
+        return self.columns[i % self.n_columns]
+
+    def draft_id(self, i: int) -> str:
+        platform, fmt = self.columns[i % self.n_columns]
+        return f"{self.items[i // self.n_columns].id}:{platform}:{fmt}"
+
+    def set_blocked(self, i: int, reason: str | None) -> None:
+        self.blocked[i] = 1
+        self.block_reasons[i] = reason
+
+    def blocked_count(self) -> int:
+        return self.blocked.count(1)
+
+    def row_results(self, row: int) -> list[list[Any]]:
+        """[platform, format, blocked, block_reason, score] per column of one item."""
+        start = row * self.n_columns
+        return [
+            [platform, fmt, bool(self.blocked[start + col]), self.block_reasons.get(start + col), self.scores[start + col]]
+            for col, (platform, fmt) in enumerate(self.columns)
+        ]
+
+    def load_row(self, row: int, results: Sequence[Sequence[Any]]) -> None:
+        """Fill one item's candidates from ``row_results`` output of an earlier run."""
+        start = row * self.n_columns
+        for col, (_, _, blocked, block_reason, score) in enumerate(results):
+            if blocked:
+                self.set_blocked(start + col, block_reason)
+            self.scores[start + col] = score
+
+    def materialize(self, i: int, score_breakdown: dict[str, Any]) -> DraftCandidate:
+        platform, fmt = self.columns[i % self.n_columns]
+        # fields come from validated inputs, so skip re-validation
+        return DraftCandidate.model_construct(
+            item_id=self.items[i // self.n_columns].id,
+            platform=platform,
+            format=fmt,
+            blocked=bool(self.blocked[i]),
+            block_reason=self.block_reasons.get(i),
+            score=self.scores[i],
+            score_breakdown=score_breakdown,
+            suggested_schedule_datetime=self.scheduled_at.get(i),
+            dependency_warnings=[],
+        )
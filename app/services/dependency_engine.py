@@ -0,0 +1,218 @@
+"""Compiled dependency_rules.yaml gating.
+
+Rules are compiled once per config snapshot: field paths become attribute
+accessors, clauses become predicates, and rules are indexed by
+``(platform, item_type, format)`` with ``None`` as the wildcard. Everything here is
+plain classes (no closures) so a compiled engine can be pickled to worker processes.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Mapping, Sequence
+
+from app.models.planner import Item
+
+
+# Upper bound on memoized (bucket, field values) results kept per engine.
+MEMO_MAX_ENTRIES = 50_000
+
+
+@dataclass(frozen=True)
+class FieldAccessor:
+    """Precompiled ``item.a.b`` path; paths not rooted at ``item`` resolve to None."""
+
+    path: str
+    attrs: tuple[str, ...] | None
+
+    @classmethod
+    def compile(cls, field_path: str) -> "FieldAccessor":
+        parts = field_path.split(".")
+        if not parts or parts[0] != "item":
+            return cls(field_path, None)
+        return cls(field_path, tuple(parts[1:]))
+
+    def __call__(self, item: Item) -> Any:
+        if self.attrs is None:
+            return None
+        value: Any = item
+        for attr in self.attrs:
+            if value is None:
+                return None
+            value = getattr(value, attr, None)
+        return value
+
+
+@dataclass(frozen=True)
+class ExistsClause:
+    accessor: FieldAccessor
+    exists: bool
+
+    def check(self, value: Any) -> bool:
+        present = value is not None and value != ""
+        return present == self.exists
+
+
+@dataclass(frozen=True)
+class GteClause:
+    accessor: FieldAccessor
+    threshold: float
+
+    def check(self, value: Any) -> bool:
+        try:
+            return value is not None and float(value) >= self.threshold
+        except (TypeError, ValueError):
+            return False
+
+
+@dataclass(frozen=True)
+class NeverClause:
+    """Clauses without a field, an unknown operator or a bad threshold never pass."""
+
+    accessor: FieldAccessor | None = None
+
+    def check(self, value: Any) -> bool:
+        return False
+
+
+def _compile_clause(clause: Mapping[str, Any]):
+    field = clause.get("field")
+    if not field:
+        return NeverClause()
+    accessor = FieldAccessor.compile(field)
+    if "exists" in clause:
+        return ExistsClause(accessor, bool(clause.get("exists")))
+    if "gte" in clause:
+        try:
+            return GteClause(accessor, float(clause["gte"]))
+        except (TypeError, ValueError):
+            return NeverClause(accessor)
+    return NeverClause(accessor)
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    order: int
+    rule_id: str
+    all_clauses: tuple
+    any_clauses: tuple
+    blocked: bool
+    message: str
+
+    @classmethod
+    def compile(cls, order: int, rule: Mapping[str, Any]) -> "CompiledRule":
+        req = rule.get("require") or {}
+        on_fail = rule.get("on_fail") or {}
+        return cls(
+            order=order,
+            rule_id=rule.get("id", "unknown"),
+            all_clauses=tuple(_compile_clause(c) for c in req.get("all") or []),
+            any_clauses=tuple(_compile_clause(c) for c in req.get("any") or []),
+            blocked=bool(on_fail.get("blocked", False)),
+            message=on_fail.get("message") or f"Blocked by dependency rule: {rule.get('id', 'unknown')}",
+        )
+
+    def passes(self, values: Mapping[FieldAccessor, Any]) -> bool:
+        all_ok = all(c.check(values.get(c.accessor)) for c in self.all_clauses) if self.all_clauses else True
+        any_ok = any(c.check(values.get(c.accessor)) for c in self.any_clauses) if self.any_clauses else True
+        return all_ok and any_ok
+
+
+@dataclass(frozen=True)
+class RuleBucket:
+    """The blocking rules that apply to one concrete (platform, item_type, format)."""
+
+    bucket_id: int
+    rules: tuple[CompiledRule, ...]
+    accessors: tuple[FieldAccessor, ...]
+
+
+_EMPTY_BUCKET = RuleBucket(-1, (), ())
+
+
+class DependencyEngine:
+    def __init__(self, rules: Sequence[Mapping[str, Any]]):
+        self._index: dict[tuple[str | None, str | None, str | None], list[CompiledRule]] = {}
+        for order, rule in enumerate(rules):
+            compiled = CompiledRule.compile(order, rule)
+            if not compiled.blocked:
+                # a failing non-blocking rule has no effect on gating
+                continue
+            when = rule.get("when") or {}
+            key = (when.get("platform") or None, when.get("item_type") or None, when.get("format") or None)
+            self._index.setdefault(key, []).append(compiled)
+        self._buckets: dict[tuple[str, str, str], RuleBucket] = {}
+        self._memo: dict[tuple[int, tuple], tuple[bool, str | None]] = {}
+        self._lock = threading.Lock()
+        self.evaluations = 0
+        self.memo_hits = 0
+
+    def __getstate__(self) -> dict[str, Any]:
+        # buckets and memo are per-process caches; ship only the compiled index
+        return {"_index": self._index}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(())
+        self._index = state["_index"]
+
+    def bucket_for(self, platform: str, item_type: str, fmt: str) -> RuleBucket:
+        key = (platform, item_type, fmt)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            return bucket
+
+        rules: list[CompiledRule] = []
+        for combo in product((platform, None), (item_type, None), (fmt, None)):
+            rules.extend(self._index.get(combo, ()))
+        rules.sort(key=lambda r: r.order)
+        accessors = tuple(
+            dict.fromkeys(c.accessor for r in rules for c in r.all_clauses + r.any_clauses if c.accessor)
+        )
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # bucket ids key the memo, so they must be unique per engine
+                bucket = RuleBucket(len(self._buckets), tuple(rules), accessors) if rules else _EMPTY_BUCKET
+                self._buckets[key] = bucket
+        return bucket
+
+    def evaluate(
+        self, item: Item, platform: str, fmt: str, counters: dict[str, int] | None = None
+    ) -> tuple[bool, str | None]:
+        """(blocked, message). ``counters`` (if given) tallies memo hits, evaluations and rules checked."""
+        bucket = self.bucket_for(platform, item.item_type, fmt)
+        if not bucket.rules:
+            return False, None
+
+        # the item's "fingerprint" for this bucket is just the fields its rules read
+        values = {a: a(item) for a in bucket.accessors}
+        memo_key = (bucket.bucket_id, tuple(values.values()))
+        try:
+            cached = self._memo.get(memo_key)
+        except TypeError:  # unhashable field value: evaluate without memo
+            memo_key, cached = None, None
+        if cached is not None:
+            self.memo_hits += 1
+            if counters is not None:
+                counters["dependency_memo_hits"] = counters.get("dependency_memo_hits", 0) + 1
+            return cached
+
+        self.evaluations += 1
+        result: tuple[bool, str | None] = (False, None)
+        checked = 0
+        for rule in bucket.rules:
+            checked += 1
+            if not rule.passes(values):
+                result = (True, rule.message)
+                break
+        if counters is not None:
+            counters["dependency_evaluations"] = counters.get("dependency_evaluations", 0) + 1
+            counters["dependency_rules_evaluated"] = counters.get("dependency_rules_evaluated", 0) + checked
+
+        if memo_key is not None:
+            if len(self._memo) >= MEMO_MAX_ENTRIES:
+                self._memo.clear()
+            self._memo[memo_key] = result
+        return result
@@ -0,0 +1,109 @@
+"""Export queue for scheduled drafts, one job per item and physical render.
+
+export_mapping_v1 lists the specs each (platform, format) needs and
+export_specs_v1 describes them. Specs that render the same file (same
+media_type, ratio and resolution, e.g. ig_feed_4x5 / fb_feed_4x5 /
+patreon_post_4x5, or reel_9x16 for both Instagram reels and YouTube shorts) are
+merged: an item gets one job per distinct render, listing every destination it
+fans out to. Jobs are ordered by when their first destination goes out and cut
+into batches of ``PLANNER_EXPORT_BATCH_SIZE`` renders for the render worker.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Sequence
+
+EXPORT_BATCH_SIZE = int(os.getenv("PLANNER_EXPORT_BATCH_SIZE", "25"))
+
+
+@dataclass(frozen=True)
+class ExportRender:
+    spec: str
+    media_type: str
+    ratio: str
+    resolution: str
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return self.media_type, self.ratio, self.resolution
+
+
+def compile_export_renders(configs: Mapping[str, Any]) -> Mapping[tuple[str, str], tuple[ExportRender, ...]]:
+    """(platform, format) -> renders it needs. Specs missing from export_specs_v1 render on their own."""
+    specs = (configs.get("export_specs_v1") or {}).get("specs") or {}
+    mapping = (configs.get("export_mapping_v1") or {}).get("mapping") or {}
+    renders: dict[tuple[str, str], tuple[ExportRender, ...]] = {}
+    for platform, formats in mapping.items():
+        for fmt, spec_names in (formats or {}).items():
+            out = []
+            for name in spec_names or ():
+                spec = specs.get(name)
+                if spec is None:
+                    out.append(ExportRender(name, "", "", name))
+                else:
+                    out.append(
+                        ExportRender(
+                            name,
+                            str(spec.get("media_type") or ""),
+                            str(spec.get("ratio") or ""),
+                            str(spec.get("resolution") or ""),
+                        )
+                    )
+            renders[(platform, fmt)] = tuple(out)
+    return MappingProxyType(renders)
+
+
+def build_export_queue(
+    weekly_plan: Sequence[Mapping[str, Any]],
+    renders: Mapping[tuple[str, str], Sequence[ExportRender]],
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Export jobs for the weekly plan's drafts, plus dedup/batch stats for the metadata."""
+    jobs: dict[tuple[str, tuple[str, str, str]], dict[str, Any]] = {}
+    destinations = 0
+    for entry in weekly_plan:
+        draft_id = entry["draft_id"]
+        item_id, platform, fmt = draft_id.rsplit(":", 2)
+        for render in renders.get((platform, fmt), ()):
+            destinations += 1
+            job = jobs.get((item_id, render.key))
+            if job is None:
+                media_type, ratio, resolution = render.key
+                job = jobs[(item_id, render.key)] = {
+                    "job_id": f"{item_id}/{media_type}/{ratio}/{resolution}",
+                    "item_id": item_id,
+                    "media_type": media_type,
+                    "ratio": ratio,
+                    "resolution": resolution,
+                    "specs": [],
+                    "destinations": [],
+                    "needed_by": entry["scheduled_datetime"],
+                }
+            if render.spec not in job["specs"]:
+                job["specs"].append(render.spec)
+            job["destinations"].append(
+                {
+                    "draft_id": draft_id,
+                    "platform": platform,
+                    "format": fmt,
+                    "spec": render.spec,
+                    "scheduled_datetime": entry["scheduled_datetime"],
+                }
+            )
+            job["needed_by"] = min(job["needed_by"], entry["scheduled_datetime"])
+
+    queue = sorted(jobs.values(), key=lambda j: (j["needed_by"], j["job_id"]))
+    batch_size = max(batch_size, 1)
+    for i, job in enumerate(queue):
+        job["batch"] = i // batch_size
+
+    stats = {
+        "jobs": len(queue),
+        "destinations": destinations,
+        "renders_saved": destinations - len(queue),
+        "batch_size": batch_size,
+        "batches": -(-len(queue) // batch_size),
+    }
+    return queue, stats
@@ -0,0 +1,100 @@
+"""Process pool for parallel pass-1 (gating + scoring) over item chunks.
+
+Workers receive the PlannerConfig once, through the pool initializer, and keep
+it in ``worker_config()``; tasks only carry their chunk of items. The pool is
+process-wide and rebuilt when the config fingerprint changes; the old one is shut
+down once the runs still mapping on it are done.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator
+
+from app.services.planner_config import PlannerConfig
+
+PARALLEL_WORKERS = int(os.getenv("PLANNER_PARALLEL_WORKERS", "0")) or os.cpu_count() or 1
+PARALLEL_CHUNK_ITEMS = int(os.getenv("PLANNER_PARALLEL_CHUNK_ITEMS", "1000"))
+# "spawn" keeps workers clear of locks held by the API's threads at fork time
+PARALLEL_START_METHOD = os.getenv("PLANNER_PARALLEL_START_METHOD", "spawn")
+
+_WORKER_CONFIG: PlannerConfig | None = None
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_KEY: Any = None
+# map_chunks calls using each pool, including pools replaced after a config change
+_POOL_USERS: dict[ProcessPoolExecutor, int] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def _init_worker(pc: PlannerConfig) -> None:
+    global _WORKER_CONFIG
+    _WORKER_CONFIG = pc
+
+
+def worker_config() -> PlannerConfig:
+    if _WORKER_CONFIG is None:
+        raise RuntimeError("worker_config() called outside a pass-1 pool worker")
+    return _WORKER_CONFIG
+
+
+def _acquire_pool(pc: PlannerConfig) -> ProcessPoolExecutor:
+    """The pool for ``pc``, counted as in use until ``_release_pool``."""
+    global _POOL, _POOL_KEY
+    key = pc.fingerprint or id(pc)
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_KEY != key:
+            if _POOL is not None and not _POOL_USERS.get(_POOL):
+                _POOL_USERS.pop(_POOL, None)
+                _POOL.shutdown(wait=False)
+            # a pool still mapping for other runs is shut down by its last user
+            _POOL = ProcessPoolExecutor(
+                max_workers=PARALLEL_WORKERS,
+                mp_context=multiprocessing.get_context(PARALLEL_START_METHOD),
+                initializer=_init_worker,
+                initargs=(pc,),
+            )
+            _POOL_KEY = key
+        _POOL_USERS[_POOL] = _POOL_USERS.get(_POOL, 0) + 1
+        return _POOL
+
+
+def _release_pool(pool: ProcessPoolExecutor) -> None:
+    with _POOL_LOCK:
+        if pool not in _POOL_USERS:
+            # shutdown_pool got there first
+            return
+        _POOL_USERS[pool] -= 1
+        if _POOL_USERS[pool] or pool is _POOL:
+            return
+        del _POOL_USERS[pool]
+    pool.shutdown(wait=False)
+
+
+def map_chunks(pc: PlannerConfig, fn: Callable[..., Any], chunks: Iterable[tuple[Any, ...]]) -> Iterator[Any]:
+    """``fn(*chunk)`` for every chunk on the pool, yielded in submission order."""
+    pool = _acquire_pool(pc)
+    futures = []
+    try:
+        futures = [pool.submit(fn, *chunk) for chunk in chunks]
+        for future in futures:
+            yield future.result()
+    finally:
+        # a consumer that stops early drops only this run's queued chunks
+        for future in futures:
+            future.cancel()
+        _release_pool(pool)
+
+
+def shutdown_pool() -> None:
+    global _POOL, _POOL_KEY
+    with _POOL_LOCK:
+        pools = set(_POOL_USERS)
+        if _POOL is not None:
+            pools.add(_POOL)
+        _POOL_USERS.clear()
+        _POOL, _POOL_KEY = None, None
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,452 @@
+"""Postgres history of generated plans.
+
+Each computed plan is written in one transaction: a ``plans`` row, then its draft
+candidates, weekly-plan entries, approval queue and export jobs through ``COPY``
+(one streamed statement per table instead of a round-trip per row). Tables are
+partitioned by month of ``plan_date`` (see ``app.core.db``); partitions are
+created on first use. Streamed runs are written in batches as their events pass
+and committed when the stream completes.
+
+Reads fetch a plan by id, or the latest one, with an indexed lookup per table, so
+the dashboard never has to re-plan to show the current schedule.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, Iterator
+from zoneinfo import ZoneInfo
+
+import psycopg
+
+from app.core.db import DATABASE_URL, ensure_plan_partitions, get_async_conn, get_conn
+from app.core.instrumentation import count, span
+from app.core.serialization import dumps
+from app.models.planner import (
+    ApprovalQueueEntry,
+    DraftCandidate,
+    ExportDestination,
+    ExportJob,
+    PlannerResult,
+    WeeklyPlanEntry,
+)
+
+logger = logging.getLogger(__name__)
+
+PLANNER_PLAN_STORE = os.getenv("PLANNER_PLAN_STORE", "1") == "1"
+# rows per COPY when a streamed plan is written as it goes
+PLAN_STORE_COPY_ROWS = int(os.getenv("PLANNER_PLAN_STORE_COPY_ROWS", "1000"))
+
+# per-request or per-process details, not part of the plan
+_TRANSIENT_METADATA = ("timings", "profile", "config_cache", "result_cache", "plan_store")
+
+_INSERT_PLAN_SQL = """
+    INSERT INTO plans (
+        plan_id, plan_date, parent_plan_id, mode, horizon_days, timezone,
+        config_fingerprint, scheduled_slots, total_candidates, metadata
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+"""
+_CANDIDATE_COLUMNS = (
+    "item_id, platform, format, blocked, block_reason, score, score_breakdown,"
+    " suggested_schedule_datetime, dependency_warnings"
+)
+_WEEKLY_COLUMNS = "draft_id, platform, scheduled_datetime"
+_APPROVAL_QUEUE_COLUMNS = "draft_id, item_id, platform, scheduled_datetime, status"
+_EXPORT_JOB_COLUMNS = "job_id, item_id, media_type, ratio, resolution, specs, destinations, needed_by, batch"
+
+_PLAN_COLUMNS = "plan_id, plan_date, created_at, timezone, metadata"
+_GET_PLAN_SQL = f"SELECT {_PLAN_COLUMNS} FROM plans WHERE plan_id = %s;"
+# served by plans_latest_idx: newest partition first, one index entry
+_GET_LATEST_PLAN_SQL = f"SELECT {_PLAN_COLUMNS} FROM plans ORDER BY plan_date DESC, created_at DESC LIMIT 1;"
+_LIST_PLANS_SQL = """
+    SELECT plan_id, plan_date, created_at, parent_plan_id, mode, horizon_days,
+           scheduled_slots, total_candidates
+    FROM plans
+    ORDER BY plan_date DESC, created_at DESC
+    LIMIT %s;
+"""
+_GET_CANDIDATES_SQL = """
+    SELECT item_id, platform, format, blocked, block_reason, score, score_breakdown,
+           suggested_schedule_datetime, dependency_warnings
+    FROM plan_candidates WHERE plan_date = %s AND plan_id = %s ORDER BY position;
+"""
+_GET_WEEKLY_SQL = """
+    SELECT draft_id, platform, scheduled_datetime
+    FROM plan_weekly_entries WHERE plan_date = %s AND plan_id = %s ORDER BY position;
+"""
+_GET_APPROVAL_QUEUE_SQL = """
+    SELECT draft_id, item_id, platform, scheduled_datetime, status
+    FROM plan_approval_queue WHERE plan_date = %s AND plan_id = %s ORDER BY position;
+"""
+_GET_EXPORT_JOBS_SQL = """
+    SELECT job_id, item_id, media_type, ratio, resolution, specs, destinations, needed_by, batch
+    FROM plan_export_jobs WHERE plan_date = %s AND plan_id = %s ORDER BY position;
+"""
+
+
+def _candidate_row(c: DraftCandidate) -> tuple[Any, ...]:
+    return (
+        c.item_id,
+        c.platform,
+        c.format,
+        c.blocked,
+        c.block_reason,
+        c.score,
+        dumps(c.score_breakdown).decode(),
+        c.suggested_schedule_datetime,
+        c.dependency_warnings,
+    )
+
+
+def _weekly_row(e: WeeklyPlanEntry) -> tuple[Any, ...]:
+    return (e.draft_id, e.platform, e.scheduled_datetime)
+
+
+def _approval_queue_row(e: ApprovalQueueEntry) -> tuple[Any, ...]:
+    return (e.draft_id, e.item_id, e.platform, e.scheduled_datetime, e.status)
+
+
+def _export_job_row(j: ExportJob) -> tuple[Any, ...]:
+    return (
+        j.job_id,
+        j.item_id,
+        j.media_type,
+        j.ratio,
+        j.resolution,
+        j.specs,
+        dumps(j.destinations).decode(),
+        j.needed_by,
+        j.batch,
+    )
+
+
+# planner event kind -> (child table, its columns after plan_id, plan_date and position, row builder)
+_CHILD_TABLES: dict[str, tuple[str, str, Callable[[Any], tuple[Any, ...]]]] = {
+    "draft_candidate": ("plan_candidates", _CANDIDATE_COLUMNS, _candidate_row),
+    "weekly_plan": ("plan_weekly_entries", _WEEKLY_COLUMNS, _weekly_row),
+    "approval_queue": ("plan_approval_queue", _APPROVAL_QUEUE_COLUMNS, _approval_queue_row),
+    "export_queue": ("plan_export_jobs", _EXPORT_JOB_COLUMNS, _export_job_row),
+}
+
+
+def plan_store_enabled() -> bool:
+    return PLANNER_PLAN_STORE and bool(DATABASE_URL)
+
+
+def _insert_plan_row(
+    cur: psycopg.Cursor, metadata: dict[str, Any], config_fingerprint: str | None, scheduled: int, candidates: int
+) -> tuple[str, date]:
+    """Insert the ``plans`` row for ``metadata``; returns its (plan_id, plan_date)."""
+    plan_id = metadata.get("plan_id") or uuid.uuid4().hex
+    plan_date = date.fromisoformat(metadata["plan_date"])
+    stored_metadata = {k: v for k, v in metadata.items() if k not in _TRANSIENT_METADATA}
+    stored_metadata["plan_id"] = plan_id
+    cur.execute(
+        _INSERT_PLAN_SQL,
+        (
+            plan_id,
+            plan_date,
+            (metadata.get("replan") or {}).get("parent_plan_id"),
+            metadata.get("mode"),
+            metadata.get("horizon_days"),
+            metadata["timezone"],
+            config_fingerprint,
+            scheduled,
+            candidates,
+            dumps(stored_metadata).decode(),
+        ),
+    )
+    return plan_id, plan_date
+
+
+def save_plan(result: PlannerResult, config_fingerprint: str | None = None) -> str:
+    """Write ``result`` in one transaction and return its plan_id.
+
+    Uses ``metadata["plan_id"]`` when the plan already has one (plans kept for
+    re-planning), otherwise assigns a new id and puts it in the metadata.
+    """
+    metadata = result.metadata
+    ensure_plan_partitions(date.fromisoformat(metadata["plan_date"]))
+    rows = {
+        "draft_candidate": result.draft_candidates,
+        "weekly_plan": result.weekly_plan,
+        "approval_queue": result.approval_queue,
+        "export_queue": result.export_queue,
+    }
+    with span("plan_store.save_plan"), get_conn() as conn:
+        with conn.cursor() as cur:
+            key = _insert_plan_row(
+                cur, metadata, config_fingerprint, len(result.weekly_plan), len(result.draft_candidates)
+            )
+            for kind, (table, columns, to_row) in _CHILD_TABLES.items():
+                with cur.copy(f"COPY {table} (plan_id, plan_date, position, {columns}) FROM STDIN") as copy:
+                    for position, entry in enumerate(rows[kind]):
+                        copy.write_row((*key, position, *to_row(entry)))
+        conn.commit()
+    metadata["plan_id"] = key[0]
+    count("plans_stored")
+    return key[0]
+
+
+def store_plan(result: PlannerResult, config_fingerprint: str | None = None) -> None:
+    """``save_plan`` when the store is enabled; failures are logged, not raised.
+
+    Sets ``metadata["plan_store"]`` to ``{"enabled", "stored"}``.
+    """
+    if not plan_store_enabled():
+        result.metadata["plan_store"] = {"enabled": False, "stored": False}
+        return
+    try:
+        save_plan(result, config_fingerprint)
+        stored = True
+    except psycopg.Error:
+        logger.warning("Could not store plan; it is returned but not kept", exc_info=True)
+        count("plan_store_errors")
+        stored = False
+    result.metadata["plan_store"] = {"enabled": True, "stored": stored}
+
+
+class _StreamedPlanWriter:
+    """Writes a plan's rows while its events stream past.
+
+    Rows go out in ``COPY`` batches of ``PLAN_STORE_COPY_ROWS`` into per-transaction
+    temp tables, as the plan's key (plan_id, and the plan_date partition) is only
+    known from the final metadata event; ``commit`` then moves them into the plan
+    tables server-side. At most one batch is held in memory, and one pooled
+    connection for the length of the stream.
+    """
+
+    def __init__(self) -> None:
+        self._conn_cm = get_conn()
+        self._conn = self._conn_cm.__enter__()
+        self._staged: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._kind: str | None = None
+        self._batch: list[tuple[Any, ...]] = []
+
+    def add(self, kind: str, payload: Any) -> None:
+        if kind != self._kind or len(self._batch) >= PLAN_STORE_COPY_ROWS:
+            self._flush()
+            self._kind = kind
+        position = self._positions.get(kind, 0)
+        self._positions[kind] = position + 1
+        self._batch.append((position, *_CHILD_TABLES[kind][2](_as_model(kind, payload))))
+
+    def _flush(self) -> None:
+        if not self._batch:
+            return
+        table, columns, _ = _CHILD_TABLES[self._kind]
+        with self._conn.cursor() as cur:
+            if table not in self._staged:
+                # column types without the NOT NULL key columns; dropped with the transaction
+                cur.execute(
+                    f"CREATE TEMP TABLE {table}_staged ON COMMIT DROP AS"
+                    f" SELECT position, {columns} FROM {table} WITH NO DATA;"
+                )
+                self._staged.append(table)
+            with cur.copy(f"COPY {table}_staged (position, {columns}) FROM STDIN") as copy:
+                for row in self._batch:
+                    copy.write_row(row)
+        self._batch = []
+
+    def commit(self, metadata: dict[str, Any], config_fingerprint: str | None) -> str:
+        self._flush()
+        ensure_plan_partitions(date.fromisoformat(metadata["plan_date"]))
+        with self._conn.cursor() as cur:
+            key = _insert_plan_row(
+                cur,
+                metadata,
+                config_fingerprint,
+                self._positions.get("weekly_plan", 0),
+                self._positions.get("draft_candidate", 0),
+            )
+            for kind, (table, columns, _) in _CHILD_TABLES.items():
+                if table in self._staged:
+                    cur.execute(
+                        f"INSERT INTO {table} (plan_id, plan_date, position, {columns})"
+                        f" SELECT %s, %s, position, {columns} FROM {table}_staged;",
+                        key,
+                    )
+        self._conn.commit()
+        metadata["plan_id"] = key[0]
+        count("plans_stored")
+        return key[0]
+
+    def close(self) -> None:
+        """Release the connection; anything not committed is rolled back."""
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            conn.rollback()
+        finally:
+            self._conn_cm.__exit__(None, None, None)
+
+
+def _as_model(kind: str, payload: Any) -> Any:
+    # candidates stream as models, the queues and weekly entries as dicts
+    if kind == "weekly_plan":
+        return WeeklyPlanEntry.model_construct(**payload)
+    if kind == "approval_queue":
+        return ApprovalQueueEntry.model_construct(**payload)
+    if kind == "export_queue":
+        return ExportJob.model_construct(
+            **{**payload, "destinations": [ExportDestination.model_construct(**d) for d in payload["destinations"]]}
+        )
+    return payload
+
+
+def iter_and_store_plan(
+    events: Iterator[tuple[str, Any]], config_fingerprint: str | None = None, complete: bool = True
+) -> Iterator[tuple[str, Any]]:
+    """Pass ``iter_planner_events`` through, storing the plan before its final metadata event.
+
+    Rows are written as they pass (see ``_StreamedPlanWriter``) and committed with
+    the metadata; a stream that stops early leaves nothing behind. Streams trimmed
+    of blocked candidates or breakdowns (``complete=False``) are not stored. A
+    database error stops the writes, never the stream.
+    """
+    enabled = plan_store_enabled()
+    writer = None
+    failed = False
+    try:
+        for kind, payload in events:
+            if kind == "metadata":
+                stored = False
+                if writer is not None and not failed:
+                    try:
+                        # plan_id and plan_store land in the metadata event itself
+                        writer.commit(payload, config_fingerprint)
+                        stored = True
+                    except psycopg.Error:
+                        logger.warning("Could not store streamed plan; it is returned but not kept", exc_info=True)
+                        failed = True
+                if failed:
+                    count("plan_store_errors")
+                payload["plan_store"] = {"enabled": enabled, "stored": stored}
+            elif complete and enabled and not failed:
+                try:
+                    if writer is None:
+                        writer = _StreamedPlanWriter()
+                    writer.add(kind, payload)
+                except psycopg.Error:
+                    logger.warning("Could not store streamed plan; it is returned but not kept", exc_info=True)
+                    failed = True
+            yield kind, payload
+    finally:
+        if writer is not None:
+            try:
+                writer.close()
+            except psycopg.Error:
+                logger.warning("Could not release the plan store connection", exc_info=True)
+
+
+def _local_iso(value: datetime | None, tz: ZoneInfo) -> str | None:
+    # plans carry local wall times with their offset, as the planner produced them
+    return value.astimezone(tz).isoformat() if value is not None else None
+
+
+async def load_plan_async(plan_id: str | None = None, include_candidates: bool = True) -> PlannerResult | None:
+    """Stored plan ``plan_id``, or the latest one; None when there is no such plan."""
+    with span("plan_store.load_plan_async"):
+        async with get_async_conn() as conn:
+            async with conn.cursor() as cur:
+                if plan_id is None:
+                    await cur.execute(_GET_LATEST_PLAN_SQL)
+                else:
+                    await cur.execute(_GET_PLAN_SQL, (plan_id,))
+                plan = await cur.fetchone()
+                if plan is None:
+                    return None
+                plan_id, plan_date, created_at, timezone, metadata = plan
+                tz = ZoneInfo(timezone)
+                key = (plan_date, plan_id)
+
+                candidates = []
+                if include_candidates:
+                    await cur.execute(_GET_CANDIDATES_SQL, key)
+                    candidates = [
+                        DraftCandidate.model_construct(
+                            item_id=item_id,
+                            platform=platform,
+                            format=fmt,
+                            blocked=blocked,
+                            block_reason=block_reason,
+                            score=score,
+                            score_breakdown=breakdown,
+                            suggested_schedule_datetime=_local_iso(suggested, tz),
+                            dependency_warnings=warnings,
+                        )
+                        for item_id, platform, fmt, blocked, block_reason, score, breakdown, suggested, warnings in (
+                            await cur.fetchall()
+                        )
+                    ]
+                await cur.execute(_GET_WEEKLY_SQL, key)
+                weekly_plan = [
+                    WeeklyPlanEntry.model_construct(
+                        draft_id=draft_id, platform=platform, scheduled_datetime=_local_iso(scheduled, tz)
+                    )
+                    for draft_id, platform, scheduled in await cur.fetchall()
+                ]
+                await cur.execute(_GET_APPROVAL_QUEUE_SQL, key)
+                approval_queue = [
+                    ApprovalQueueEntry.model_construct(
+                        draft_id=draft_id,
+                        item_id=item_id,
+                        platform=platform,
+                        scheduled_datetime=_local_iso(scheduled, tz),
+                        status=status,
+                    )
+                    for draft_id, item_id, platform, scheduled, status in await cur.fetchall()
+                ]
+                await cur.execute(_GET_EXPORT_JOBS_SQL, key)
+                export_queue = [
+                    ExportJob.model_construct(
+                        job_id=job_id,
+                        item_id=item_id,
+                        media_type=media_type,
+                        ratio=ratio,
+                        resolution=resolution,
+                        specs=specs,
+                        destinations=[ExportDestination.model_construct(**d) for d in destinations],
+                        needed_by=_local_iso(needed_by, tz),
+                        batch=batch,
+                    )
+                    for job_id, item_id, media_type, ratio, resolution, specs, destinations, needed_by, batch in (
+                        await cur.fetchall()
+                    )
+                ]
+
+    metadata["plan_store"] = {"stored_at": created_at.isoformat(), "include_candidates": include_candidates}
+    return PlannerResult.model_construct(
+        draft_candidates=candidates,
+        weekly_plan=weekly_plan,
+        approval_queue=approval_queue,
+        export_queue=export_queue,
+        metadata=metadata,
+    )
+
+
+async def list_plans_async(limit: int = 20) -> list[dict[str, Any]]:
+    """Newest stored plans first, without their rows."""
+    with span("plan_store.list_plans_async"):
+        async with get_async_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(_LIST_PLANS_SQL, (limit,))
+                rows = await cur.fetchall()
+    return [
+        {
+            "plan_id": plan_id,
+            "plan_date": plan_date.isoformat(),
+            "created_at": created_at.isoformat(),
+            "parent_plan_id": parent_plan_id,
+            "mode": mode,
+            "horizon_days": horizon_days,
+            "scheduled_slots": scheduled_slots,
+            "total_candidates": total_candidates,
+        }
+        for plan_id, plan_date, created_at, parent_plan_id, mode, horizon_days, scheduled_slots, total_candidates in rows
+    ]
@@ -1,172 +1,84 @@
-from datetime import datetime, timedelta
-from typing import Any
-
-from app.models.planner import DraftCandidate, Item, PlannerResult
-
-from app.services.approvals_store import get_all_approvals
-
-def _eligibility_rules_for(item: Item, eligibility_cfg: dict) -> dict:
-    by_type = (eligibility_cfg.get("by_item_type") or {})
-    defaults = (eligibility_cfg.get("defaults") or {})
-    rules = dict(defaults)
-    rules.update(by_type.get(item.item_type, {}))
-    return rules
-
-
-def _is_within_event_window(item: Item, now: datetime, rules: dict) -> bool:
-    if not item.event_start:
-        return True  # no event anchor → always eligible unless other rules block
-
-    event_dt = item.event_start
-
-    # Pre-event bounds
-    pre_earliest = rules.get("pre_event_earliest_days")
-    pre_latest = rules.get("pre_event_latest_days")
-
-    if now <= event_dt:
-        if pre_earliest is not None:
-            if now < event_dt - timedelta(days=int(pre_earliest)):
-                return False
-        if pre_latest is not None:
-            if now > event_dt - timedelta(days=int(pre_latest)):
-                return False
-
-    # Post-event bounds
-    post_earliest = rules.get("post_event_earliest_days")
-    post_latest = rules.get("post_event_latest_days")
-
-    if now > event_dt:
-        if post_earliest is not None:
-            if now < event_dt + timedelta(days=int(post_earliest)):
-                return False
-        if post_latest is not None:
-            if now > event_dt + timedelta(days=int(post_latest)):
-                return False
-
-    return True
-
-
-def _already_scheduled_count(
-    item: Item,
-    platform: str,
-    scheduled: list[DraftCandidate],
-    window_start: datetime | None,
-    window_end: datetime | None,
-) -> int:
-    count = 0
-    for s in scheduled:
-        if s.item_id != item.id:
-            continue
-        if s.platform != platform:
-            continue
-
-        scheduled_dt_raw = getattr(s, "suggested_schedule_datetime", None)
-        if not scheduled_dt_raw:
-            continue
-
-        scheduled_dt = datetime.fromisoformat(scheduled_dt_raw)
-
-        if window_start and scheduled_dt < window_start:
-            continue
-        if window_end and scheduled_dt > window_end:
-            continue
-
-        count += 1
-    return count
-
-
-def _next_monday(d: datetime) -> datetime:
-    # Monday = 0
-    days_ahead = (0 - d.weekday()) % 7
-    return (d + timedelta(days=days_ahead)).replace(hour=0, minute=0, second=0, microsecond=0)
-
-
-def _iter_mondays(start: datetime, end: datetime) -> list[datetime]:
-    mondays: list[datetime] = []
-    cur = _next_monday(start)
-    while cur <= end:
-        mondays.append(cur)
-        cur = cur + timedelta(days=7)
-    return mondays
-
-
-def _resolve_field_path(item: Item, field_path: str) -> Any:
-    # supports paths like "item.links.eventbrite"
-    parts = field_path.split(".")
-    if not parts or parts[0] != "item":
-        return None
-
-    value: Any = item
-    for part in parts[1:]:
-        if value is None:
-            return None
-        value = getattr(value, part, None)
-    return value
-
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence
+
+from app.core.instrumentation import Trace
+from app.models.planner import ApprovalQueueEntry, ExportDestination, ExportJob, Item, PlannerResult, WeeklyPlanEntry
+
+from app.services.approvals_store import get_approval_statuses
+from app.services.batch_scoring import BATCH_MIN_ITEMS, numpy_available, score_items_batch
+from app.services.audience_affinity import AudienceSet
+from app.services.campaign_phases import PhaseBoost, build_campaign_calendar
+from app.services.candidate_store import CandidateStore
+from app.services.export_planner import build_export_queue
+from app.services.pass1_pool import PARALLEL_CHUNK_ITEMS, PARALLEL_WORKERS, map_chunks, worker_config
+from app.services.cadence_scheduler import ExtraPostGate, assign_slots, resolve_schedule_options
+from app.services.planner_config import (
+    EligibilityRules,
+    PlannerConfig,
+    map_item_type_to_fit_key,
+    pick_primary_objective,
+)
+from app.services.slot_calendar import (
+    BASELINE_ONLY,
+    build_slots,
+    calendar_cache_stats,
+    local_now,
+    local_ordinal,
+)
+from app.services.slot_engine import (
+    EligibilityWindow,
+    PlatformSlotPicker,
+    ScheduleLedger,
+    SlotCandidate,
+    build_slot_candidate,
+    engine_stats,
+    urgency_for_days,
+)
+
+
+@dataclass(frozen=True)
+class PlanReuse:
+    """What a re-plan may take over from the previous run of the same plan.
+
+    ``pass1`` maps an item's JSON to its stored pass-1 rows; only items whose JSON
+    is unchanged hit it. In baseline_only mode, slots before the first one a dirty
+    item or draft could affect keep their entry from ``schedule``; the flow modes
+    recompute the whole schedule.
+    """
 
-def _check_clause(item: Item, clause: dict[str, Any]) -> bool:
-    field = clause.get("field")
-    if not field:
-        return False
+    pass1: Mapping[str, list[list[Any]]]
+    schedule: Sequence[tuple[int, str]]
+    top_scores: Mapping[str, float]
+    dirty_items: frozenset[str]
+    # statuses the previous run saw; drafts whose rejection changed since are dirty
+    approvals: Mapping[str, str]
 
-    value = _resolve_field_path(item, field)
 
-    if "exists" in clause:
-        exists = bool(clause.get("exists"))
-        present = value is not None and value != ""
-        return present == exists
+def rejection_changes(before: Mapping[str, str], after: Mapping[str, str]) -> frozenset[str]:
+    """Drafts rejected in exactly one of ``before`` and ``after``: only a change in
+    or out of "rejected" can move the schedule."""
+    return frozenset(
+        d for d in before.keys() | after.keys() if (before.get(d) == "rejected") != (after.get(d) == "rejected")
+    )
 
-    if "gte" in clause:
-        try:
-            return value is not None and float(value) >= float(clause["gte"])
-        except (TypeError, ValueError):
-            return False
 
-    return False
+def _eligibility_rules_for(item: Item, pc: PlannerConfig) -> EligibilityRules:
+    return pc.eligibility_rules_for(item.item_type)
 
 
 def _evaluate_dependencies(
-    item: Item,
-    platform: str,
-    fmt: str,
-    dependency_rules: list[dict[str, Any]],
+    item: Item, platform: str, fmt: str, pc: PlannerConfig, counters: dict[str, int] | None = None
 ) -> tuple[bool, str | None]:
-    for rule in dependency_rules:
-        when = rule.get("when") or {}
-
-        when_platform = when.get("platform")
-        when_item_type = when.get("item_type")
-        when_format = when.get("format")
-
-        if when_platform and when_platform != platform:
-            continue
-        if when_item_type and when_item_type != item.item_type:
-            continue
-        if when_format and when_format != fmt:
-            continue
-
-        req = rule.get("require") or {}
-        all_clauses = req.get("all") or []
-        any_clauses = req.get("any") or []
-
-        all_ok = all(_check_clause(item, clause) for clause in all_clauses) if all_clauses else True
-        any_ok = any(_check_clause(item, clause) for clause in any_clauses) if any_clauses else True
-
-        if not (all_ok and any_ok):
-            on_fail = rule.get("on_fail") or {}
-            if on_fail.get("blocked", False):
-                return True, on_fail.get("message") or f"Blocked by dependency rule: {rule.get('id', 'unknown')}"
-
-    return False, None
+    return pc.dependency_engine.evaluate(item, platform, fmt, counters)
 
 
 # ======================
 # Pass 1 Scoring Helpers
 # ======================
 
-from datetime import timezone
-
-
 def _parse_objective_weights(objectives):
     out = {}
     for obj in objectives or []:
@@ -180,110 +92,67 @@ def _parse_objective_weights(objectives):
     return out
 
 
-def _pick_primary_objective(item):
-    t = (item.item_type or "").lower()
-    if t in {"youtube_upload", "youtube"}:
-        return "youtube_growth"
-    if t in {"event", "event_promo", "meetup"}:
-        return "event_attendance"
-    if t in {"deadline", "callout_deadline", "submission_deadline"}:
-        return "submission_deadline"
-    if t in {"news", "major_news"}:
-        return "community_engagement"
-    if t in {"bts", "behind_the_scenes", "update"}:
-        return "community_engagement"
-    return None
-
-def _map_item_type_to_fit_key(item_type: str) -> str:
-    t = (item_type or "").lower()
-
-    # direct matches
-    if t in {"event", "bts", "news", "recap", "merch", "film"}:
-        return t
-
-    # common aliases
-    if t in {"youtube_upload", "youtube"}:
-        return "film"
-    if t in {"deadline", "callout_deadline", "submission_deadline"}:
-        return "news"  # deadlines behave like news/announcements
-    if t in {"update", "behind_the_scenes"}:
-        return "bts"
-
-    # fallback
-    return "news"
-
-
-def _calc_urgency(item, ref_dt):
-    if not item.event_start:
-        return 3.0
-
-    event_dt = item.event_start
-    if event_dt.tzinfo is None:
-        event_dt = event_dt.replace(tzinfo=timezone.utc)
-    if ref_dt.tzinfo is None:
-        ref_dt = ref_dt.replace(tzinfo=timezone.utc)
-
-    days_until = (event_dt.date() - ref_dt.date()).days
-
-    if days_until < 0:
-        return 0.0
-    if days_until == 0:
-        return 30.0
-    if days_until <= 3:
-        return 25.0
-    if days_until <= 7:
-        return 20.0
-    if days_until <= 14:
-        return 12.0
-    if days_until <= 30:
-        return 6.0
-    return 2.0
-
-
-def _get_platform_base_weight(cfg, platform):
-    pw = cfg.get("platform_weights") or {}
-    weights = pw.get("weights") or {}
-    p = weights.get(platform) or {}
-    try:
-        return float(p.get("base_weight", 0))
-    except (TypeError, ValueError):
-        return 0.0
-    
-def _get_format_bias(cfg, platform, fmt):
-    pw = cfg.get("platform_weights") or {}
-    weights = pw.get("weights") or {}
-    p = weights.get(platform) or {}
-    biases = p.get("format_biases") or {}
-    try:
-        return float(biases.get(fmt, 0))
-    except (TypeError, ValueError):
-        return 0.0
-
-
-def _get_content_fit(cfg, platform, item_type):
-    sr = cfg.get("scoring_rules") or {}
-    cf = sr.get("content_fit") or {}
-    plat_map = cf.get(platform) or {}
-
-    fit_key = _map_item_type_to_fit_key(item_type)
-
-    try:
-        return float(plat_map.get(fit_key, 0))
-    except (TypeError, ValueError):
-        return 0.0
-
-
-def _score_candidate(item, platform, fmt, cfg, objectives, ref_dt):
-    urgency = _calc_urgency(item, ref_dt)
-    objective_weights = _parse_objective_weights(objectives)
-    obj_key = _pick_primary_objective(item)
+def _calc_urgency(event_ordinal: int | None, ref_ordinal: int) -> float:
+    # both are local calendar days, so this is a plain day count
+    return urgency_for_days(None if event_ordinal is None else event_ordinal - ref_ordinal)
+
+
+def _get_platform_base_weight(pc: PlannerConfig, platform):
+    return pc.base_weights.get(platform, 0.0)
+
+
+def _get_format_bias(pc: PlannerConfig, platform, fmt):
+    return pc.format_biases.get((platform, fmt), 0.0)
+
+
+def _get_content_fit(pc: PlannerConfig, platform, item_type):
+    return pc.content_fit.get((platform, map_item_type_to_fit_key(item_type)), 0.0)
+
+
+def _static_score_parts(
+    item, platform, fmt, pc: PlannerConfig, objective_weights, audience_set: AudienceSet | None = None
+):
+    """Slot-independent score components: everything except urgency.
+
+    Pass the item's interned ``audience_set`` when scoring many of its candidates.
+    """
+    obj_key = pick_primary_objective(item)
     obj_score = float(objective_weights.get(obj_key, 0.0)) if obj_key else 0.0
 
-    platform_score = _get_platform_base_weight(cfg, platform)
-    format_bias = _get_format_bias(cfg, platform, fmt)
-    content_fit = _get_content_fit(cfg, platform, item.item_type)
+    platform_score = _get_platform_base_weight(pc, platform)
+    format_bias = _get_format_bias(pc, platform, fmt)
+    content_fit = _get_content_fit(pc, platform, item.item_type)
+    if audience_set is None:
+        audience_set = pc.audience_affinity.intern(item.audiences)
+    audience = audience_set.points.get(platform, 0.0)
+    return obj_key, (obj_score, platform_score, format_bias, content_fit, audience)
+
+
+def _score_candidate(
+    item,
+    platform,
+    fmt,
+    pc: PlannerConfig,
+    objective_weights,
+    event_ordinal,
+    ref_ordinal,
+    with_breakdown=True,
+    boost: PhaseBoost | None = None,
+    audience_set: AudienceSet | None = None,
+):
+    urgency = _calc_urgency(event_ordinal, ref_ordinal)
+    if audience_set is None:
+        audience_set = pc.audience_affinity.intern(item.audiences)
+    obj_key, (obj_score, platform_score, format_bias, content_fit, audience) = _static_score_parts(
+        item, platform, fmt, pc, objective_weights, audience_set
+    )
 
-    total = urgency + obj_score + platform_score + format_bias + content_fit
+    total = urgency + obj_score + platform_score + format_bias + content_fit + audience
+    # campaign phases scale the whole score, after the same summation as SlotCandidate.score_at
+    if boost is not None:
+        total *= boost.multiplier(ref_ordinal)
+    if not with_breakdown:
+        return total, {}
 
     breakdown = {
         "urgency": urgency,
@@ -291,25 +160,16 @@ def _score_candidate(item, platform, fmt, cfg, objectives, ref_dt):
         "platform": platform_score,
         "format_bias": format_bias,
         "content_fit": content_fit,
-        "total": total,
+        "audience": {"audiences": list(audience_set.audiences), "score": audience},
     }
+    campaign = boost.breakdown(ref_ordinal) if boost is not None else None
+    if campaign is not None:
+        breakdown["campaign"] = campaign
+    breakdown["total"] = total
     return total, breakdown
 
 
-def run_planner(
-    *,
-    items: list[Item] | None = None,
-    campaigns: list[dict[str, Any]] | None = None,
-    objectives: list[dict[str, Any]] | None = None,
-    configs: dict[str, Any] | None = None,
-) -> PlannerResult:
-    """Milestone A+B planner scaffold.
-
-    Generates draft candidates and applies dependency gating only.
-    Scoring/scheduling/export logic intentionally not implemented.
-    """
-    items = items or []
-
+def _coerce_items(items: list[Item | dict[str, Any]]) -> list[Item]:
     # Coerce incoming dict items (API payload) into Item models
     coerced_items: list[Item] = []
     for it in items:
@@ -317,230 +177,322 @@ def run_planner(
             coerced_items.append(it)
         else:
             coerced_items.append(Item.model_validate(it))
-    items = coerced_items
-
-    campaigns = campaigns or []
-    objectives = objectives or []
-    configs = configs or {}
-
-    planner_settings = configs.get("planner_settings_v1") or {}
-    cooldowns = planner_settings.get("cooldowns") or {}
-    push_windows = planner_settings.get("push_windows") or {}
-    eligibility_cfg = configs.get("eligibility_windows_v1", {})
-
-    stored_approvals = get_all_approvals()
-
-    formats_by_platform: dict[str, list[str]] = (
-        ((configs.get("scoring_rules") or {}).get("candidate_generation") or {}).get("formats_by_platform") or {}
-    )
-    dependency_rules: list[dict[str, Any]] = ((configs.get("dependency_rules") or {}).get("rules") or [])
-
-    draft_candidates: list[DraftCandidate] = []
-
-    now_utc = datetime.utcnow()
-
-    for item in items:
-        for platform, formats in formats_by_platform.items():
-            for fmt in formats:
-                blocked, block_reason = _evaluate_dependencies(item, platform, fmt, dependency_rules)
-
-                score, breakdown = _score_candidate(
-                    item=item,
-                    platform=platform,
-                    fmt=fmt,
-                    cfg=configs,
-                    objectives=objectives,
-                    ref_dt=now_utc,
-                )
-
-                draft_candidates.append(
-                    DraftCandidate(
-                        item_id=item.id,
+    return coerced_items
+
+
+def _generate_candidates(
+    items: list[Item],
+    pc: PlannerConfig,
+    objective_weights: dict[str, float],
+    event_ordinals: list[int | None],
+    ref_ordinal: int,
+    batch,
+    reused: Mapping[int, list[list[Any]]] | None = None,
+    batch_rows: Mapping[int, int] | None = None,
+    row_boosts: Sequence[Mapping[str, PhaseBoost] | None] | None = None,
+    trace: Trace | None = None,
+) -> CandidateStore:
+    """Pass 1: Item × platform × format candidates, dependency gating and scoring.
+
+    Items in ``reused`` take their stored pass-1 rows as-is; ``batch_rows`` maps the
+    remaining items to their rows in ``batch``. ``row_boosts`` holds each item's
+    campaign phase boosts by platform. Breakdowns are left for ``_materialize`` so
+    only candidates that reach the response pay for them.
+    """
+    trace = trace or Trace()
+    store = CandidateStore(items, pc.columns, ref_ordinal)
+    scores = store.scores
+    n_columns = store.n_columns
+
+    fresh = []
+    for row in range(len(items)):
+        stored = reused.get(row) if reused else None
+        if stored is not None:
+            store.load_row(row, stored)
+        else:
+            fresh.append(row)
+
+    counters: dict[str, int] = {}
+    with trace.span("gating"):
+        for row in fresh:
+            item = items[row]
+            for col, (platform, fmt) in enumerate(pc.columns):
+                blocked, block_reason = _evaluate_dependencies(item, platform, fmt, pc, counters)
+                if blocked:
+                    store.set_blocked(row * n_columns + col, block_reason)
+    for name, value in counters.items():
+        trace.count(name, value)
+
+    with trace.span("scoring"):
+        for row in fresh:
+            item = items[row]
+            batch_row = batch_rows[row] if batch_rows is not None else row
+            boosts = row_boosts[row] if row_boosts is not None else None
+            audience_set = pc.audience_affinity.intern(item.audiences) if batch is None else None
+            i = row * n_columns
+            for col, (platform, fmt) in enumerate(pc.columns):
+                boost = boosts.get(platform) if boosts else None
+                if batch is not None:
+                    scores[i] = batch.score(batch_row, col)
+                    if boost is not None:
+                        scores[i] *= boost.multiplier(ref_ordinal)
+                else:
+                    scores[i], _ = _score_candidate(
+                        item=item,
                         platform=platform,
-                        format=fmt,
-                        blocked=blocked,
-                        block_reason=block_reason,
-                        score=score,
-                        score_breakdown=breakdown,
+                        fmt=fmt,
+                        pc=pc,
+                        objective_weights=objective_weights,
+                        event_ordinal=event_ordinals[row],
+                        ref_ordinal=ref_ordinal,
+                        with_breakdown=False,
+                        boost=boost,
+                        audience_set=audience_set,
                     )
+                i += 1
+    return store
+
+
+def _pass1_chunk(
+    items: list[Item],
+    objective_weights: dict[str, float],
+    event_ordinals: list[int | None],
+    ref_ordinal: int,
+    use_batch: bool,
+    row_boosts: list[Mapping[str, PhaseBoost] | None] | None = None,
+) -> tuple[bytearray, dict[int, str | None], bytes, dict[str, Any]]:
+    """Pool task: pass 1 for one chunk of items, with the worker's PlannerConfig."""
+    pc = worker_config()
+    batch = score_items_batch(items, pc, objective_weights, ref_ordinal, event_ordinals) if use_batch else None
+    trace = Trace()
+    store = _generate_candidates(
+        items, pc, objective_weights, event_ordinals, ref_ordinal, batch, row_boosts=row_boosts, trace=trace
+    )
+    return store.blocked, store.block_reasons, store.scores.tobytes(), trace.summary()
+
+
+def _generate_candidates_parallel(
+    items: list[Item],
+    pc: PlannerConfig,
+    objective_weights: dict[str, float],
+    event_ordinals: list[int | None],
+    ref_ordinal: int,
+    use_batch: bool,
+    score_rows: list[int],
+    reused: Mapping[int, list[list[Any]]],
+    trace: Trace,
+    row_boosts: Sequence[Mapping[str, PhaseBoost] | None] | None = None,
+) -> CandidateStore:
+    """``_generate_candidates`` with the ``score_rows`` split into chunks on the pass-1 pool.
+
+    Every candidate depends only on its own item, and chunks are merged back in
+    submission order, so the store matches the serial one exactly.
+    """
+    store = CandidateStore(items, pc.columns, ref_ordinal)
+    n_columns = store.n_columns
+    for row, stored in reused.items():
+        store.load_row(row, stored)
+
+    chunks = [score_rows[i:i + PARALLEL_CHUNK_ITEMS] for i in range(0, len(score_rows), PARALLEL_CHUNK_ITEMS)]
+    tasks = (
+        (
+            [items[row] for row in rows],
+            objective_weights,
+            [event_ordinals[row] for row in rows],
+            ref_ordinal,
+            use_batch,
+            [row_boosts[row] for row in rows] if row_boosts is not None else None,
+        )
+        for rows in chunks
+    )
+    for rows, (blocked, block_reasons, score_bytes, summary) in zip(chunks, map_chunks(pc, _pass1_chunk, tasks)):
+        scores = array("d")
+        scores.frombytes(score_bytes)
+        for local_row, row in enumerate(rows):
+            src, dst = local_row * n_columns, row * n_columns
+            store.blocked[dst:dst + n_columns] = blocked[src:src + n_columns]
+            store.scores[dst:dst + n_columns] = scores[src:src + n_columns]
+        for local_i, reason in block_reasons.items():
+            store.block_reasons[rows[local_i // n_columns] * n_columns + local_i % n_columns] = reason
+        for name, value in summary["counters"].items():
+            trace.count(name, value)
+        # CPU time summed over workers, not wall time
+        for name, ms in summary["spans_ms"].items():
+            trace.add(f"pool_{name}", ms / 1000)
+    return store
+
+
+def _materialize(
+    store: CandidateStore,
+    i: int,
+    pc: PlannerConfig,
+    objective_weights,
+    event_ordinals,
+    with_breakdown,
+    row_boosts=None,
+    audience_sets: Sequence[AudienceSet] | None = None,
+):
+    breakdown = {}
+    if with_breakdown:
+        item = store.item(i)
+        platform, fmt = store.column(i)
+        row = i // store.n_columns
+        boosts = row_boosts[row] if row_boosts is not None else None
+        _, breakdown = _score_candidate(
+            item=item,
+            platform=platform,
+            fmt=fmt,
+            pc=pc,
+            objective_weights=objective_weights,
+            event_ordinal=event_ordinals[row],
+            ref_ordinal=store.score_ordinals[i],
+            boost=boosts.get(platform) if boosts else None,
+            audience_set=audience_sets[row] if audience_sets is not None else None,
+        )
+    return store.materialize(i, breakdown)
+
+
+def _phase_boosted(cand: SlotCandidate, slot_dt: datetime) -> bool:
+    return cand.boost is not None and cand.boost.boosted(slot_dt.toordinal())
+
+
+def _iter_schedule(
+    items: list[Item],
+    store: CandidateStore,
+    pc: PlannerConfig,
+    objective_weights: dict[str, float],
+    stored_approvals: dict[str, str],
+    event_ordinals: list[int | None],
+    now_local: datetime,
+    pickers: dict[str, PlatformSlotPicker],
+    mode: str,
+    horizon_days: int,
+    schedule_stats: dict[str, Any],
+    reuse: PlanReuse | None = None,
+    state_out: dict[str, Any] | None = None,
+    trace: Trace | None = None,
+    row_boosts: Sequence[Mapping[str, PhaseBoost] | None] | None = None,
+    audience_sets: Sequence[AudienceSet] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Milestone C: cadence scheduling across all platforms. Yields weekly plan entries."""
+    trace = trace or Trace()
+    setup_started = time.perf_counter()
+    slots = build_slots(pc, now_local, horizon_days, mode)
+    tz = now_local.tzinfo
+
+    last_scheduled: dict[tuple[str, str], int] = {}
+    ledger = ScheduleLedger()
+    # eligibility intervals depend only on the item, so build them once per item
+    windows: dict[str, EligibilityWindow] = {}
+
+    n_columns = store.n_columns
+    for platform in dict.fromkeys(slot.platform for slot in slots):
+        platform_columns = [(col, fmt) for col, (p, fmt) in enumerate(store.columns) if p == platform]
+        slot_candidates = []
+        for row, it in enumerate(items):
+            rules = window = None
+            boosts = row_boosts[row] if row_boosts is not None else None
+            boost = boosts.get(platform) if boosts else None
+            for col, fmt in platform_columns:
+                idx = row * n_columns + col
+                if store.blocked[idx] or stored_approvals.get(f"{it.id}:{platform}:{fmt}") == "rejected":
+                    continue
+                if rules is None:
+                    rules = _eligibility_rules_for(it, pc)
+                    window = windows.get(it.id)
+                    if window is None:
+                        window = windows[it.id] = EligibilityWindow.for_item(it, rules, tz)
+                _, static_parts = _static_score_parts(
+                    it, platform, fmt, pc, objective_weights, audience_sets[row] if audience_sets is not None else None
                 )
-
-    # ======================
-    # Milestone C: Baseline scheduling (Mondays only)
-    # ======================
-
-    weekly_plan: list[dict[str, Any]] = []
-
-    horizon_days = 28
-    horizon_end = now_utc + timedelta(days=horizon_days)
-
-    mondays = _iter_mondays(now_utc, horizon_end)
-
-    # Build a quick lookup of items by id for re-scoring
-    item_by_id = {it.id: it for it in items}
-
-    def _cooldown_days_for(it: Item, platform: str, slot_dt: datetime) -> int:
-        # base cooldown
-        base = int((cooldowns.get(platform) or 14))
-
-        # ramp-up overrides for events near the date
-        # only applies if item has event_start
-        if it.event_start:
-            days_until = (it.event_start.date() - slot_dt.date()).days
-
-            level = (it.push_level or "normal").lower()
-            windows = push_windows.get(level) or {}
-
-            within_days = windows.get("within_days")
-            override = windows.get("cooldown_days")
-
-            if isinstance(within_days, int) and isinstance(override, int):
-                if 0 <= days_until <= within_days:
-                    return override
-
-        return base
-    
-    last_scheduled: dict[tuple[str, str], datetime] = {}
-
-    def pick_best_for_slot(platform: str, slot_dt: datetime) -> DraftCandidate | None:
-        eligible: list[DraftCandidate] = []
-
-        for c in draft_candidates:
-            if c.platform != platform or c.blocked:
-                continue
-
-            draft_id = f"{c.item_id}:{c.platform}:{c.format}"
-            if stored_approvals.get(draft_id) == "rejected":
-                continue
-
-            it = item_by_id.get(c.item_id)
-            if not it:
-                continue
-
-            # cooldown key: series if present, else item
-            key_id = it.series_id or it.id
-            key = (key_id, platform)
-
-            cd_days = _cooldown_days_for(it, platform, slot_dt)
-            last = last_scheduled.get(key)
-            if last and (slot_dt - last).days <= cd_days:
-                continue
-            
-
-
-            # -----------------------
-            # Eligibility window gate
-            # -----------------------
-
-            rules = _eligibility_rules_for(it, eligibility_cfg)
-
-            # Event window check (use slot_dt as reference time)
-            if not _is_within_event_window(it, slot_dt, rules):
-                continue
-
-            # Per-platform max posts in window
-            max_posts = rules.get("max_posts_per_platform_in_window")
-
-            if max_posts is not None:
-                event_dt = it.event_start
-                window_start = None
-                window_end = None
-
-                if event_dt:
-                    if rules.get("pre_event_earliest_days") is not None:
-                        window_start = event_dt - timedelta(
-                            days=int(rules.get("pre_event_earliest_days"))
-                        )
-                    if rules.get("post_event_latest_days") is not None:
-                        window_end = event_dt + timedelta(
-                            days=int(rules.get("post_event_latest_days"))
-                        )
-
-                already = _already_scheduled_count(
-                    it,
-                    platform,
-                    eligible,  # already accepted in this run
-                    window_start,
-                    window_end,
+                slot_candidates.append(
+                    build_slot_candidate(idx, it, platform, fmt, rules, window, static_parts, event_ordinals[row], boost)
                 )
-
-                if already >= int(max_posts):
-                    continue
-
-
-
-
-            eligible.append(c)
-
-        if not eligible:
-            return None
-
-        # scoring pass using slot_dt as ref
-        best: DraftCandidate | None = None
-        best_score = float("-inf")
-        best_breakdown: dict[str, Any] = {}
-
-        for cand in eligible:
-            it = item_by_id.get(cand.item_id)
-            if not it:
+        pickers[platform] = PlatformSlotPicker(platform, pc, slot_candidates, last_scheduled, ledger)
+
+    gate = ExtraPostGate(pc.cadence, mode, pickers, now_local.toordinal(), _phase_boosted)
+
+    fixed: dict[int, Any] = {}
+    start = 0
+    # Only the greedy pass is a pure prefix: a slot's pick depends on earlier slots
+    # alone. The flow trades posts across the whole horizon, so a change anywhere
+    # can move any slot; flow modes re-plan every slot on the reused pass-1 rows.
+    if reuse is not None and mode == BASELINE_ONLY:
+        start = _first_affected_slot(slots, pickers, gate, reuse, rejection_changes(reuse.approvals, stored_approvals))
+        by_draft = {store.draft_id(c.draft_index): c for picker in pickers.values() for c in picker.candidates}
+        for slot_index, draft_id in reuse.schedule:
+            if slot_index >= start:
+                break
+            fixed[slot_index] = by_draft[draft_id]
+    if reuse is not None:
+        schedule_stats["reuse"] = {
+            "first_recomputed_slot": slots[start].dt.isoformat() if start < len(slots) else None,
+            "reused_slots": start,
+            "recomputed_slots": len(slots) - start,
+        }
+    trace.add("slot_setup", time.perf_counter() - setup_started)
+
+    schedule: list[tuple[int, str]] = []
+    # baseline_only keeps the original one-slot-at-a-time picks
+    assignments = assign_slots(
+        slots, pickers, pc, gate, schedule_stats, optimize=mode != BASELINE_ONLY, fixed=fixed, start=start
+    )
+    for slot_index, slot, picked in trace.timed_iter("slot_picking", assignments):
+        i = picked.draft_index
+        # same summation order as _score_candidate, so the floats match
+        store.scores[i] = picked.score_at(slot.ordinal)
+        store.score_ordinals[i] = slot.ordinal
+        scheduled_at = store.scheduled_at[i] = slot.dt.isoformat()
+        draft_id = store.draft_id(i)
+        schedule.append((slot_index, draft_id))
+        yield {
+            "draft_id": draft_id,
+            "platform": slot.platform,
+            "scheduled_datetime": scheduled_at,
+        }
+
+    if state_out is not None:
+        state_out["schedule"] = schedule
+        state_out["top_scores"] = gate.top_scores
+
+
+def _first_affected_slot(
+    slots, pickers: dict[str, PlatformSlotPicker], gate: ExtraPostGate, reuse: PlanReuse, dirty_drafts: frozenset[str]
+) -> int:
+    """Index of the first slot whose assignment the re-plan's changes could alter."""
+    first = len(slots)
+    for slot_index, draft_id in reuse.schedule:
+        # previously scheduled drafts that changed, were removed or changed status
+        if draft_id.split(":", 1)[0] in reuse.dirty_items or draft_id in dirty_drafts:
+            first = min(first, slot_index)
+            break
+
+    slots_by_platform: dict[str, list[int]] = {}
+    for i, slot in enumerate(slots):
+        slots_by_platform.setdefault(slot.platform, []).append(i)
+
+    for platform, picker in pickers.items():
+        platform_slots = slots_by_platform.get(platform, [])
+        if gate.top_scores.get(platform) != reuse.top_scores.get(platform):
+            # extra-slot eligibility is relative to the platform's best score
+            first = min([first] + [i for i in platform_slots if slots[i].kind == "extra"][:1])
+        for cand in picker.candidates:
+            if cand.item.id not in reuse.dirty_items and (
+                f"{cand.item.id}:{platform}:{cand.fmt}" not in dirty_drafts
+            ):
                 continue
-
-            score, breakdown = _score_candidate(
-                item=it,
-                platform=cand.platform,
-                fmt=cand.format,
-                cfg=configs,
-                objectives=objectives,
-                ref_dt=slot_dt,
-            )
-
-            if score > best_score:
-                best = cand
-                best_score = score
-                best_breakdown = breakdown
-
-        if best:
-            best.score = best_score
-            best.score_breakdown = best_breakdown
-            best.suggested_schedule_datetime = slot_dt.isoformat()
-
-            # record last scheduled now that we’ve chosen it
-            it = item_by_id.get(best.item_id)
-            if it:
-                key_id = it.series_id or it.id
-                last_scheduled[(key_id, platform)] = slot_dt
-
-        return best
-
-    for monday in mondays:
-        ig_dt = monday.replace(hour=18, minute=0)
-        fb_dt = monday.replace(hour=19, minute=0)
-
-        ig_best = pick_best_for_slot("instagram", ig_dt)
-        if ig_best:
-            weekly_plan.append(
-                {
-                    "draft_id": f"{ig_best.item_id}:instagram:{ig_best.format}",
-                    "platform": "instagram",
-                    "scheduled_datetime": ig_dt.isoformat(),
-                }
-            )
-
-        fb_best = pick_best_for_slot("facebook", fb_dt)
-        if fb_best:
-            weekly_plan.append(
-                {
-                    "draft_id": f"{fb_best.item_id}:facebook:{fb_best.format}",
-                    "platform": "facebook",
-                    "scheduled_datetime": fb_dt.isoformat(),
-                }
-            )
-
-
-        # ======================
-    # Milestone D1: Approval queue (from weekly plan)
-    # ======================
-
+            # new or re-admitted candidates matter from their first eligible slot
+            for i in platform_slots:
+                if i >= first:
+                    break
+                if cand.window.status_at(slots[i].dt)[0]:
+                    first = i
+                    break
+    return first
+
+
+def _build_approval_queue(weekly_plan: list[dict[str, Any]], stored_approvals: dict[str, str]) -> list[dict[str, Any]]:
+    """Milestone D1: approval queue (from weekly plan)."""
     approval_queue: list[dict[str, Any]] = []
     for entry in weekly_plan:
         draft_id = entry["draft_id"]
@@ -559,30 +511,290 @@ def run_planner(
         )
 
     approval_queue.sort(key=lambda e: e["scheduled_datetime"])
-    
-    blocked_count = sum(1 for c in draft_candidates if c.blocked)
-    total_count = len(draft_candidates)
-
-    return PlannerResult(
-        draft_candidates=draft_candidates,
-        weekly_plan=weekly_plan,
-        approval_queue=approval_queue,
-        export_queue=[],
-        metadata={
-            "status": "milestone_c",
-            "message": "Candidate generation, dependency gating, scoring, and baseline Monday scheduling implemented.",
-            "generated_at": datetime.utcnow().isoformat() + "Z",
-            "input_counts": {
-                "items": len(items),
-                "campaigns": len(campaigns),
-                "objectives": len(objectives),
-                "config_files": len(configs),
-            },
-            "total_candidates": total_count,
-            "blocked_candidates": blocked_count,
-            "unblocked_candidates": total_count - blocked_count,
-            "scheduled_slots": len(weekly_plan),
-            "horizon_days": 28,
-            "validation_status": "passed",
+    return approval_queue
+
+
+def iter_planner_events(
+    *,
+    items: list[Item] | None = None,
+    campaigns: list[dict[str, Any]] | None = None,
+    objectives: list[dict[str, Any]] | None = None,
+    configs: dict[str, Any] | None = None,
+    planner_config: PlannerConfig | None = None,
+    scoring_backend: str = "auto",
+    include_blocked: bool = True,
+    include_breakdowns: bool = True,
+    mode: str | None = None,
+    horizon_days: int | None = None,
+    reuse: PlanReuse | None = None,
+    approval_lookup: Callable[[Iterable[str]], dict[str, str]] | None = None,
+    state_out: dict[str, Any] | None = None,
+    trace: Trace | None = None,
+    parallel: bool = False,
+) -> Iterator[tuple[str, Any]]:
+    """Run the planner as a pipeline of ``(kind, payload)`` events.
+
+    Weekly plan entries are yielded as each slot is filled, followed by the final
+    draft candidates, the approval queue, the export queue and the metadata. ``run_planner`` collects
+    these into a PlannerResult; the streaming API writes them out as NDJSON.
+    ``mode`` and ``horizon_days`` default to planner_settings_v1.
+
+    ``reuse`` carries a previous run's state for re-planning, ``approval_lookup``
+    replaces the approvals query, and ``state_out`` (if given) receives what a later
+    re-plan needs: pass-1 rows per item, approvals, the schedule and top scores.
+
+    Phase timings always feed the /metrics histograms; pass a ``trace`` to also get
+    them, with counters, under ``metadata["timings"]``. ``parallel`` runs pass 1
+    (gating + scoring) in chunks on the process pool; the output is identical.
+    """
+    report_timings = trace is not None
+    trace = trace or Trace()
+    with trace.span("coerce_items"):
+        items = _coerce_items(items or [])
+    campaigns = campaigns or []
+    objectives = objectives or []
+    pc = planner_config or PlannerConfig.from_configs(configs or {})
+    mode, horizon_days = resolve_schedule_options(pc, mode, horizon_days)
+
+    objective_weights = _parse_objective_weights(objectives)
+
+    # day-based math (urgency, cooldowns, windows) runs on local calendar days
+    now_local = local_now(pc.cadence.timezone)
+    tz = now_local.tzinfo
+    ref_ordinal = now_local.toordinal()
+    event_ordinals = [local_ordinal(it.event_start, tz) if it.event_start else None for it in items]
+    audience_sets = [pc.audience_affinity.intern(it.audiences) for it in items]
+    with trace.span("campaign_calendar"):
+        calendar = build_campaign_calendar(campaigns, pc.campaign_templates, tz, ref_ordinal, ref_ordinal + horizon_days)
+        row_boosts = calendar.for_items([it.id for it in items])
+
+    item_keys = [it.model_dump_json() for it in items] if reuse is not None or state_out is not None else []
+    reused: dict[int, list[list[Any]]] = {}
+    if reuse is not None:
+        for row, key in enumerate(item_keys):
+            stored = reuse.pass1.get(key)
+            if stored is not None:
+                reused[row] = stored
+    score_rows = [row for row in range(len(items)) if row not in reused]
+
+    if scoring_backend == "auto":
+        scoring_backend = "numpy" if numpy_available() and len(score_rows) >= BATCH_MIN_ITEMS else "scalar"
+    # the pool only pays off with more than one chunk to spread
+    use_pool = parallel and len(score_rows) > PARALLEL_CHUNK_ITEMS
+    with trace.span("candidate_generation"):
+        if use_pool:
+            store = _generate_candidates_parallel(
+                items,
+                pc,
+                objective_weights,
+                event_ordinals,
+                ref_ordinal,
+                scoring_backend == "numpy",
+                score_rows,
+                reused,
+                trace,
+                row_boosts,
+            )
+        else:
+            batch = None
+            if scoring_backend == "numpy":
+                with trace.span("scoring"):
+                    batch = score_items_batch(
+                        [items[row] for row in score_rows],
+                        pc,
+                        objective_weights,
+                        ref_ordinal,
+                        [event_ordinals[row] for row in score_rows],
+                    )
+            store = _generate_candidates(
+                items,
+                pc,
+                objective_weights,
+                event_ordinals,
+                ref_ordinal,
+                batch,
+                reused=reused,
+                batch_rows={row: i for i, row in enumerate(score_rows)} if reused else None,
+                row_boosts=row_boosts,
+                trace=trace,
+            )
+
+    # Only this run's schedulable drafts matter for rejection and queue status, so
+    # look those up in one batched query instead of loading the whole history.
+    lookup = approval_lookup or get_approval_statuses
+    with trace.span("approvals_lookup"):
+        stored_approvals = lookup(store.draft_id(i) for i in range(len(store)) if not store.blocked[i])
+
+    if state_out is not None:
+        with trace.span("plan_state"):
+            state_out["pass1"] = {key: store.row_results(row) for row, key in enumerate(item_keys)}
+        state_out["approvals"] = dict(stored_approvals)
+        state_out.update(
+            fingerprint=pc.fingerprint,
+            timezone=pc.cadence.timezone,
+            ref_ordinal=ref_ordinal,
+            mode=mode,
+            horizon_days=horizon_days,
+        )
+
+    weekly_plan: list[dict[str, Any]] = []
+    pickers: dict[str, PlatformSlotPicker] = {}
+    schedule_stats: dict[str, Any] = {}
+    for entry in _iter_schedule(
+        items,
+        store,
+        pc,
+        objective_weights,
+        stored_approvals,
+        event_ordinals,
+        now_local,
+        pickers,
+        mode,
+        horizon_days,
+        schedule_stats,
+        reuse,
+        state_out,
+        trace,
+        row_boosts,
+        audience_sets,
+    ):
+        weekly_plan.append(entry)
+        yield "weekly_plan", entry
+
+    # DraftCandidate models are only built here, at the edge of the pipeline
+    materialized = (
+        _materialize(store, i, pc, objective_weights, event_ordinals, include_breakdowns, row_boosts, audience_sets)
+        for i in range(len(store))
+        if include_blocked or not store.blocked[i]
+    )
+    for candidate in trace.timed_iter("materialize", materialized):
+        yield "draft_candidate", candidate
+
+    with trace.span("approval_queue"):
+        approval_queue = _build_approval_queue(weekly_plan, stored_approvals)
+    for entry in approval_queue:
+        yield "approval_queue", entry
+
+    with trace.span("export_queue"):
+        export_queue, export_stats = build_export_queue(weekly_plan, pc.export_renders)
+    for job in export_queue:
+        yield "export_queue", job
+
+    engine = engine_stats(pickers)
+    trace.count("candidates_rescored", engine["rescored"])
+    trace.count("window_skipped", engine["window_skipped"])
+    trace.count("candidates_reused", sum(len(rows) for rows in reused.values()))
+
+    blocked_count = store.blocked_count()
+    total_count = len(store)
+
+    metadata = {
+        "status": "milestone_c",
+        "message": "Candidate generation, dependency gating, scoring, and cadence scheduling implemented.",
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "input_counts": {
+            "items": len(items),
+            "campaigns": len(campaigns),
+            "objectives": len(objectives),
+            "config_files": len(pc.raw),
         },
-    )
\ No newline at end of file
+        "total_candidates": total_count,
+        "blocked_candidates": blocked_count,
+        "unblocked_candidates": total_count - blocked_count,
+        "scheduled_slots": len(weekly_plan),
+        "export": export_stats,
+        "horizon_days": horizon_days,
+        # local day the plan starts from; the plan store partitions by it
+        "plan_date": now_local.date().isoformat(),
+        "timezone": pc.cadence.timezone,
+        "mode": mode,
+        "scoring_backend": scoring_backend,
+        "campaigns": calendar.stats,
+        "audience_sets": len({audience_set.set_id for audience_set in audience_sets}),
+        "parallel": (
+            {"workers": PARALLEL_WORKERS, "chunks": -(-len(score_rows) // PARALLEL_CHUNK_ITEMS)} if use_pool else None
+        ),
+        "slot_engine": engine,
+        "scheduler": schedule_stats,
+        "slot_calendar": calendar_cache_stats(),
+        "validation_status": "passed",
+    }
+    if reuse is not None:
+        reused_count = sum(len(rows) for rows in reused.values())
+        metadata["reuse"] = {
+            "candidates": {"reused": reused_count, "recomputed": total_count - reused_count},
+            "slots": schedule_stats.pop("reuse"),
+        }
+    if report_timings:
+        metadata["timings"] = trace.summary()
+    yield "metadata", metadata
+
+
+def run_planner(
+    *,
+    items: list[Item] | None = None,
+    campaigns: list[dict[str, Any]] | None = None,
+    objectives: list[dict[str, Any]] | None = None,
+    configs: dict[str, Any] | None = None,
+    planner_config: PlannerConfig | None = None,
+    scoring_backend: str = "auto",
+    mode: str | None = None,
+    horizon_days: int | None = None,
+    reuse: PlanReuse | None = None,
+    approval_lookup: Callable[[Iterable[str]], dict[str, str]] | None = None,
+    state_out: dict[str, Any] | None = None,
+    trace: Trace | None = None,
+    parallel: bool = False,
+) -> PlannerResult:
+    """Plan ``items`` and return the whole result at once.
+
+    Collects the events of ``iter_planner_events`` (candidate generation and
+    dependency gating, pass-1 scoring, slot assignment under the cadence policy,
+    then the approval and export queues) into a PlannerResult.
+
+    Pass a precompiled ``planner_config`` to skip compiling ``configs`` per run.
+    ``scoring_backend`` is "scalar", "numpy" or "auto" (numpy for large inputs when
+    it is installed); both backends produce identical scores.
+    """
+    return collect_result(
+        iter_planner_events(
+            items=items,
+            campaigns=campaigns,
+            objectives=objectives,
+            configs=configs,
+            planner_config=planner_config,
+            scoring_backend=scoring_backend,
+            mode=mode,
+            horizon_days=horizon_days,
+            reuse=reuse,
+            approval_lookup=approval_lookup,
+            state_out=state_out,
+            trace=trace,
+            parallel=parallel,
+        )
+    )
+
+
+def collect_result(events: Iterable[tuple[str, Any]]) -> PlannerResult:
+    """The PlannerResult of a complete ``iter_planner_events`` stream."""
+    collected: dict[str, list[Any]] = {"weekly_plan": [], "draft_candidate": [], "approval_queue": [], "export_queue": []}
+    metadata: dict[str, Any] = {}
+    for kind, payload in events:
+        if kind == "metadata":
+            metadata = payload
+        else:
+            collected[kind].append(payload)
+
+    # the pipeline builds these from validated inputs, so they are not validated again
+    return PlannerResult.model_construct(
+        draft_candidates=collected["draft_candidate"],
+        weekly_plan=[WeeklyPlanEntry.model_construct(**e) for e in collected["weekly_plan"]],
+        approval_queue=[ApprovalQueueEntry.model_construct(**e) for e in collected["approval_queue"]],
+        export_queue=[
+            ExportJob.model_construct(
+                **{**job, "destinations": [ExportDestination.model_construct(**d) for d in job["destinations"]]}
+            )
+            for job in collected["export_queue"]
+        ],
+        metadata=metadata,
+    )
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from datetime import date
+from typing import Any
+
+import redis
+
+from app.core.redis_client import get_redis
+from app.core.serialization import dumps
+from app.models.planner import PlannerResult
+
+logger = logging.getLogger(__name__)
+
+PLANNER_CACHE_TTL_SECONDS = int(os.getenv("PLANNER_CACHE_TTL_SECONDS", "300"))
+# how long a computing request may hold the single-flight lock
+PLANNER_CACHE_LOCK_SECONDS = float(os.getenv("PLANNER_CACHE_LOCK_SECONDS", "30"))
+# how long an identical concurrent request waits for that result before computing itself
+PLANNER_CACHE_WAIT_SECONDS = float(os.getenv("PLANNER_CACHE_WAIT_SECONDS", "10"))
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class PlannerResultCache:
+    """Redis cache of PlannerResult keyed by input, config and approvals state.
+
+    Any approvals write bumps ``approvals_version``, which is part of every key, so
+    older entries simply stop being read and age out through their TTL. Concurrent
+    identical requests are single-flighted through a short-lived lock key: the
+    request that ``acquire``s it computes and ``store``s the result, the others
+    ``wait`` for it.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        *,
+        prefix: str = "planner",
+        ttl_seconds: int = PLANNER_CACHE_TTL_SECONDS,
+        lock_seconds: float = PLANNER_CACHE_LOCK_SECONDS,
+        wait_seconds: float = PLANNER_CACHE_WAIT_SECONDS,
+        poll_seconds: float = 0.05,
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+
+    @property
+    def _version_key(self) -> str:
+        return f"{self.prefix}:approvals_version"
+
+    def approvals_version(self) -> int:
+        raw = self.client.get(self._version_key)
+        return int(raw) if raw else 0
+
+    def bump_approvals_version(self) -> int:
+        return int(self.client.incr(self._version_key))
+
+    def make_key(self, payload: dict[str, Any], config_fingerprint: str | None, ref_date: date) -> str:
+        digest = hashlib.sha256()
+        digest.update(canonical_json(payload).encode())
+        digest.update(f"|cfg={config_fingerprint}|appr={self.approvals_version()}|day={ref_date.isoformat()}".encode())
+        return f"{self.prefix}:result:{digest.hexdigest()}"
+
+    def _lock_key(self, key: str) -> str:
+        return f"{key}:lock"
+
+    def _load(self, key: str) -> PlannerResult | None:
+        raw = self.client.get(key)
+        return PlannerResult.model_validate_json(raw) if raw else None
+
+    def peek(self, key: str) -> PlannerResult | None:
+        """The cached result, without computing or waiting on a concurrent computation."""
+        return self._load(key)
+
+    def store(self, key: str, result: PlannerResult) -> None:
+        self.client.set(key, dumps(result), ex=self.ttl_seconds)
+
+    def acquire(self, key: str) -> str | None:
+        """Take the single-flight lock for computing ``key``.
+
+        Returns the token to ``release`` it with, or None while another request holds it.
+        """
+        token = uuid.uuid4().hex
+        if self.client.set(self._lock_key(key), token, nx=True, px=int(self.lock_seconds * 1000)):
+            return token
+        return None
+
+    def release(self, key: str, token: str) -> None:
+        # non-atomic compare-and-delete; the lock TTL bounds the damage of a race
+        lock_key = self._lock_key(key)
+        held = self.client.get(lock_key)
+        if held is not None and held.decode() == token:
+            self.client.delete(lock_key)
+
+    def _poll(self, key: str) -> tuple[PlannerResult | None, bool]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.exists(self._lock_key(key))
+        raw, locked = pipe.execute()
+        return (PlannerResult.model_validate_json(raw) if raw else None), bool(locked)
+
+    async def wait(self, key: str) -> PlannerResult | None:
+        """The result the holder of ``key``'s lock is computing.
+
+        Sleeps on the event loop between polls, so a waiting request holds no thread
+        and no executor slot. None once the lock is gone without a result (the
+        leader failed) or after ``wait_seconds``.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_seconds
+        while loop.time() < deadline:
+            await asyncio.sleep(self.poll_seconds)
+            result, locked = await asyncio.to_thread(self._poll, key)
+            if result is not None:
+                return result
+            if not locked:
+                break
+        return None
+
+
+def get_planner_cache() -> PlannerResultCache | None:
+    client = get_redis()
+    return PlannerResultCache(client) if client is not None else None
+
+
+def invalidate_planner_cache() -> None:
+    cache = get_planner_cache()
+    if cache is None:
+        return
+    try:
+        cache.bump_approvals_version()
+    except redis.RedisError:
+        logger.warning("Could not invalidate planner cache; entries expire after %ss", cache.ttl_seconds)
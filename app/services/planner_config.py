@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from app.services.audience_affinity import AudienceAffinity
+from app.services.campaign_phases import CampaignTemplate, compile_campaign_templates
+from app.services.dependency_engine import DependencyEngine
+from app.services.export_planner import ExportRender, compile_export_renders
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _to_int_or_none(value: Any) -> int | None:
+    return None if value is None else int(value)
+
+
+@lru_cache(maxsize=256)
+def map_item_type_to_fit_key(item_type: str) -> str:
+    t = (item_type or "").lower()
+
+    # direct matches
+    if t in {"event", "bts", "news", "recap", "merch", "film"}:
+        return t
+
+    # common aliases
+    if t in {"youtube_upload", "youtube"}:
+        return "film"
+    if t in {"deadline", "callout_deadline", "submission_deadline"}:
+        return "news"  # deadlines behave like news/announcements
+    if t in {"update", "behind_the_scenes"}:
+        return "bts"
+
+    # fallback
+    return "news"
+
+
+def pick_primary_objective(item):
+    t = (item.item_type or "").lower()
+    if t in {"youtube_upload", "youtube"}:
+        return "youtube_growth"
+    if t in {"event", "event_promo", "meetup"}:
+        return "event_attendance"
+    if t in {"deadline", "callout_deadline", "submission_deadline"}:
+        return "submission_deadline"
+    if t in {"news", "major_news"}:
+        return "community_engagement"
+    if t in {"bts", "behind_the_scenes", "update"}:
+        return "community_engagement"
+    return None
+
+
+@dataclass(frozen=True)
+class EligibilityRules:
+    """eligibility_windows_v1 defaults merged with one item_type's overrides, as ints."""
+
+    pre_event_earliest_days: int | None = None
+    pre_event_latest_days: int | None = None
+    post_event_earliest_days: int | None = None
+    post_event_latest_days: int | None = None
+    max_posts_per_platform_in_window: int | None = None
+    monthly_once: bool = False
+
+    @classmethod
+    def from_dict(cls, rules: Mapping[str, Any]) -> "EligibilityRules":
+        return cls(
+            pre_event_earliest_days=_to_int_or_none(rules.get("pre_event_earliest_days")),
+            pre_event_latest_days=_to_int_or_none(rules.get("pre_event_latest_days")),
+            post_event_earliest_days=_to_int_or_none(rules.get("post_event_earliest_days")),
+            post_event_latest_days=_to_int_or_none(rules.get("post_event_latest_days")),
+            max_posts_per_platform_in_window=_to_int_or_none(rules.get("max_posts_per_platform_in_window")),
+            monthly_once=bool(rules.get("monthly_once", False)),
+        )
+
+
+WEEKDAYS = {
+    "mon": 0, "monday": 0,
+    "tue": 1, "tuesday": 1,
+    "wed": 2, "wednesday": 2,
+    "thu": 3, "thursday": 3,
+    "fri": 4, "friday": 4,
+    "sat": 5, "saturday": 5,
+    "sun": 6, "sunday": 6,
+}
+
+
+def _parse_slot_time(weekday: str, time_local: str) -> tuple[int, int, int]:
+    hour, minute = (int(part) for part in str(time_local).split(":", 1))
+    return WEEKDAYS[str(weekday).strip().lower()], hour, minute
+
+
+@dataclass(frozen=True)
+class CadencePolicy:
+    """cadence_policy_v1 + the scheduling parts of planner_settings_v1.
+
+    Slot times are ``(weekday, hour, minute)`` tuples with Monday = 0.
+    """
+
+    timezone: str
+    default_horizon_days: int
+    allowed_horizon_days: tuple[int, ...]
+    default_mode: str
+    allowed_modes: tuple[str, ...]
+    timing_preferences: Mapping[str, tuple[tuple[int, int, int], ...]]
+    baseline_slots: Mapping[str, tuple[tuple[int, int, int], ...]]
+    extra_slots: frozenset[tuple[int, int, int]]
+    # platform -> (period, min, max) where period is "week" or "month"
+    caps: Mapping[str, tuple[str, int, int | None]]
+    urgent_event_within_days: int | None
+    high_score_relative_threshold: float | None
+    campaign_phase_boost_required: bool
+    email_platforms: frozenset[str]
+    email_min_spacing_hours: float
+
+    @classmethod
+    def from_configs(cls, configs: Mapping[str, Any]) -> "CadencePolicy":
+        cadence = configs.get("cadence_policy_v1") or {}
+        settings = configs.get("planner_settings_v1") or {}
+        planning = settings.get("planning") or {}
+        modes = settings.get("modes") or {}
+        schedule = settings.get("schedule") or {}
+        email = settings.get("email") or {}
+        triggers = cadence.get("extra_post_triggers") or {}
+
+        preferences: dict[str, tuple[tuple[int, int, int], ...]] = {}
+        for platform, entries in (cadence.get("default_timing_preferences") or {}).items():
+            parsed = []
+            for entry in entries or []:
+                weekday, time_local = str(entry).split(None, 1)
+                parsed.append(_parse_slot_time(weekday, time_local))
+            preferences[platform] = tuple(parsed)
+
+        baseline: dict[str, list[tuple[int, int, int]]] = {}
+        for slot in cadence.get("baseline_slots") or schedule.get("baseline_slots") or []:
+            baseline.setdefault(slot["platform"], []).append(_parse_slot_time(slot["weekday"], slot["time_local"]))
+
+        caps: dict[str, tuple[str, int, int | None]] = {}
+        for platform, cap in (cadence.get("platform_caps") or {}).items():
+            cap = cap or {}
+            for period in ("week", "month"):
+                lo, hi = cap.get(f"{period}ly_min"), cap.get(f"{period}ly_max")
+                if lo is not None or hi is not None:
+                    caps[platform] = (period, int(lo or 0), None if hi is None else int(hi))
+                    break
+
+        threshold = triggers.get("high_score_relative_threshold")
+        urgent = triggers.get("urgent_event_within_days")
+        return cls(
+            timezone=cadence.get("timezone") or settings.get("timezone") or "UTC",
+            default_horizon_days=int(planning.get("default_horizon_days") or 28),
+            allowed_horizon_days=tuple(int(d) for d in planning.get("allowed_horizon_days") or ()),
+            default_mode=modes.get("default") or "normal",
+            allowed_modes=tuple(modes.get("allowed") or ()),
+            timing_preferences=MappingProxyType(preferences),
+            baseline_slots=MappingProxyType({p: tuple(v) for p, v in baseline.items()}),
+            extra_slots=frozenset(
+                _parse_slot_time(s["weekday"], s["time_local"]) for s in schedule.get("extra_post_slots") or []
+            ),
+            caps=MappingProxyType(caps),
+            urgent_event_within_days=None if urgent is None else int(urgent),
+            high_score_relative_threshold=None if threshold is None else float(threshold),
+            campaign_phase_boost_required=bool(triggers.get("campaign_phase_boost_required", False)),
+            email_platforms=frozenset(email.get("platforms") or ()),
+            email_min_spacing_hours=float(email.get("minimum_spacing_hours") or 0),
+        )
+
+
+@dataclass(frozen=True)
+class PlannerConfig:
+    """Immutable, pre-indexed view of the planner YAML configs.
+
+    Built once per config fingerprint so the hot scoring/gating paths do flat dict
+    lookups instead of walking nested YAML and calling float() per candidate.
+    """
+
+    formats_by_platform: Mapping[str, tuple[str, ...]]
+    # every (platform, format) pair in formats_by_platform order
+    columns: tuple[tuple[str, str], ...]
+    base_weights: Mapping[str, float]
+    format_biases: Mapping[tuple[str, str], float]
+    content_fit: Mapping[tuple[str, str], float]
+    audience_affinity: AudienceAffinity
+    dependency_rules: tuple[Mapping[str, Any], ...]
+    dependency_engine: DependencyEngine
+    eligibility_defaults: EligibilityRules
+    eligibility_by_item_type: Mapping[str, EligibilityRules]
+    cooldowns: Mapping[str, int]
+    push_windows: Mapping[str, tuple[int, int]]
+    campaign_templates: Mapping[str, CampaignTemplate]
+    export_renders: Mapping[tuple[str, str], tuple[ExportRender, ...]]
+    cadence: CadencePolicy
+    raw: Mapping[str, Any]
+    fingerprint: str | None = None
+
+    @classmethod
+    def from_configs(cls, configs: Mapping[str, Any], fingerprint: str | None = None) -> "PlannerConfig":
+        scoring_rules = configs.get("scoring_rules") or {}
+        formats_by_platform = (scoring_rules.get("candidate_generation") or {}).get("formats_by_platform") or {}
+
+        base_weights: dict[str, float] = {}
+        format_biases: dict[tuple[str, str], float] = {}
+        for platform, p in ((configs.get("platform_weights") or {}).get("weights") or {}).items():
+            p = p or {}
+            base_weights[platform] = _to_float(p.get("base_weight", 0))
+            for fmt, bias in (p.get("format_biases") or {}).items():
+                format_biases[(platform, fmt)] = _to_float(bias)
+
+        content_fit: dict[tuple[str, str], float] = {}
+        for platform, plat_map in (scoring_rules.get("content_fit") or {}).items():
+            for fit_key, value in (plat_map or {}).items():
+                content_fit[(platform, fit_key)] = _to_float(value)
+
+        eligibility_cfg = configs.get("eligibility_windows_v1") or {}
+        defaults = dict(eligibility_cfg.get("defaults") or {})
+        by_type = {}
+        for item_type, overrides in (eligibility_cfg.get("by_item_type") or {}).items():
+            merged = dict(defaults)
+            merged.update(overrides or {})
+            by_type[item_type] = EligibilityRules.from_dict(merged)
+
+        planner_settings = configs.get("planner_settings_v1") or {}
+        cooldowns = {p: int(v or 14) for p, v in (planner_settings.get("cooldowns") or {}).items()}
+        push_windows: dict[str, tuple[int, int]] = {}
+        for level, window in (planner_settings.get("push_windows") or {}).items():
+            within_days = (window or {}).get("within_days")
+            override = (window or {}).get("cooldown_days")
+            if isinstance(within_days, int) and isinstance(override, int):
+                push_windows[level] = (within_days, override)
+
+        dependency_rules = tuple((configs.get("dependency_rules") or {}).get("rules") or [])
+
+        return cls(
+            formats_by_platform=MappingProxyType({p: tuple(f) for p, f in formats_by_platform.items()}),
+            columns=tuple((p, f) for p, formats in formats_by_platform.items() for f in formats),
+            base_weights=MappingProxyType(base_weights),
+            format_biases=MappingProxyType(format_biases),
+            content_fit=MappingProxyType(content_fit),
+            audience_affinity=AudienceAffinity.from_configs(configs),
+            dependency_rules=dependency_rules,
+            dependency_engine=DependencyEngine(dependency_rules),
+            eligibility_defaults=EligibilityRules.from_dict(defaults),
+            eligibility_by_item_type=MappingProxyType(by_type),
+            cooldowns=MappingProxyType(cooldowns),
+            push_windows=MappingProxyType(push_windows),
+            campaign_templates=compile_campaign_templates(configs),
+            export_renders=compile_export_renders(configs),
+            cadence=CadencePolicy.from_configs(configs),
+            raw=MappingProxyType(dict(configs)),
+            fingerprint=fingerprint,
+        )
+
+    def __reduce__(self):
+        # MappingProxyType doesn't pickle: ship the raw configs and recompile on arrival
+        return (get_planner_config, (dict(self.raw), self.fingerprint))
+
+    def eligibility_rules_for(self, item_type: str) -> EligibilityRules:
+        return self.eligibility_by_item_type.get(item_type, self.eligibility_defaults)
+
+    def base_cooldown_days(self, platform: str) -> int:
+        return self.cooldowns.get(platform, 14)
+
+
+_COMPILED: dict[str, PlannerConfig] = {}
+_COMPILED_LOCK = threading.Lock()
+
+
+def get_planner_config(configs: Mapping[str, Any], fingerprint: str | None = None) -> PlannerConfig:
+    """Compile configs, reusing the previous compilation when the fingerprint matches."""
+    if fingerprint is None:
+        return PlannerConfig.from_configs(configs)
+
+    with _COMPILED_LOCK:
+        compiled = _COMPILED.get(fingerprint)
+        if compiled is None:
+            compiled = PlannerConfig.from_configs(configs, fingerprint)
+            # config changes are rare; keep only the live snapshot
+            _COMPILED.clear()
+            _COMPILED[fingerprint] = compiled
+        return compiled
@@ -0,0 +1,208 @@
+"""Bounded executor for CPU-heavy planner runs behind async endpoints.
+
+Runs go to a dedicated thread pool, so they never take threads from the server's
+default pool (which keeps /health and the sync routes responsive). At most
+``PLANNER_EXECUTOR_WORKERS`` runs execute at once and ``PLANNER_EXECUTOR_MAX_QUEUE``
+more may wait. Past that, ``PlannerBusy`` (429) is raised straight away. A queued
+run that has not started within ``PLANNER_EXECUTOR_QUEUE_TIMEOUT_SECONDS`` is
+dropped with a 503. Both carry a Retry-After estimate from recent run times.
+
+Streamed runs take their slot with ``hold`` and are produced on the same pool
+through ``iterate``; the slot is given back when the response closes.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, TypeVar
+
+from app.core.instrumentation import CallbackGauge, count, register_metric
+
+T = TypeVar("T")
+
+PLANNER_EXECUTOR_WORKERS = int(os.getenv("PLANNER_EXECUTOR_WORKERS", "2"))
+PLANNER_EXECUTOR_MAX_QUEUE = int(os.getenv("PLANNER_EXECUTOR_MAX_QUEUE", "8"))
+PLANNER_EXECUTOR_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PLANNER_EXECUTOR_QUEUE_TIMEOUT_SECONDS", "30"))
+
+
+class PlannerBusy(Exception):
+    def __init__(self, status_code: int, retry_after: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class PlannerExecutor:
+    def __init__(self, max_workers: int, max_queue: int, queue_timeout: float) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="planner")
+        self._lock = threading.Lock()
+        # admitted runs (queued + running) and open streams
+        self._admitted = 0
+        self._running = 0
+        self._rejected = 0
+        self._timed_out = 0
+        # moving average of run time, for Retry-After
+        self._avg_run_s = 1.0
+
+    def retry_after(self) -> int:
+        with self._lock:
+            backlog = self._admitted / max(self.max_workers, 1)
+            return max(1, math.ceil(self._avg_run_s * backlog))
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._admitted >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                full = True
+            else:
+                self._admitted += 1
+                full = False
+        if full:
+            count("planner_executor_rejected")
+            raise PlannerBusy(429, self.retry_after(), "Planner is at capacity; retry later")
+
+    def _release(self) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    def hold(self) -> Callable[[], None]:
+        """Take one admission slot now, outside the pool (e.g. for a streamed run).
+
+        Returns the function that gives it back; calling it more than once is harmless.
+        """
+        self._admit()
+        released = threading.Event()
+
+        def release() -> None:
+            if not released.is_set():
+                released.set()
+                self._release()
+
+        return release
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self._admit()
+        ctx = contextvars.copy_context()
+
+        def task() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                return ctx.run(fn, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._running -= 1
+                    self._avg_run_s = 0.8 * self._avg_run_s + 0.2 * elapsed
+                self._release()
+
+        try:
+            future = self._pool.submit(task)
+        except BaseException:
+            self._release()
+            raise
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not future.cancel():
+                # already running: it will finish, so wait for it
+                return await asyncio.wrap_future(future)
+            self._release()
+            with self._lock:
+                self._timed_out += 1
+            count("planner_executor_timed_out")
+            raise PlannerBusy(503, self.retry_after(), "Planner queue wait timed out; retry later") from None
+
+    async def iterate(self, items: Iterator[T]) -> AsyncIterator[T]:
+        """``items`` with every ``next()`` run on the pool, for a run whose slot is already held.
+
+        When the consumer stops early the iterator is closed on the pool as well,
+        after any ``next()`` still in progress.
+        """
+        ctx = contextvars.copy_context()
+        done = object()
+
+        def step() -> Any:
+            with self._lock:
+                self._running += 1
+            try:
+                return ctx.run(next, items, done)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        future = None
+        try:
+            while True:
+                future = self._pool.submit(step)
+                item = await asyncio.wrap_future(future)
+                if item is done:
+                    return
+                yield item
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                if future is not None and not future.done():
+                    future.add_done_callback(lambda _: ctx.run(close))
+                else:
+                    try:
+                        self._pool.submit(ctx.run, close)
+                    except RuntimeError:  # pool shut down
+                        pass
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": max(self._admitted - self._running, 0),
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "avg_run_ms": round(self._avg_run_s * 1000, 1),
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_EXECUTOR: PlannerExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_planner_executor() -> PlannerExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = PlannerExecutor(
+                PLANNER_EXECUTOR_WORKERS, PLANNER_EXECUTOR_MAX_QUEUE, PLANNER_EXECUTOR_QUEUE_TIMEOUT_SECONDS
+            )
+        return _EXECUTOR
+
+
+def _gauge_values() -> dict[tuple[tuple[str, str], ...], float]:
+    if _EXECUTOR is None:
+        return {}
+    stats = _EXECUTOR.stats()
+    return {(("state", state),): stats[state] for state in ("running", "queued")}
+
+
+register_metric(CallbackGauge("planner_executor_runs", "Planner runs executing or waiting for a worker.", _gauge_values))
+
+
+def shutdown_planner_executor() -> None:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown()
+        _EXECUTOR = None
@@ -0,0 +1,244 @@
+"""Redis Streams job queue for asynchronous planner runs.
+
+Jobs are appended to one stream and consumed through a consumer group, so every
+job is delivered to a single worker and stays pending until that worker acks it.
+Jobs whose worker died stay pending and are re-claimed after
+``PLANNER_JOB_VISIBILITY_SECONDS``; a live worker re-claims its job every third of
+that while it runs, so long runs are never picked up twice. Jobs that raise are
+re-queued straight away, except for invalid payloads, which fail at once.
+Either way a job runs at most ``PLANNER_JOB_MAX_ATTEMPTS`` times. Job state and
+results live in a per-job hash that ``GET /planner/jobs/{id}`` polls.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import redis
+
+from app.core.config_loader import ConfigLoader
+from app.core.serialization import dumps
+from app.services.plan_store import store_plan
+from app.services.planner import run_planner
+from app.services.planner_config import get_planner_config
+
+logger = logging.getLogger(__name__)
+
+JOB_STREAM = "planner:jobs"
+JOB_GROUP = "planner-workers"
+JOB_METRICS_KEY = "planner:jobs:metrics"
+
+PLANNER_JOB_MAX_ATTEMPTS = int(os.getenv("PLANNER_JOB_MAX_ATTEMPTS", "3"))
+PLANNER_JOB_VISIBILITY_SECONDS = float(os.getenv("PLANNER_JOB_VISIBILITY_SECONDS", "300"))
+PLANNER_JOB_RESULT_TTL_SECONDS = int(os.getenv("PLANNER_JOB_RESULT_TTL_SECONDS", "86400"))
+
+# a payload that fails validation fails the same way on every attempt, so it is not
+# retried (pydantic's ValidationError and json's JSONDecodeError are ValueErrors too)
+_PERMANENT_ERRORS = (ValueError,)
+
+_PAYLOAD_FIELDS = ("items", "campaigns", "objectives")
+_OPTION_FIELDS = ("mode", "horizon_days", "parallel")
+
+
+def _job_key(job_id: str) -> str:
+    return f"planner:job:{job_id}"
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _decode(raw: dict) -> dict[str, str]:
+    return {
+        (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+        for k, v in raw.items()
+    }
+
+
+def ensure_group(client: redis.Redis) -> None:
+    try:
+        client.xgroup_create(JOB_STREAM, JOB_GROUP, id="0", mkstream=True)
+    except redis.ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+def enqueue_job(client: redis.Redis, payload: dict[str, Any]) -> str:
+    job_id = uuid.uuid4().hex
+    key = _job_key(job_id)
+    pipe = client.pipeline()
+    pipe.hset(
+        key,
+        mapping={
+            "status": "queued",
+            "payload": json.dumps(
+                {
+                    **{f: payload.get(f) or [] for f in _PAYLOAD_FIELDS},
+                    **{f: payload.get(f) for f in _OPTION_FIELDS},
+                },
+                default=str,
+            ),
+            "attempts": 0,
+            "enqueued_at_ms": _now_ms(),
+        },
+    )
+    pipe.expire(key, PLANNER_JOB_RESULT_TTL_SECONDS)
+    pipe.xadd(JOB_STREAM, {"job_id": job_id})
+    pipe.execute()
+    return job_id
+
+
+def get_job(client: redis.Redis, job_id: str) -> dict[str, Any] | None:
+    raw = client.hgetall(_job_key(job_id))
+    if not raw:
+        return None
+    job = _decode(raw)
+    out: dict[str, Any] = {
+        "job_id": job_id,
+        "status": job.get("status"),
+        "attempts": int(job.get("attempts", 0)),
+    }
+    for field in ("enqueued_at_ms", "started_at_ms", "finished_at_ms"):
+        if field in job:
+            out[field] = int(job[field])
+    if job.get("error"):
+        out["error"] = job["error"]
+    if job.get("result"):
+        out["result"] = json.loads(job["result"])
+    return out
+
+
+def queue_metrics(client: redis.Redis) -> dict[str, Any]:
+    ensure_group(client)
+    counters = {k: float(v) for k, v in _decode(client.hgetall(JOB_METRICS_KEY)).items()}
+    completed = counters.get("completed", 0.0)
+    pending = client.xpending(JOB_STREAM, JOB_GROUP)
+    in_flight = int(pending["pending"]) if isinstance(pending, dict) else 0
+    return {
+        # acked entries are deleted, so the stream holds queued + in-flight jobs
+        "queue_depth": int(client.xlen(JOB_STREAM)) - in_flight,
+        "in_flight": in_flight,
+        "completed": int(completed),
+        "failed": int(counters.get("failed", 0)),
+        "retried": int(counters.get("retried", 0)),
+        "avg_wait_ms": round(counters.get("wait_ms_total", 0.0) / completed, 1) if completed else None,
+        "avg_run_ms": round(counters.get("run_ms_total", 0.0) / completed, 1) if completed else None,
+        "max_wait_ms": int(counters.get("wait_ms_max", 0)),
+    }
+
+
+def _ack(client: redis.Redis, entry_id) -> None:
+    pipe = client.pipeline()
+    pipe.xack(JOB_STREAM, JOB_GROUP, entry_id)
+    pipe.xdel(JOB_STREAM, entry_id)
+    pipe.execute()
+
+
+def claim_jobs(client: redis.Redis, consumer: str, count: int = 1, block_ms: int = 5000) -> list[tuple[Any, str]]:
+    """Next (entry_id, job_id) pairs for ``consumer``: stale pending jobs first, then new ones."""
+    claimed = client.xautoclaim(
+        JOB_STREAM,
+        JOB_GROUP,
+        consumer,
+        min_idle_time=int(PLANNER_JOB_VISIBILITY_SECONDS * 1000),
+        start_id="0-0",
+        count=count,
+    )
+    entries = [e for e in (claimed[1] if claimed else []) if e and e[1]]
+    if not entries:
+        streams = client.xreadgroup(JOB_GROUP, consumer, {JOB_STREAM: ">"}, count=count, block=block_ms)
+        entries = [e for _, stream_entries in (streams or []) for e in stream_entries]
+    return [(entry_id, _decode(fields)["job_id"]) for entry_id, fields in entries]
+
+
+@contextmanager
+def _keep_claimed(client: redis.Redis, consumer: str | None, entry_id) -> Iterator[None]:
+    """Reset the entry's idle time while the job runs so no other worker re-claims it."""
+    if consumer is None:
+        yield
+        return
+    stop = threading.Event()
+
+    def heartbeat() -> None:
+        while not stop.wait(PLANNER_JOB_VISIBILITY_SECONDS / 3):
+            try:
+                # JUSTID: doesn't count as a new delivery
+                client.xclaim(JOB_STREAM, JOB_GROUP, consumer, 0, [entry_id], justid=True)
+            except redis.RedisError:
+                logger.warning("Could not extend the claim on job entry %s", entry_id, exc_info=True)
+
+    thread = threading.Thread(target=heartbeat, name=f"{consumer}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def process_job(client: redis.Redis, entry_id, job_id: str, consumer: str | None = None) -> str:
+    """Run one claimed job and record its outcome; returns the final job status.
+
+    Pass the claiming ``consumer`` to keep the claim alive during long runs.
+    """
+    key = _job_key(job_id)
+    job = _decode(client.hgetall(key))
+    if not job or job.get("status") in {"done", "failed"}:
+        # result expired or a previous delivery already finished it
+        _ack(client, entry_id)
+        return job.get("status", "missing") if job else "missing"
+
+    attempts = client.hincrby(key, "attempts", 1)
+    started = _now_ms()
+    client.hset(key, mapping={"status": "running", "started_at_ms": started})
+    if attempts > 1:
+        client.hincrby(JOB_METRICS_KEY, "retried", 1)
+
+    try:
+        with _keep_claimed(client, consumer, entry_id):
+            payload = json.loads(job["payload"])
+            loader = ConfigLoader()
+            configs = loader.load_all()
+            planner_config = get_planner_config(configs, loader.last_fingerprint)
+            result = run_planner(
+                **{f: payload.get(f) for f in _PAYLOAD_FIELDS + _OPTION_FIELDS},
+                planner_config=planner_config,
+            )
+            store_plan(result, planner_config.fingerprint)
+    except Exception as exc:  # noqa: BLE001 - any planner failure is recorded on the job
+        if attempts < PLANNER_JOB_MAX_ATTEMPTS and not isinstance(exc, _PERMANENT_ERRORS):
+            pipe = client.pipeline()
+            pipe.hset(key, mapping={"status": "queued", "error": repr(exc)})
+            pipe.xack(JOB_STREAM, JOB_GROUP, entry_id)
+            pipe.xdel(JOB_STREAM, entry_id)
+            pipe.xadd(JOB_STREAM, {"job_id": job_id})
+            pipe.execute()
+            return "queued"
+        client.hset(key, mapping={"status": "failed", "error": repr(exc), "finished_at_ms": _now_ms()})
+        client.hincrby(JOB_METRICS_KEY, "failed", 1)
+        _ack(client, entry_id)
+        return "failed"
+
+    finished = _now_ms()
+    wait_ms = started - int(job.get("enqueued_at_ms", started))
+    pipe = client.pipeline()
+    pipe.hset(
+        key,
+        mapping={"status": "done", "result": dumps(result), "finished_at_ms": finished},
+    )
+    pipe.hdel(key, "error")
+    pipe.expire(key, PLANNER_JOB_RESULT_TTL_SECONDS)
+    pipe.hincrby(JOB_METRICS_KEY, "completed", 1)
+    pipe.hincrbyfloat(JOB_METRICS_KEY, "wait_ms_total", wait_ms)
+    pipe.hincrbyfloat(JOB_METRICS_KEY, "run_ms_total", finished - started)
+    pipe.execute()
+    if wait_ms > float(client.hget(JOB_METRICS_KEY, "wait_ms_max") or 0):
+        client.hset(JOB_METRICS_KEY, "wait_ms_max", wait_ms)
+    _ack(client, entry_id)
+    return "done"
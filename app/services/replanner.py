@@ -0,0 +1,231 @@
+"""Incremental re-planning on top of a stored plan.
+
+``/planner/run`` keeps the state of each plan it computes in Redis under a plan
+id: the request, pass-1 rows per item, the approvals it saw and the schedule. A
+re-plan applies a delta (items upserted or removed, approval statuses changed) to
+that state and reruns the pipeline with ``PlanReuse``: unchanged items keep their
+pass-1 scores and dependency results and, in baseline_only mode, slots before the
+first one the delta can affect keep their previous assignment (the flow modes
+schedule every slot again). Plans from another day or config are recomputed in
+full.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import uuid
+from typing import Any, Callable, Iterable, Iterator
+
+import redis
+
+from app.core.instrumentation import Trace
+from app.models.planner import Item, PlannerResult
+from app.services.approvals_store import get_approval_statuses
+from app.services.planner import PlanReuse, collect_result, iter_planner_events, rejection_changes
+from app.services.planner_config import PlannerConfig
+from app.services.slot_calendar import local_now
+
+logger = logging.getLogger(__name__)
+
+PLAN_STATE_TTL_SECONDS = int(os.getenv("PLANNER_PLAN_STATE_TTL_SECONDS", "86400"))
+# bump when the stored pass-1 rows change shape or meaning; older states are recomputed in full
+PLAN_STATE_VERSION = 3
+
+
+def _plan_key(plan_id: str) -> str:
+    return f"planner:plan:{plan_id}"
+
+
+def save_plan_state(client: redis.Redis, state: dict[str, Any]) -> str:
+    plan_id = uuid.uuid4().hex
+    client.set(_plan_key(plan_id), json.dumps(state, default=str), ex=PLAN_STATE_TTL_SECONDS)
+    return plan_id
+
+
+def load_plan_state(client: redis.Redis, plan_id: str) -> dict[str, Any] | None:
+    raw = client.get(_plan_key(plan_id))
+    return json.loads(raw) if raw else None
+
+
+def _item_dicts(items: Iterable[Item | dict[str, Any]]) -> list[dict[str, Any]]:
+    out = []
+    for it in items:
+        model = it if isinstance(it, Item) else Item.model_validate(it)
+        out.append(model.model_dump(mode="json"))
+    return out
+
+
+def run_and_store(
+    client: redis.Redis,
+    *,
+    items: list[dict[str, Any]],
+    campaigns: list[dict[str, Any]],
+    objectives: list[dict[str, Any]],
+    planner_config: PlannerConfig,
+    mode: str | None = None,
+    horizon_days: int | None = None,
+    parent_plan_id: str | None = None,
+    **planner_kwargs: Any,
+) -> PlannerResult:
+    """run_planner, then store the plan's state and put its ``plan_id`` in the metadata."""
+    return collect_result(
+        iter_and_store(
+            client,
+            items=items,
+            campaigns=campaigns,
+            objectives=objectives,
+            planner_config=planner_config,
+            mode=mode,
+            horizon_days=horizon_days,
+            parent_plan_id=parent_plan_id,
+            **planner_kwargs,
+        )
+    )
+
+
+def iter_and_store(
+    client: redis.Redis,
+    *,
+    items: list[dict[str, Any]],
+    campaigns: list[dict[str, Any]],
+    objectives: list[dict[str, Any]],
+    planner_config: PlannerConfig,
+    mode: str | None = None,
+    horizon_days: int | None = None,
+    parent_plan_id: str | None = None,
+    keep_going: bool = False,
+    **planner_kwargs: Any,
+) -> Iterator[tuple[str, Any]]:
+    """iter_planner_events, storing the plan's state before the final metadata event, which gets its ``plan_id``.
+
+    With ``keep_going`` (streams, which cannot be restarted) a Redis error is logged
+    and the metadata goes out without a plan_id; otherwise it is raised.
+    """
+    item_dicts = _item_dicts(items)
+    captured: dict[str, Any] = {}
+    for kind, payload in iter_planner_events(
+        items=item_dicts,
+        campaigns=campaigns,
+        objectives=objectives,
+        planner_config=planner_config,
+        mode=mode,
+        horizon_days=horizon_days,
+        state_out=captured,
+        **planner_kwargs,
+    ):
+        if kind == "metadata":
+            captured.update(
+                version=PLAN_STATE_VERSION,
+                items=item_dicts,
+                campaigns=campaigns,
+                objectives=objectives,
+                parent_plan_id=parent_plan_id,
+            )
+            try:
+                payload["plan_id"] = save_plan_state(client, captured)
+            except redis.RedisError:
+                if not keep_going:
+                    raise
+                logger.warning("Could not store plan state; /planner/replan will not find this plan", exc_info=True)
+        yield kind, payload
+
+
+def replan(
+    client: redis.Redis,
+    plan_id: str,
+    *,
+    planner_config: PlannerConfig,
+    upsert_items: list[dict[str, Any]] | None = None,
+    remove_item_ids: list[str] | None = None,
+    approvals: dict[str, str] | None = None,
+    approval_lookup: Callable[[Iterable[str]], dict[str, str]] | None = None,
+    trace: Trace | None = None,
+) -> PlannerResult:
+    """Apply a delta to a stored plan; raises LookupError for unknown or expired plans.
+
+    Approval statuses are read again for every draft (``approval_lookup``, default
+    the approvals store), so decisions made since the plan was computed count;
+    ``approvals`` overrides them, e.g. for decisions not written yet.
+    """
+    state = load_plan_state(client, plan_id)
+    if state is None:
+        raise LookupError(plan_id)
+
+    previous = state["items"]
+    previous_ids = {it["id"] for it in previous}
+    previous_json = {it["id"]: json.dumps(it, sort_keys=True) for it in previous}
+    upserts = {it["id"]: it for it in _item_dicts(upsert_items or [])}
+    removed = set(remove_item_ids or ())
+    approvals = approvals or {}
+
+    items = [upserts.get(it["id"], it) for it in previous if it["id"] not in removed]
+    items += [it for item_id, it in upserts.items() if item_id not in previous_ids and item_id not in removed]
+
+    dirty_items = {i for i in removed if i in previous_ids}
+    dirty_items |= {
+        item_id for item_id, it in upserts.items() if previous_json.get(item_id) != json.dumps(it, sort_keys=True)
+    }
+    known = state["approvals"]
+    store_lookup = approval_lookup or get_approval_statuses
+    seen: dict[str, str] = {}
+
+    def lookup(draft_ids: Iterable[str]) -> dict[str, str]:
+        ids = list(draft_ids)
+        # one batched query for every draft; the pipeline compares it with ``known``
+        statuses = store_lookup(ids)
+        wanted = set(ids)
+        statuses.update((d, s) for d, s in approvals.items() if d in wanted)
+        seen.update((d, statuses.get(d, "proposed")) for d in ids)
+        return statuses
+
+    full_recompute_reason = None
+    if state.get("version") != PLAN_STATE_VERSION:
+        full_recompute_reason = "state_format"
+    elif state.get("fingerprint") != planner_config.fingerprint:
+        full_recompute_reason = "config_changed"
+    elif state.get("ref_ordinal") != local_now(planner_config.cadence.timezone).toordinal():
+        full_recompute_reason = "new_day"
+
+    reuse = None
+    if full_recompute_reason is None:
+        reuse = PlanReuse(
+            pass1=state["pass1"],
+            schedule=[(int(i), d) for i, d in state["schedule"]],
+            top_scores=state["top_scores"],
+            dirty_items=frozenset(dirty_items),
+            approvals=known,
+        )
+
+    result = run_and_store(
+        client,
+        items=items,
+        campaigns=state["campaigns"],
+        objectives=state["objectives"],
+        planner_config=planner_config,
+        mode=state["mode"],
+        horizon_days=state["horizon_days"],
+        parent_plan_id=plan_id,
+        reuse=reuse,
+        approval_lookup=lookup,
+        trace=trace,
+    )
+
+    metadata = result.metadata
+    if reuse is None:
+        metadata["reuse"] = {
+            "candidates": {"reused": 0, "recomputed": metadata["total_candidates"]},
+            "slots": {
+                "first_recomputed_slot": None,
+                "reused_slots": 0,
+                "recomputed_slots": sum(p["total"] for p in metadata["scheduler"]["slots"].values()),
+            },
+        }
+    metadata["replan"] = {
+        "parent_plan_id": plan_id,
+        "full_recompute_reason": full_recompute_reason,
+        "items": {"upserted": len(upserts), "removed": len(removed & previous_ids), "dirty": len(dirty_items)},
+        # drafts still in the plan whose rejection changed, from the store or the delta
+        "approvals_changed": len(rejection_changes({d: s for d, s in known.items() if d in seen}, seen)),
+    }
+    return result
@@ -0,0 +1,115 @@
+"""Local-time slot calendar.
+
+Slot times in the configs are wall-clock times in the cadence timezone
+(Europe/London), so slots are built as aware datetimes in that zone and stay at
+18:00 local across DST changes. A calendar depends only on (timezone, first day,
+horizon, slot spec), so it is memoized and shared by every run planning from the
+same day.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from app.services.planner_config import PlannerConfig
+
+BASELINE_ONLY = "baseline_only"
+
+SLOT_CALENDAR_CACHE_SIZE = int(os.getenv("PLANNER_SLOT_CALENDAR_CACHE_SIZE", "64"))
+
+# (platform, weekday, hour, minute, kind, cap period) with Monday = 0
+SlotSpec = tuple[tuple[str, int, int, int, str, "str | None"], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    platform: str
+    dt: datetime
+    # local calendar day, used for all day-based math (urgency, cooldowns)
+    ordinal: int
+    # "baseline", "regular" or "extra" (only open to candidates that trigger an extra post)
+    kind: str
+    # cap period this slot counts towards, None when the platform is uncapped
+    period: tuple[str, int, int] | None
+
+
+def local_now(tz_name: str) -> datetime:
+    return datetime.now(ZoneInfo(tz_name))
+
+
+def to_local(dt: datetime, tz: ZoneInfo) -> datetime:
+    """Aware datetimes are converted; naive ones are taken as wall time in ``tz``."""
+    if dt.tzinfo is None:
+        return _normalise(dt.replace(tzinfo=tz), tz)
+    return dt.astimezone(tz)
+
+
+def local_ordinal(dt: datetime, tz: ZoneInfo) -> int:
+    return to_local(dt, tz).toordinal()
+
+
+def _normalise(dt: datetime, tz: ZoneInfo) -> datetime:
+    # wall times skipped by a spring-forward jump don't exist; move them past the gap
+    return dt.astimezone(timezone.utc).astimezone(tz)
+
+
+def slot_spec(pc: PlannerConfig, mode: str) -> SlotSpec:
+    policy = pc.cadence
+    spec = []
+    for platform in pc.formats_by_platform:
+        baseline = policy.baseline_slots.get(platform, ())
+        kinds = {t: "baseline" for t in baseline}
+        if mode != BASELINE_ONLY:
+            for t in policy.timing_preferences.get(platform, ()):
+                if t in kinds:
+                    continue
+                # on platforms with a baseline, the other extra_post_slots times need a trigger
+                kinds[t] = "extra" if baseline and t in policy.extra_slots else "regular"
+        cap = policy.caps.get(platform)
+        for (weekday, hour, minute), kind in kinds.items():
+            spec.append((platform, weekday, hour, minute, kind, cap[0] if cap else None))
+    return tuple(spec)
+
+
+def _period(kind: str | None, day: date) -> tuple[str, int, int] | None:
+    if kind is None:
+        return None
+    if kind == "week":
+        iso = day.isocalendar()
+        return ("week", iso[0], iso[1])
+    return ("month", day.year, day.month)
+
+
+@lru_cache(maxsize=SLOT_CALENDAR_CACHE_SIZE)
+def slot_calendar(tz_name: str, start_ordinal: int, horizon_days: int, spec: SlotSpec) -> tuple[Slot, ...]:
+    """Slots on local days ``start_ordinal .. start_ordinal + horizon_days``, in time order."""
+    tz = ZoneInfo(tz_name)
+    platform_order = {p: i for i, p in enumerate(dict.fromkeys(entry[0] for entry in spec))}
+    by_weekday: dict[int, list[tuple[str, int, int, int, str, str | None]]] = {}
+    for entry in spec:
+        by_weekday.setdefault(entry[1], []).append(entry)
+
+    slots: list[Slot] = []
+    for ordinal in range(start_ordinal, start_ordinal + horizon_days + 1):
+        day = date.fromordinal(ordinal)
+        for platform, _, hour, minute, kind, period in by_weekday.get(day.weekday(), ()):
+            dt = _normalise(datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz), tz)
+            slots.append(Slot(platform, dt, ordinal, kind, _period(period, day)))
+
+    slots.sort(key=lambda s: (s.dt, platform_order[s.platform]))
+    return tuple(slots)
+
+
+def calendar_cache_stats() -> dict[str, int]:
+    info = slot_calendar.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+def build_slots(pc: PlannerConfig, start: datetime, horizon_days: int, mode: str) -> tuple[Slot, ...]:
+    """All slots from ``start``'s local day through ``horizon_days`` days later."""
+    tz_name = pc.cadence.timezone
+    start_ordinal = local_ordinal(start, ZoneInfo(tz_name))
+    return slot_calendar(tz_name, start_ordinal, horizon_days, slot_spec(pc, mode))
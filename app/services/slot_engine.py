@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable
+from zoneinfo import ZoneInfo
+
+from app.models.planner import Item
+from app.services.campaign_phases import PhaseBoost
+from app.services.planner_config import EligibilityRules, PlannerConfig
+from app.services.slot_calendar import to_local
+
+
+# Urgency is a step function of days-until-event. Each step is (lowest days_until in
+# the bucket, score), ordered from the far future towards the event.
+URGENCY_STEPS: tuple[tuple[int, float], ...] = (
+    (31, 2.0),
+    (15, 6.0),
+    (8, 12.0),
+    (4, 20.0),
+    (1, 25.0),
+    (0, 30.0),
+)
+URGENCY_PAST_EVENT = 0.0
+URGENCY_NO_EVENT = 3.0
+
+_ONE_TICK = timedelta(microseconds=1)
+
+
+def urgency_for_days(days_until: int | None) -> float:
+    if days_until is None:
+        return URGENCY_NO_EVENT
+    for lowest, score in URGENCY_STEPS:
+        if days_until >= lowest:
+            return score
+    return URGENCY_PAST_EVENT
+
+
+def next_urgency_change(days_until: int) -> int | None:
+    """days_until value at which the urgency bucket next changes as time moves forward."""
+    for lowest, _ in URGENCY_STEPS:
+        if days_until >= lowest:
+            return lowest - 1
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class EligibilityWindow:
+    """An item's eligibility windows as closed local-time intervals, computed once.
+
+    ``None`` bounds are open-ended. The "after the event" side of the rules is a
+    strict comparison, so its interval starts one microsecond after event_start.
+    ``count_start``/``count_end`` bound the max_posts_per_platform_in_window count.
+    """
+
+    intervals: tuple[tuple[datetime | None, datetime | None], ...]
+    count_start: datetime | None = None
+    count_end: datetime | None = None
+
+    @classmethod
+    def for_item(cls, item: Item, rules: EligibilityRules, tz: ZoneInfo) -> "EligibilityWindow":
+        if not item.event_start:
+            return cls(((None, None),))  # no event anchor → always eligible
+
+        # day offsets are wall-clock days, so shift the event in local time
+        event_dt = to_local(item.event_start, tz)
+
+        def _shift(days: int | None) -> datetime | None:
+            return None if days is None else event_dt + timedelta(days=days)
+
+        intervals = []
+
+        pre_lo = _shift(None if rules.pre_event_earliest_days is None else -rules.pre_event_earliest_days)
+        pre_hi = event_dt
+        if rules.pre_event_latest_days is not None:
+            pre_hi = min(pre_hi, event_dt - timedelta(days=rules.pre_event_latest_days))
+        if pre_lo is None or pre_lo <= pre_hi:
+            intervals.append((pre_lo, pre_hi))
+
+        post_lo = event_dt + _ONE_TICK
+        if rules.post_event_earliest_days is not None:
+            post_lo = max(post_lo, _shift(rules.post_event_earliest_days))
+        post_hi = _shift(rules.post_event_latest_days)
+        if post_hi is None or post_lo <= post_hi:
+            intervals.append((post_lo, post_hi))
+
+        return cls(
+            tuple(intervals),
+            count_start=_shift(None if rules.pre_event_earliest_days is None else -rules.pre_event_earliest_days),
+            count_end=_shift(rules.post_event_latest_days),
+        )
+
+    def status_at(self, now: datetime) -> tuple[bool, datetime | None]:
+        """(eligible now, next instant it becomes eligible or None if never again)."""
+        for lo, hi in self.intervals:
+            if hi is not None and now > hi:
+                continue
+            if lo is None or now >= lo:
+                return True, None
+            return False, lo
+        return False, None
+
+
+class ScheduleLedger:
+    """Datetimes already scheduled per (item_id, platform), kept sorted."""
+
+    def __init__(self) -> None:
+        self._by_key: dict[tuple[str, str], list[datetime]] = {}
+
+    def add(self, item_id: str, platform: str, dt: datetime) -> None:
+        insort(self._by_key.setdefault((item_id, platform), []), dt)
+
+    def count(self, item_id: str, platform: str, start: datetime | None, end: datetime | None) -> int:
+        dts = self._by_key.get((item_id, platform))
+        if not dts:
+            return 0
+        lo = bisect_left(dts, start) if start is not None else 0
+        hi = bisect_right(dts, end) if end is not None else len(dts)
+        return max(hi - lo, 0)
+
+
+def cooldown_days_for(pc: PlannerConfig, item: Item, platform: str, days_until: int | None) -> int:
+    # base cooldown
+    base = pc.base_cooldown_days(platform)
+
+    # ramp-up overrides for events near the date
+    # only applies if item has event_start
+    if days_until is not None:
+        level = (item.push_level or "normal").lower()
+        window = pc.push_windows.get(level)
+
+        if window:
+            within_days, override = window
+            if 0 <= days_until <= within_days:
+                return override
+
+    return base
+
+
+def _min_cooldown_days(pc: PlannerConfig, item: Item, platform: str) -> int:
+    base = pc.base_cooldown_days(platform)
+    window = pc.push_windows.get((item.push_level or "normal").lower()) if item.event_start else None
+    return min(base, window[1]) if window else base
+
+
+@dataclass(eq=False, slots=True)
+class SlotCandidate:
+    """A gated, unrejected candidate plus its slot-independent score parts."""
+
+    draft_index: int
+    pos: int
+    item: Item
+    platform: str
+    fmt: str
+    key_id: str
+    rules: EligibilityRules
+    event_ordinal: int | None
+    # (objective, platform, format_bias, content_fit, audience), summed after urgency
+    static_parts: tuple[float, float, float, float, float]
+    window: EligibilityWindow
+    score: float
+    version: int
+    state: str
+    # campaign phase multipliers for this item and platform
+    boost: PhaseBoost | None = None
+
+    def days_until(self, slot_ordinal: int) -> int | None:
+        return None if self.event_ordinal is None else self.event_ordinal - slot_ordinal
+
+    def score_at(self, slot_ordinal: int) -> float:
+        obj, plat, bias, fit, aud = self.static_parts
+        total = urgency_for_days(self.days_until(slot_ordinal)) + obj + plat + bias + fit + aud
+        if self.boost is not None:
+            total *= self.boost.multiplier(slot_ordinal)
+        return total
+
+    def next_score_change(self, slot_ordinal: int) -> int | None:
+        """First day after ``slot_ordinal`` on which ``score_at`` may change (urgency step or campaign phase)."""
+        change = None
+        if self.event_ordinal is not None:
+            change_at = next_urgency_change(self.event_ordinal - slot_ordinal)
+            if change_at is not None:
+                change = self.event_ordinal - change_at
+        if self.boost is not None:
+            boost_change = self.boost.next_change(slot_ordinal)
+            if boost_change is not None and (change is None or boost_change < change):
+                change = boost_change
+        return change
+
+
+_ACTIVE = "active"
+_WAITING = "waiting"
+_DROPPED = "dropped"
+
+
+@dataclass
+class PlatformSlotPicker:
+    """Picks the best candidate for successive slots of one platform.
+
+    Slots must be fed in chronological order as local-time datetimes; cooldowns
+    count local calendar days between posts. Scores are only recomputed when a
+    candidate crosses an urgency breakpoint or a campaign phase boundary;
+    candidates that are cooling down or outside their eligibility window sleep
+    until the next instant their status can change, and candidates that can never
+    be scheduled again are dropped.
+    """
+
+    platform: str
+    pc: PlannerConfig
+    candidates: list[SlotCandidate]
+    # (series key, platform) -> local day ordinal of the latest post
+    last_scheduled: dict[tuple[str, str], int] = field(default_factory=dict)
+    ledger: ScheduleLedger = field(default_factory=ScheduleLedger)
+    rescored: int = 0
+    window_skipped: int = 0
+
+    def __post_init__(self) -> None:
+        # heap ties break on position, which follows draft_candidates order
+        for pos, cand in enumerate(self.candidates):
+            cand.pos = pos
+        self._active: list[tuple[float, int, int]] = []
+        # (day ordinal the score next changes, pos, version)
+        self._rescore: list[tuple[int, int, int]] = []
+        self._waiting: list[tuple[datetime, int, int]] = []
+        self._started = False
+
+    def _activate(self, cand: SlotCandidate, slot_ordinal: int) -> None:
+        cand.version += 1
+        cand.state = _ACTIVE
+        cand.score = cand.score_at(slot_ordinal)
+        self.rescored += 1
+        heapq.heappush(self._active, (-cand.score, cand.pos, cand.version))
+        change_at = cand.next_score_change(slot_ordinal)
+        if change_at is not None:
+            heapq.heappush(self._rescore, (change_at, cand.pos, cand.version))
+
+    def _sleep_until(self, cand: SlotCandidate, wake_at: datetime | None) -> None:
+        cand.version += 1
+        if wake_at is None:
+            cand.state = _DROPPED
+            return
+        cand.state = _WAITING
+        heapq.heappush(self._waiting, (wake_at, cand.pos, cand.version))
+
+    def _window_ok(self, cand: SlotCandidate, slot_dt: datetime) -> bool:
+        eligible, wake_at = cand.window.status_at(slot_dt)
+        if not eligible:
+            self._sleep_until(cand, wake_at)
+        return eligible
+
+    def _cooldown_ok(self, cand: SlotCandidate, slot_dt: datetime, slot_ordinal: int) -> bool:
+        last = self.last_scheduled.get((cand.key_id, self.platform))
+        if last is None:
+            return True
+        if slot_ordinal - last > cooldown_days_for(self.pc, cand.item, self.platform, cand.days_until(slot_ordinal)):
+            return True
+        # local midnight of the first day the shortest cooldown could have passed
+        wake_day = date.fromordinal(last + _min_cooldown_days(self.pc, cand.item, self.platform) + 1)
+        wake_at = datetime.combine(wake_day, time(), tzinfo=slot_dt.tzinfo)
+        self._sleep_until(cand, max(wake_at, slot_dt + _ONE_TICK))
+        return False
+
+    def _max_posts_ok(self, cand: SlotCandidate) -> bool:
+        max_posts = cand.rules.max_posts_per_platform_in_window
+        if max_posts is None:
+            return True
+
+        window = cand.window
+        already = self.ledger.count(cand.item.id, self.platform, window.count_start, window.count_end)
+        if already >= max_posts:
+            # scheduled posts only accumulate, so this never frees up again
+            self._sleep_until(cand, None)
+            return False
+        return True
+
+    def admits(self, cand: SlotCandidate, slot_dt: datetime) -> bool:
+        """Whether ``cand`` may take the slot at ``slot_dt``; unlike ``pick`` this has no side effects."""
+        slot_ordinal = slot_dt.toordinal()
+        last = self.last_scheduled.get((cand.key_id, self.platform))
+        if last is not None and slot_ordinal - last <= cooldown_days_for(
+            self.pc, cand.item, self.platform, cand.days_until(slot_ordinal)
+        ):
+            return False
+        if not cand.window.status_at(slot_dt)[0]:
+            return False
+        max_posts = cand.rules.max_posts_per_platform_in_window
+        if max_posts is not None:
+            window = cand.window
+            if self.ledger.count(cand.item.id, self.platform, window.count_start, window.count_end) >= max_posts:
+                return False
+        return True
+
+    def record(self, cand: SlotCandidate, slot_dt: datetime) -> None:
+        self.last_scheduled[(cand.key_id, self.platform)] = slot_dt.toordinal()
+        self.ledger.add(cand.item.id, self.platform, slot_dt)
+
+    def pick(
+        self,
+        slot_dt: datetime,
+        accept: Callable[[SlotCandidate], bool] | None = None,
+    ) -> SlotCandidate | None:
+        """Best admissible candidate for the slot, recorded as scheduled.
+
+        ``accept`` narrows the pick for this slot only; candidates it rejects keep
+        their place for later slots.
+        """
+        slot_ordinal = slot_dt.toordinal()
+        by_pos = self.candidates
+
+        if not self._started:
+            # candidates whose windows open later sleep until then; closed ones never load
+            self._started = True
+            for cand in by_pos:
+                eligible, wake_at = cand.window.status_at(slot_dt)
+                if eligible:
+                    self._activate(cand, slot_ordinal)
+                else:
+                    self.window_skipped += 1
+                    self._sleep_until(cand, wake_at)
+
+        while self._rescore and self._rescore[0][0] <= slot_ordinal:
+            _, idx, version = heapq.heappop(self._rescore)
+            cand = by_pos[idx]
+            if cand.version == version and cand.state == _ACTIVE:
+                self._activate(cand, slot_ordinal)
+
+        while self._waiting and self._waiting[0][0] <= slot_dt:
+            _, idx, version = heapq.heappop(self._waiting)
+            cand = by_pos[idx]
+            if cand.version == version and cand.state == _WAITING:
+                self._activate(cand, slot_ordinal)
+
+        held: list[tuple[float, int, int]] = []
+        try:
+            while self._active:
+                _, idx, version = self._active[0]
+                cand = by_pos[idx]
+                if cand.version != version or cand.state != _ACTIVE:
+                    heapq.heappop(self._active)
+                    continue
+                if not self._cooldown_ok(cand, slot_dt, slot_ordinal):
+                    continue
+                if not self._window_ok(cand, slot_dt):
+                    continue
+                if not self._max_posts_ok(cand):
+                    continue
+                if accept is not None and not accept(cand):
+                    held.append(heapq.heappop(self._active))
+                    continue
+
+                # the winner stays queued: it can be picked again once its cooldown passes
+                self.record(cand, slot_dt)
+                return cand
+
+            return None
+        finally:
+            for entry in held:
+                heapq.heappush(self._active, entry)
+
+
+def build_slot_candidate(
+    draft_index: int,
+    item: Item,
+    platform: str,
+    fmt: str,
+    rules: EligibilityRules,
+    window: EligibilityWindow,
+    static_parts: tuple[float, float, float, float, float],
+    event_ordinal: int | None,
+    boost: PhaseBoost | None = None,
+) -> SlotCandidate:
+    return SlotCandidate(
+        draft_index=draft_index,
+        pos=0,
+        item=item,
+        platform=platform,
+        fmt=fmt,
+        key_id=item.series_id or item.id,
+        rules=rules,
+        event_ordinal=event_ordinal,
+        static_parts=static_parts,
+        window=window,
+        score=0.0,
+        version=0,
+        state=_WAITING,
+        boost=boost,
+    )
+
+
+def engine_stats(pickers: dict[str, PlatformSlotPicker]) -> dict[str, Any]:
+    return {
+        "candidates": sum(len(p.candidates) for p in pickers.values()),
+        "window_skipped": sum(p.window_skipped for p in pickers.values()),
+        "rescored": sum(p.rescored for p in pickers.values()),
+    }
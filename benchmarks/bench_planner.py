@@ -0,0 +1,290 @@
+"""Planner benchmark: latency, throughput and peak memory across workload sizes.
+
+    python -m benchmarks.bench_planner                      # 100, 1k, 10k items
+    python -m benchmarks.bench_planner --sizes 100000 --repeat 3
+    python -m benchmarks.bench_planner --sizes 10000 --campaigns 500
+    python -m benchmarks.bench_planner --save-baseline      # write benchmarks/baseline.json
+    python -m benchmarks.bench_planner --baseline benchmarks/baseline.json
+
+Approvals come from an in-memory lookup, so neither Postgres nor Redis is needed.
+With ``--baseline`` the run exits non-zero if any p50 is more than ``--tolerance``
+slower than the stored one. A baseline recorded with other planner configs (its
+``config_fingerprint``) or another mode, campaign count or pass-1 setting is
+reported and not compared: its timings measure a different workload.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from app.core.config_loader import ConfigLoader
+from app.core.instrumentation import Trace
+from app.services import planner
+from app.services.batch_scoring import numpy_available
+from app.services.planner_config import PlannerConfig, get_planner_config
+from benchmarks.workload import WorkloadSpec, generate_workload
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# planner trace spans; candidate_generation includes gating and scoring
+PHASES = (
+    "coerce_items",
+    "campaign_calendar",
+    "candidate_generation",
+    "gating",
+    "scoring",
+    "approvals_lookup",
+    "slot_setup",
+    "slot_picking",
+    "materialize",
+    "approval_queue",
+    "export_queue",
+)
+# latencies below this are mostly timer noise and are not compared
+MIN_COMPARE_MS = 1.0
+
+
+def _lookup(approvals: dict[str, str]) -> Callable[[Any], dict[str, str]]:
+    def lookup(draft_ids):
+        return {d: approvals[d] for d in draft_ids if d in approvals}
+
+    return lookup
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    # nearest rank
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _summary(samples_ms: list[float], n_items: int) -> dict[str, Any]:
+    p50 = _percentile(samples_ms, 50)
+    return {
+        "runs": len(samples_ms),
+        "p50_ms": round(p50, 3),
+        "p99_ms": round(_percentile(samples_ms, 99), 3),
+        "items_per_s": round(n_items / (p50 / 1000), 1) if p50 else None,
+    }
+
+
+def _timed(fn: Callable[[], Any]) -> tuple[float, Any]:
+    started = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - started) * 1000, out
+
+
+def bench_size(
+    n_items: int,
+    pc: PlannerConfig,
+    *,
+    repeat: int,
+    seed: int,
+    mode: str | None,
+    horizon_days: int | None,
+    backend: str,
+    measure_memory: bool = True,
+    parallel: bool = False,
+    campaigns: int = 0,
+) -> dict[str, Any]:
+    workload = generate_workload(WorkloadSpec(n_items=n_items, seed=seed, n_campaigns=campaigns), pc.columns)
+    lookup = _lookup(workload.approvals)
+
+    def run(trace: Trace | None = None):
+        return planner.run_planner(
+            items=workload.items,
+            campaigns=workload.campaigns,
+            objectives=workload.objectives,
+            planner_config=pc,
+            scoring_backend=backend,
+            mode=mode,
+            horizon_days=horizon_days,
+            approval_lookup=lookup,
+            trace=trace,
+            parallel=parallel,
+        )
+
+    # warm-up: compiles caches (fit keys, slot calendar) the way a long-lived worker has them
+    run()
+
+    totals: list[float] = []
+    phases: dict[str, list[float]] = {p: [] for p in PHASES}
+    counters: dict[str, int] = {}
+    for _ in range(repeat):
+        gc.collect()
+        trace = Trace()
+        elapsed, result = _timed(lambda: run(trace))
+        totals.append(elapsed)
+        timings = result.metadata["timings"]
+        for phase in PHASES:
+            phases[phase].append(timings["spans_ms"].get(phase, 0.0))
+        counters = timings["counters"]
+
+    report: dict[str, Any] = {
+        "items": n_items,
+        "candidates": result.metadata["total_candidates"],
+        "scheduled_slots": result.metadata["scheduled_slots"],
+        "scoring_backend": result.metadata["scoring_backend"],
+        "total": _summary(totals, n_items),
+        "phases": {phase: _summary(samples, n_items) for phase, samples in phases.items()},
+        "counters": counters,
+    }
+    if measure_memory:
+        # tracemalloc slows allocation down, so peak memory gets its own run
+        gc.collect()
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report["peak_memory_mb"] = round(peak / 2**20, 2)
+    return report
+
+
+# report keys that must match for two runs to measure the same workload
+_COMPARABLE_KEYS = ("config_fingerprint", "mode", "parallel", "campaigns")
+
+
+def baseline_mismatch(current: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    """Settings that differ between ``current`` and ``baseline``, as "key: baseline -> current"."""
+    defaults = {"parallel": False, "campaigns": 0}
+    return [
+        f"{key}: {baseline.get(key, defaults.get(key))} -> {current.get(key, defaults.get(key))}"
+        for key in _COMPARABLE_KEYS
+        if baseline.get(key, defaults.get(key)) != current.get(key, defaults.get(key))
+    ]
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Regressions of p50 latency (total and per phase) and peak memory beyond ``tolerance``.
+
+    Empty when the baseline is not comparable (see ``baseline_mismatch``).
+    """
+    if baseline_mismatch(current, baseline):
+        return []
+    regressions = []
+    previous = {r["items"]: r for r in baseline.get("results", [])}
+    for report in current["results"]:
+        base = previous.get(report["items"])
+        if base is None:
+            continue
+        pairs = [("total", report["total"]["p50_ms"], base["total"]["p50_ms"])]
+        pairs += [
+            (phase, summary["p50_ms"], base["phases"][phase]["p50_ms"])
+            for phase, summary in report["phases"].items()
+            if phase in base.get("phases", {})
+        ]
+        if "peak_memory_mb" in report and "peak_memory_mb" in base:
+            pairs.append(("peak_memory_mb", report["peak_memory_mb"], base["peak_memory_mb"]))
+        for name, now, before in pairs:
+            if name != "peak_memory_mb" and before < MIN_COMPARE_MS:
+                continue
+            if before and now > before * (1 + tolerance):
+                regressions.append(f"{report['items']} items {name}: {before} -> {now} (+{(now / before - 1):.0%})")
+    return regressions
+
+
+def _print_report(results: list[dict[str, Any]], baseline: dict[str, Any] | None) -> None:
+    previous = {r["items"]: r for r in (baseline or {}).get("results", [])}
+    header = f"{'items':>8} {'phase':<22} {'p50 ms':>10} {'p99 ms':>10} {'items/s':>12} {'vs base':>8}"
+    print(header)
+    print("-" * len(header))
+    for report in results:
+        base = previous.get(report["items"])
+        rows = [("total", report["total"], base and base["total"])]
+        rows += [
+            (phase, summary, base and base.get("phases", {}).get(phase))
+            for phase, summary in report["phases"].items()
+        ]
+        for name, summary, base_summary in rows:
+            delta = ""
+            if base_summary and base_summary["p50_ms"]:
+                delta = f"{summary['p50_ms'] / base_summary['p50_ms'] - 1:+.0%}"
+            print(
+                f"{report['items']:>8} {name:<22} {summary['p50_ms']:>10.1f} {summary['p99_ms']:>10.1f} "
+                f"{summary['items_per_s'] or 0:>12.0f} {delta:>8}"
+            )
+        if "peak_memory_mb" in report:
+            print(f"{report['items']:>8} {'peak memory':<22} {report['peak_memory_mb']:>9.1f}M")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated item counts")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per size")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mode", default=None)
+    parser.add_argument("--horizon-days", type=int, default=None)
+    parser.add_argument("--backend", default="auto", choices=("auto", "scalar", "numpy"))
+    parser.add_argument("--parallel", action="store_true", help="run pass 1 on the process pool")
+    parser.add_argument("--campaigns", type=int, default=0, help="campaigns in the workload")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--baseline", type=Path, default=None, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", nargs="?", type=Path, const=DEFAULT_BASELINE, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before failing")
+    parser.add_argument("--json", type=Path, default=None, help="also write the report here")
+    args = parser.parse_args(argv)
+
+    loader = ConfigLoader()
+    configs = loader.load_all()
+    pc = get_planner_config(configs, loader.last_fingerprint)
+
+    results = []
+    for n_items in (int(s) for s in args.sizes.split(",") if s.strip()):
+        results.append(
+            bench_size(
+                n_items,
+                pc,
+                repeat=args.repeat,
+                seed=args.seed,
+                mode=args.mode,
+                horizon_days=args.horizon_days,
+                backend=args.backend,
+                measure_memory=not args.no_memory,
+                parallel=args.parallel,
+                campaigns=args.campaigns,
+            )
+        )
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": numpy_available(),
+        "config_fingerprint": pc.fingerprint,
+        "mode": args.mode or pc.cadence.default_mode,
+        "parallel": args.parallel,
+        "campaigns": args.campaigns,
+        "results": results,
+    }
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    mismatch = baseline_mismatch(report, baseline) if baseline is not None else []
+    if mismatch:
+        print(f"WARNING {args.baseline} was recorded with other settings; not comparing")
+        for line in mismatch:
+            print(f"WARNING   {line}")
+        print("WARNING re-record it with --save-baseline")
+        baseline = None
+    _print_report(results, baseline)
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline written to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Serialization share of /planner/run latency, before and after PlannerJSONResponse.
+
+    python -m benchmarks.bench_serialization                # 100, 1k, 10k items
+    python -m benchmarks.bench_serialization --sizes 1000 --repeat 10
+
+"before" replays FastAPI's ``response_model`` handling of a returned
+``PlannerResult`` (validate, serialize to Python, stdlib ``JSONResponse``);
+"after" is ``PlannerJSONResponse`` uncompressed, then with each encoding this
+install can produce. Share is serialization / (planning + serialization).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.config_loader import ConfigLoader
+from app.core.serialization import ENCODINGS, PlannerJSONResponse, orjson
+from app.models.planner import PlannerResult
+from app.services import planner
+from app.services.planner_config import PlannerConfig, get_planner_config
+from benchmarks.bench_planner import DEFAULT_SIZES, _lookup, _percentile, _timed
+from benchmarks.workload import WorkloadSpec, generate_workload
+
+
+def _p50(fn, repeat: int) -> tuple[float, Any]:
+    samples = []
+    out = None
+    for _ in range(repeat):
+        gc.collect()
+        elapsed, out = _timed(fn)
+        samples.append(elapsed)
+    return round(_percentile(samples, 50), 3), out
+
+
+def bench_size(n_items: int, pc: PlannerConfig, *, repeat: int, seed: int) -> dict[str, Any]:
+    workload = generate_workload(WorkloadSpec(n_items=n_items, seed=seed), pc.columns)
+    lookup = _lookup(workload.approvals)
+
+    def run() -> PlannerResult:
+        return planner.run_planner(
+            items=workload.items, objectives=workload.objectives, planner_config=pc, approval_lookup=lookup
+        )
+
+    run()
+    plan_ms, result = _p50(run, repeat)
+
+    field = create_model_field(name="Response_run_planner", type_=PlannerResult, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def response_model_path() -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=result))
+        return JSONResponse(content).body
+
+    variants = {"response_model": response_model_path}
+    for encoding in (None, *ENCODINGS):
+        variants[encoding or "identity"] = lambda encoding=encoding: PlannerJSONResponse(result, encoding).body
+
+    rows = {}
+    for name, fn in variants.items():
+        fn()
+        ms, body = _p50(fn, repeat)
+        rows[name] = {"ms": ms, "bytes": len(body), "share": round(ms / (plan_ms + ms), 3)}
+    loop.close()
+    return {"items": n_items, "candidates": len(result.draft_candidates), "plan_ms": plan_ms, "serialization": rows}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated item counts")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per size and variant")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", type=Path, default=None, help="also write the report here")
+    args = parser.parse_args(argv)
+
+    loader = ConfigLoader()
+    pc = get_planner_config(loader.load_all(), loader.last_fingerprint)
+    results = [
+        bench_size(n, pc, repeat=args.repeat, seed=args.seed) for n in (int(s) for s in args.sizes.split(",") if s.strip())
+    ]
+
+    header = f"{'items':>8} {'variant':<16} {'ms':>10} {'MB':>8} {'share':>7}"
+    print(f"orjson: {orjson is not None}, encodings: {', '.join(ENCODINGS)}")
+    print(header)
+    print("-" * len(header))
+    for report in results:
+        print(f"{report['items']:>8} {'planning':<16} {report['plan_ms']:>10.1f}")
+        for name, row in report["serialization"].items():
+            print(f"{report['items']:>8} {name:<16} {row['ms']:>10.1f} {row['bytes'] / 2**20:>8.2f} {row['share']:>7.1%}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"orjson": orjson is not None, "results": results}, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Synthetic planner workloads.
+
+Generates Item populations shaped like the real content calendar: most items
+hang off an event spread around today, items cluster into series, and a share of
+drafts already has an approval status. Everything is driven by one seed so a
+size always produces the same workload.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Sequence
+
+ITEM_TYPE_WEIGHTS = {
+    "event": 20,
+    "event_promotion": 10,
+    "event_reminder": 8,
+    "event_recap": 6,
+    "bts": 12,
+    "news": 10,
+    "recap": 6,
+    "youtube_upload": 10,
+    "deadline": 6,
+    "merch": 4,
+    "film": 4,
+    "monthly_summary": 4,
+}
+PUSH_LEVEL_WEIGHTS = {None: 40, "normal": 30, "high": 20, "max": 10}
+AUDIENCES = ("local_liverpool", "artists_collaborators", "core_supporters", "wider_discovery")
+OBJECTIVES = (
+    {"id": "event_attendance", "weight": 7.5},
+    {"id": "youtube_growth", "weight": 3},
+    {"id": "community_engagement", "weight": 2},
+    {"id": "submission_deadline", "weight": 5},
+)
+
+
+@dataclass(frozen=True)
+class WorkloadSpec:
+    n_items: int
+    seed: int = 1
+    # share of items with an event_start, spread uniformly over these days from now
+    event_fraction: float = 0.8
+    event_spread_days: tuple[int, int] = (-14, 60)
+    # share of items in a series, and the average series size
+    series_fraction: float = 0.3
+    series_size: int = 6
+    item_type_weights: dict[str | None, int] = field(default_factory=lambda: dict(ITEM_TYPE_WEIGHTS))
+    push_level_weights: dict[str | None, int] = field(default_factory=lambda: dict(PUSH_LEVEL_WEIGHTS))
+    eventbrite_fraction: float = 0.6
+    max_photos: int = 3
+    max_videos: int = 1
+    # share of drafts with an existing approval status, and how many of those are rejected
+    approval_fraction: float = 0.15
+    rejected_fraction: float = 0.3
+    # campaigns anchored on event days, each covering up to campaign_size items
+    n_campaigns: int = 0
+    campaign_size: int = 12
+
+
+@dataclass
+class Workload:
+    items: list[dict[str, Any]]
+    campaigns: list[dict[str, Any]]
+    objectives: list[dict[str, Any]]
+    # draft_id -> status, served by an in-memory approvals lookup
+    approvals: dict[str, str]
+
+
+def _weighted(rnd: random.Random, weights: dict[Any, int]) -> Any:
+    return rnd.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def generate_workload(
+    spec: WorkloadSpec, columns: Sequence[tuple[str, str]], now: datetime | None = None
+) -> Workload:
+    """Items plus approval history for the (platform, format) ``columns`` of a PlannerConfig."""
+    rnd = random.Random(spec.seed)
+    now = now or datetime.utcnow()
+    lo, hi = spec.event_spread_days
+    n_series = max(1, int(spec.n_items * spec.series_fraction) // max(spec.series_size, 1))
+
+    items = []
+    for i in range(spec.n_items):
+        item: dict[str, Any] = {
+            "id": f"bench-{i}",
+            "item_type": _weighted(rnd, spec.item_type_weights),
+            "audiences": rnd.sample(AUDIENCES, rnd.randint(0, 2)),
+            "push_level": _weighted(rnd, spec.push_level_weights),
+            "assets": {"photo_count": rnd.randint(0, spec.max_photos), "video_count": rnd.randint(0, spec.max_videos)},
+        }
+        if rnd.random() < spec.event_fraction:
+            offset = timedelta(days=rnd.randint(lo, hi), hours=rnd.randint(9, 21))
+            item["event_start"] = (now.replace(hour=0, minute=0, second=0, microsecond=0) + offset).isoformat()
+        if rnd.random() < spec.series_fraction:
+            item["series_id"] = f"series-{rnd.randrange(n_series)}"
+        if rnd.random() < spec.eventbrite_fraction:
+            item["links"] = {"eventbrite": f"https://www.eventbrite.co.uk/e/{i}"}
+        items.append(item)
+
+    approvals = {}
+    for item in items:
+        for platform, fmt in columns:
+            if rnd.random() < spec.approval_fraction:
+                rejected = rnd.random() < spec.rejected_fraction
+                approvals[f"{item['id']}:{platform}:{fmt}"] = "rejected" if rejected else "approved"
+
+    campaigns = []
+    event_items = [item for item in items if "event_start" in item] or items
+    for c in range(spec.n_campaigns):
+        anchor = rnd.choice(event_items)
+        campaigns.append(
+            {
+                "id": f"campaign-{c}",
+                "template": "youtube_release" if anchor["item_type"] == "youtube_upload" else "major_event",
+                "anchor_date": anchor.get("event_start", now.isoformat())[:10],
+                "item_ids": [anchor["id"]] + [it["id"] for it in rnd.sample(items, min(len(items), spec.campaign_size - 1))],
+            }
+        )
+
+    return Workload(items=items, campaigns=campaigns, objectives=[dict(o) for o in OBJECTIVES], approvals=approvals)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import Any, Iterator
+
+import fakeredis
+import pytest
+
+from app.core.config_loader import ConfigLoader
+from app.core.redis_client import set_redis
+from app.services.planner_config import PlannerConfig, get_planner_config
+
+
+@pytest.fixture(scope="session")
+def configs() -> dict[str, Any]:
+    return ConfigLoader().load_all()
+
+
+@pytest.fixture(scope="session")
+def planner_config() -> PlannerConfig:
+    loader = ConfigLoader()
+    return get_planner_config(loader.load_all(), loader.last_fingerprint)
+
+
+@pytest.fixture
+def fake_redis() -> Iterator[fakeredis.FakeRedis]:
+    """In-process Redis installed as the shared client for the test."""
+    client = fakeredis.FakeRedis()
+    set_redis(client)
+    yield client
+    set_redis(None)
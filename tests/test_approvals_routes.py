@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.routes import approvals as approvals_routes
+from app.services import approvals_store
+from app.services.planner_cache import get_planner_cache
+
+
+class _AsyncConn:
+    """Records the rows each executemany() writes and whether they were committed."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[tuple]] = []
+        self.committed = False
+
+    @asynccontextmanager
+    async def cursor(self):
+        yield self
+
+    async def executemany(self, sql, rows) -> None:
+        self.batches.append(list(rows))
+
+    async def commit(self) -> None:
+        self.committed = True
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = _AsyncConn()
+
+    @asynccontextmanager
+    async def get_async_conn():
+        yield conn
+
+    monkeypatch.setattr(approvals_store, "get_async_conn", get_async_conn)
+    return conn
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.include_router(approvals_routes.router)
+    return app
+
+
+def _post_bulk(app, decisions):
+    async def post():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/approvals/bulk", json={"decisions": decisions, "decided_by": "ed"})
+
+    return asyncio.run(post())
+
+
+def test_bulk_decisions_are_written_together_and_invalidate_the_cache(app, conn, fake_redis):
+    cache = get_planner_cache()
+    before = cache.approvals_version()
+
+    response = _post_bulk(
+        app,
+        [
+            {"draft_id": "a:instagram:reel_9x16", "status": "approved"},
+            {"draft_id": "b:facebook:feed_4x5", "status": "rejected", "note": "off brand"},
+        ],
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok", "applied": 2}
+    assert conn.committed and conn.batches == [
+        [
+            ("a:instagram:reel_9x16", "approved", None, "ed"),
+            ("b:facebook:feed_4x5", "rejected", "off brand", "ed"),
+        ]
+    ]
+    assert cache.approvals_version() == before + 1
+
+
+def test_partial_batch_is_rejected_without_writing(app, conn, fake_redis):
+    cache = get_planner_cache()
+    before = cache.approvals_version()
+
+    response = _post_bulk(
+        app,
+        [
+            {"draft_id": "a:instagram:reel_9x16", "status": "approved"},
+            {"draft_id": "b:facebook:feed_4x5", "status": "maybe"},
+        ],
+    )
+
+    assert response.status_code == 422
+    assert "b:facebook:feed_4x5" in response.json()["detail"]
+    assert not conn.batches and not conn.committed
+    assert cache.approvals_version() == before
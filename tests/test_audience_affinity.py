@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pickle
+
+import pytest
+
+from app.services import planner
+from app.services.audience_affinity import AudienceAffinity
+from app.services.planner_config import PlannerConfig
+
+
+def _with_points(configs, points_per_unit):
+    scoring_rules = {**configs["scoring_rules"], "audience_affinity": {"points_per_unit": points_per_unit}}
+    return {**configs, "scoring_rules": scoring_rules}
+
+
+def test_points_per_unit_scales_the_distance_from_neutral(configs):
+    default = AudienceAffinity.from_configs(configs).intern(["local_liverpool"])
+    halved = AudienceAffinity.from_configs(_with_points(configs, 10)).intern(["local_liverpool"])
+    off = AudienceAffinity.from_configs(_with_points(configs, 0)).intern(["local_liverpool"])
+
+    # local_liverpool: instagram 1.2, youtube 0.9 at the shipped 20 points per unit
+    assert default.points["instagram"] == pytest.approx(4.0)
+    assert default.points["youtube"] == pytest.approx(-2.0)
+    assert halved.points["instagram"] == pytest.approx(2.0)
+    assert dict(off.points) == {}
+
+
+def test_audiences_average_with_unlisted_platforms_neutral(configs):
+    affinity = AudienceAffinity.from_configs(configs)
+
+    both = affinity.intern(["core_supporters", "wider_discovery"])
+
+    # patreon: (1.3 + neutral 1.0) / 2; youtube: (neutral 1.0 + 1.3) / 2
+    assert both.points["patreon"] == pytest.approx(3.0)
+    assert both.points["youtube"] == pytest.approx(3.0)
+    assert "google_business" not in both.points
+
+
+def test_equal_sets_are_interned_once(configs):
+    affinity = AudienceAffinity.from_configs(configs)
+
+    first = affinity.intern(["wider_discovery", "core_supporters"])
+    reordered = affinity.intern(["core_supporters", "wider_discovery", "core_supporters", "not_an_audience"])
+
+    assert reordered is first
+    assert first.audiences == ("core_supporters", "wider_discovery")
+    assert affinity.intern(["not_an_audience"]) is affinity.intern([])
+
+
+def test_engine_pickles_with_its_config(configs):
+    copy = pickle.loads(pickle.dumps(AudienceAffinity.from_configs(_with_points(configs, 5))))
+
+    assert copy.intern(["local_liverpool"]).points["instagram"] == pytest.approx(1.0)
+
+
+def test_knob_moves_planner_scores(configs, monkeypatch):
+    monkeypatch.setattr(planner, "get_approval_statuses", lambda draft_ids: {})
+    items = [{"id": "screening", "item_type": "film", "audiences": ["local_liverpool"]}]
+
+    def instagram_scores(points_per_unit):
+        pc = PlannerConfig.from_configs(_with_points(configs, points_per_unit))
+        result = planner.run_planner(items=items, planner_config=pc, mode="baseline_only")
+        return {c.format: c for c in result.draft_candidates if c.platform == "instagram"}
+
+    neutral, boosted = instagram_scores(0), instagram_scores(30)
+
+    for fmt, cand in boosted.items():
+        assert cand.score_breakdown["audience"] == {"audiences": ["local_liverpool"], "score": pytest.approx(6.0)}
+        assert cand.score == pytest.approx(neutral[fmt].score + 6.0)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.planner import Item
+from app.services import planner
+from app.services.batch_scoring import numpy_available
+
+pytestmark = pytest.mark.skipif(not numpy_available(), reason="numpy not installed")
+
+ITEM_TYPES = ["event", "news", "bts", "youtube_upload", "deadline", "merch", "recap", "unknown"]
+# one event on each side of every urgency step, plus past and undated items
+EVENT_OFFSETS = [None, -3, 0, 1, 3, 4, 7, 8, 14, 15, 30, 31, 90]
+OBJECTIVES = [
+    {"id": "event_attendance", "weight": 9},
+    {"id": "community_engagement", "weight": 4.5},
+    {"id": "youtube_growth", "weight": "not a number"},
+]
+
+
+def _items() -> list[Item]:
+    now = datetime.utcnow()
+    items = []
+    for n, item_type in enumerate(ITEM_TYPES * 4):
+        offset = EVENT_OFFSETS[n % len(EVENT_OFFSETS)]
+        items.append(
+            Item(
+                id=f"item{n}",
+                item_type=item_type,
+                event_start=None if offset is None else now + timedelta(days=offset, hours=1),
+                assets={"photo_count": n % 3, "video_count": n % 2},
+            )
+        )
+    return items
+
+
+def test_numpy_backend_scores_like_the_scalar_loop(monkeypatch, planner_config):
+    monkeypatch.setattr(planner, "get_approval_statuses", lambda draft_ids: {})
+    items = _items()
+    scalar, batch = (
+        planner.run_planner(
+            items=items, objectives=OBJECTIVES, planner_config=planner_config, scoring_backend=backend
+        )
+        for backend in ("scalar", "numpy")
+    )
+
+    assert any(c.score is not None for c in scalar.draft_candidates)
+    assert batch.metadata["scoring_backend"] == "numpy"
+    assert scalar.metadata["scoring_backend"] == "scalar"
+    assert batch.model_dump(exclude={"metadata"}) == scalar.model_dump(exclude={"metadata"})
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from itertools import permutations
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.models.planner import Item
+from app.services import planner
+from app.services.cadence_scheduler import (
+    ExtraPostGate,
+    _flow_assignments,
+    _MinCostFlow,
+    assign_slots,
+)
+from app.services.slot_calendar import build_slots, local_ordinal
+from app.services.slot_engine import (
+    EligibilityWindow,
+    PlatformSlotPicker,
+    ScheduleLedger,
+    build_slot_candidate,
+    cooldown_days_for,
+)
+
+TZ = ZoneInfo("Europe/London")
+START = datetime(2026, 3, 4, 9, 30, tzinfo=TZ)  # a Wednesday
+GOLDEN = Path(__file__).parent / "data" / "greedy_baseline_plan.json"
+
+
+def _items() -> list[tuple[Item, float]]:
+    """Items with static score points: series, push levels, urgent and distant events."""
+    scored = []
+    for n in range(24):
+        event_in = [None, 2, 5, 8, 13, 21, 30][n % 7]
+        item = Item(
+            id=f"item{n}",
+            item_type=["event_promotion", "news", "event_reminder", "bts"][n % 4],
+            event_start=None if event_in is None else START + timedelta(days=event_in, hours=n % 9),
+            series_id="weekly" if n % 6 == 0 else None,
+            push_level=["high", "max", None][n % 3],
+        )
+        scored.append((item, float((n * 7) % 13)))
+    return scored
+
+
+def _schedule(pc, mode: str, horizon_days: int = 28):
+    slots = build_slots(pc, START, horizon_days, mode)
+    ledger, last_scheduled = ScheduleLedger(), {}
+    pickers = {}
+    for platform, formats in pc.formats_by_platform.items():
+        candidates = []
+        for idx, (item, points) in enumerate(_items()):
+            rules = pc.eligibility_rules_for(item.item_type)
+            window = EligibilityWindow.for_item(item, rules, TZ)
+            event_ordinal = local_ordinal(item.event_start, TZ) if item.event_start else None
+            candidates.append(
+                build_slot_candidate(idx, item, platform, formats[0], rules, window, (points, 0.0, 0.0, 0.0, 0.0), event_ordinal)
+            )
+        pickers[platform] = PlatformSlotPicker(platform, pc, candidates, last_scheduled, ledger)
+    gate = ExtraPostGate(pc.cadence, mode, pickers, START.toordinal())
+    stats: dict = {}
+    assignments = assign_slots(slots, pickers, pc, gate, stats, optimize=mode != "baseline_only", time_budget_ms=10_000)
+    placed = [(slot, cand) for _, slot, cand in assignments]
+    return slots, pickers, gate, placed, stats
+
+
+@pytest.mark.parametrize("mode", ["normal", "event_push"])
+def test_flow_schedule_respects_every_constraint(planner_config, mode):
+    pc = planner_config
+    policy = pc.cadence
+    _, _, gate, placed, stats = _schedule(pc, mode)
+
+    assert stats["algorithm"] == "min_cost_flow"
+    assert {slot.platform for slot, _ in placed} >= {"instagram", "facebook", "mailchimp"}
+
+    per_period: dict = {}
+    for slot, _ in placed:
+        if slot.period is not None:
+            per_period[(slot.platform, slot.period)] = per_period.get((slot.platform, slot.period), 0) + 1
+    for (platform, _), count in per_period.items():
+        assert count <= policy.caps[platform][2]
+
+    email_sends = sorted(slot.dt for slot, _ in placed if slot.platform in policy.email_platforms)
+    for earlier, later in zip(email_sends, email_sends[1:]):
+        assert later - earlier >= timedelta(hours=policy.email_min_spacing_hours)
+
+    last: dict = {}
+    for slot, cand in placed:
+        key = (cand.key_id, slot.platform)
+        if key in last:
+            cooldown = cooldown_days_for(pc, cand.item, slot.platform, cand.days_until(slot.ordinal))
+            assert slot.ordinal - last[key] > cooldown
+        last[key] = slot.ordinal
+
+    for slot, cand in placed:
+        assert cand.window.status_at(slot.dt)[0]
+        if slot.kind == "extra":
+            assert gate.allows(cand, slot.dt)
+
+
+def test_extra_slots_need_a_trigger(planner_config):
+    normal = _schedule(planner_config, "normal")[3]
+    event_push = _schedule(planner_config, "event_push")[3]
+
+    # normal mode requires a boosted campaign phase, and there are no campaigns
+    assert not [slot for slot, _ in normal if slot.kind == "extra"]
+    assert [slot for slot, _ in event_push if slot.kind == "extra"]
+
+
+def test_flow_offers_one_post_per_cooldown_block(planner_config):
+    pc = planner_config
+    slots, pickers, gate, _, _ = _schedule(pc, "event_push")
+
+    planned, finished = _flow_assignments(slots, pickers, pc, gate, deadline=float("inf"))
+
+    assert planned and finished
+    seen = set()
+    for i, cand in planned.items():
+        block = slots[i].ordinal // (pc.base_cooldown_days(slots[i].platform) + 1)
+        group = (cand.key_id, slots[i].platform, block)
+        assert group not in seen
+        seen.add(group)
+
+
+def test_min_cost_flow_finds_the_cheapest_assignment():
+    # 3 sources x 3 sinks, unit capacities; costs are negated scores
+    costs = [[-9, -7, -1], [-8, -2, -6], [-7, -6, -5]]
+    flow = _MinCostFlow()
+    source, sink = flow.add_node(), flow.add_node()
+    rows = [flow.add_node() for _ in costs]
+    cols = [flow.add_node() for _ in costs]
+    edges = {}
+    for r in rows:
+        flow.add_edge(source, r, 1, 0)
+    for i, row in enumerate(costs):
+        for j, cost in enumerate(row):
+            edges[(i, j)] = flow.add_edge(rows[i], cols[j], 1, cost)
+    for c in cols:
+        flow.add_edge(c, sink, 1, 0)
+
+    assert flow.solve(source, sink, deadline=float("inf")) == 3
+    chosen = sum(costs[i][j] for (i, j), e in edges.items() if flow.cap[e] == 0)
+    assert chosen == min(sum(costs[i][p[i]] for i in range(3)) for p in permutations(range(3)))
+
+
+def test_min_cost_flow_stops_when_no_path_improves_the_total():
+    flow = _MinCostFlow()
+    source, mid, sink = flow.add_node(), flow.add_node(), flow.add_node()
+    flow.add_edge(source, mid, 2, -5)
+    flow.add_edge(mid, sink, 1, 0)
+    flow.add_edge(mid, sink, 1, 7)  # positive total cost: not worth sending
+
+    assert flow.solve(source, sink, deadline=float("inf")) == 1
+
+
+def test_baseline_only_keeps_the_greedy_monday_picks(planner_config, monkeypatch):
+    golden = json.loads(GOLDEN.read_text())
+    # recorded in March, when Europe/London local time equals the old UTC slot times
+    now = datetime.fromisoformat(golden["now"])
+    monkeypatch.setattr(planner, "local_now", lambda tz_name: now.replace(tzinfo=ZoneInfo(tz_name)))
+    monkeypatch.setattr(planner, "get_approval_statuses", lambda draft_ids: {})
+
+    result = planner.run_planner(
+        items=golden["items"],
+        objectives=golden["objectives"],
+        planner_config=planner_config,
+        mode="baseline_only",
+        horizon_days=28,
+    )
+
+    plan = [[e.draft_id, e.platform, e.scheduled_datetime[:19]] for e in result.weekly_plan]
+    assert plan == golden["weekly_plan"]
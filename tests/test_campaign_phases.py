@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.services import planner
+from app.services.campaign_phases import build_campaign_calendar
+
+TZ = ZoneInfo("Europe/London")
+ANCHOR = date(2026, 6, 20)
+A = ANCHOR.toordinal()
+
+
+def test_phases_cover_the_days_between_their_offsets(planner_config):
+    major = planner_config.campaign_templates["major_event"]
+
+    # "pre" runs up to the day before "live", though its last listed offset is 2 days before
+    assert major.phases == (("pre", -21, -1), ("live", 0, 0), ("post", 1, 3))
+    assert dict(major.multipliers) == {"instagram": 1.2, "facebook": 1.1, "youtube": 1.0}
+
+
+def test_overlapping_campaigns_take_the_highest_multiplier(planner_config):
+    campaigns = [
+        {"id": "launch", "template": "youtube_release", "anchor_date": ANCHOR.isoformat(), "item_ids": ["a"]},
+        {"id": "festival", "template": "major_event", "anchor_date": ANCHOR.isoformat(), "item_ids": ["a", "b"]},
+    ]
+
+    calendar = build_campaign_calendar(campaigns, planner_config.campaign_templates, TZ, A - 30, A + 30)
+    instagram = calendar.boosts["a"]["instagram"]
+    youtube = calendar.boosts["a"]["youtube"]
+
+    assert instagram.breakdown(A) == {"id": "festival", "phase": "live", "multiplier": 1.2}
+    assert youtube.breakdown(A + 5) == {"id": "launch", "phase": "post", "multiplier": 1.25}
+    assert instagram.multiplier(A - 22) == 1.0 and instagram.multiplier(A + 8) == 1.0
+    # boost starts with festival's "pre", and drops to launch's 1.1 once festival ends
+    assert instagram.changes == (A - 21, A + 4, A + 8)
+    # festival's youtube multiplier is 1.0, so "b" gets no youtube boost
+    assert not calendar.boosts["b"]["youtube"].boosted(A)
+    assert calendar.stats["distinct_calendars"] == 2
+
+
+def test_calendar_is_clipped_to_the_horizon_and_skips_bad_campaigns(planner_config):
+    campaigns = [
+        {"id": "late", "template": "major_event", "anchor_date": date(2026, 9, 20).isoformat(), "item_ids": ["a"]},
+        {"id": "clipped", "template": "major_event", "anchor_date": ANCHOR.isoformat(), "item_ids": ["a"]},
+        {"id": "typo", "template": "major_evnt", "anchor_date": ANCHOR.isoformat(), "item_ids": ["a"]},
+        {"id": "undated", "template": "major_event", "item_ids": ["a"]},
+    ]
+
+    calendar = build_campaign_calendar(campaigns, planner_config.campaign_templates, TZ, A - 3, A + 1)
+
+    assert sorted(calendar.boosts["a"]["instagram"].days) == list(range(A - 3, A + 2))
+    assert calendar.stats["outside_horizon"] == 1
+    assert calendar.stats["skipped"] == [
+        {"id": "typo", "reason": "unknown_template"},
+        {"id": "undated", "reason": "invalid_anchor_date"},
+    ]
+
+
+@pytest.fixture
+def no_stored_approvals(monkeypatch):
+    monkeypatch.setattr(planner, "get_approval_statuses", lambda draft_ids: {})
+
+
+def test_campaign_scales_pass1_scores_and_reports_the_phase(planner_config, no_stored_approvals):
+    gig_day = datetime.now(TZ) + timedelta(days=7)
+    items = [{"id": "gig", "item_type": "event", "event_start": gig_day.isoformat()}]
+    campaign = {"id": "gig-push", "template": "major_event", "anchor_date": gig_day.date().isoformat(), "item_ids": ["gig"]}
+
+    plain = planner.run_planner(items=items, planner_config=planner_config)
+    boosted = planner.run_planner(items=items, campaigns=[campaign], planner_config=planner_config)
+
+    by_draft = {(c.platform, c.format): c for c in plain.draft_candidates}
+    checked = 0
+    for cand in boosted.draft_candidates:
+        if cand.platform != "instagram" or cand.suggested_schedule_datetime:
+            continue
+        assert cand.score == pytest.approx(by_draft[(cand.platform, cand.format)].score * 1.2)
+        assert cand.score_breakdown["campaign"] == {"id": "gig-push", "phase": "pre", "multiplier": 1.2}
+        checked += 1
+    assert checked
+    assert boosted.metadata["campaigns"]["active"] == 1
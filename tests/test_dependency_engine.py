@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pickle
+
+from app.models.planner import Item
+from app.services.dependency_engine import DependencyEngine
+
+RULES = [
+    {
+        "id": "any_platform_recap_needs_assets",
+        "when": {"item_type": "recap"},
+        "require": {"any": [{"field": "item.assets.photo_count", "gte": 1}, {"field": "item.assets.video_count", "gte": 1}]},
+        "on_fail": {"blocked": True, "message": "recap needs assets"},
+    },
+    {
+        "id": "patreon_event_needs_ticket",
+        "when": {"platform": "patreon", "item_type": "event"},
+        "require": {"all": [{"field": "item.links.eventbrite", "exists": True}]},
+        "on_fail": {"blocked": True, "message": "needs ticket link"},
+    },
+    {
+        "id": "youtube_longform_needs_video",
+        "when": {"platform": "youtube", "format": "longform_16x9"},
+        "require": {"all": [{"field": "item.assets.video_count", "gte": 1}]},
+        "on_fail": {"blocked": True, "message": "needs video"},
+    },
+    {
+        "id": "warning_only",
+        "when": {},
+        "require": {"all": [{"field": "item.series_id", "exists": True}]},
+        "on_fail": {"blocked": False, "message": "not gating"},
+    },
+]
+
+
+def test_rules_apply_by_platform_type_and_format_with_wildcards():
+    engine = DependencyEngine(RULES)
+    recap = Item(id="r", item_type="recap")
+    event = Item(id="e", item_type="event")
+    film = Item(id="f", item_type="film")
+
+    assert engine.evaluate(recap, "instagram", "feed_4x5") == (True, "recap needs assets")
+    assert engine.evaluate(recap, "patreon", "post") == (True, "recap needs assets")
+    assert engine.evaluate(event, "patreon", "post") == (True, "needs ticket link")
+    assert engine.evaluate(event, "instagram", "feed_4x5") == (False, None)
+    assert engine.evaluate(film, "youtube", "longform_16x9") == (True, "needs video")
+    assert engine.evaluate(film, "youtube", "shorts_9x16") == (False, None)
+
+
+def test_clauses_read_nested_fields():
+    engine = DependencyEngine(RULES)
+    ticketed = Item(id="e", item_type="event", links={"eventbrite": "https://example.org/t"})
+    with_photo = Item(id="r", item_type="recap", assets={"photo_count": 2})
+
+    assert engine.evaluate(ticketed, "patreon", "post") == (False, None)
+    assert engine.evaluate(with_photo, "instagram", "feed_4x5") == (False, None)
+
+
+def test_items_with_the_same_relevant_fields_share_one_evaluation():
+    engine = DependencyEngine(RULES)
+    # ids and audiences differ, but the recap rule only reads asset counts
+    for n in range(50):
+        engine.evaluate(Item(id=f"r{n}", item_type="recap", audiences=[f"a{n}"]), "instagram", "feed_4x5")
+    engine.evaluate(Item(id="x", item_type="recap", assets={"video_count": 1}), "instagram", "feed_4x5")
+
+    assert engine.evaluations == 2
+    assert engine.memo_hits == 49
+
+
+def test_engine_pickles_without_its_caches():
+    engine = DependencyEngine(RULES)
+    engine.evaluate(Item(id="r", item_type="recap"), "instagram", "feed_4x5")
+
+    copy = pickle.loads(pickle.dumps(engine))
+
+    assert copy.evaluations == 0
+    assert copy.evaluate(Item(id="r", item_type="recap"), "instagram", "feed_4x5") == (True, "recap needs assets")
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from app.models.planner import ExportJob
+from app.services import planner
+from app.services.export_planner import build_export_queue
+
+
+def _entry(draft_id: str, when: str) -> dict[str, str]:
+    return {"draft_id": draft_id, "platform": draft_id.split(":")[1], "scheduled_datetime": when}
+
+
+def test_feed_drafts_of_one_item_share_a_render(planner_config):
+    plan = [
+        _entry("gig:facebook:feed_4x5", "2026-03-09T19:00:00+00:00"),
+        _entry("gig:instagram:feed_4x5", "2026-03-09T18:00:00+00:00"),
+        _entry("gig:patreon:patron_update", "2026-03-10T10:00:00+00:00"),
+        _entry("gig:facebook:link_preview", "2026-03-12T18:00:00+00:00"),  # no render needed
+    ]
+
+    queue, stats = build_export_queue(plan, planner_config.export_renders)
+
+    [job] = [ExportJob.model_validate(j) for j in queue]
+    assert (job.job_id, job.item_id, job.media_type, job.ratio, job.resolution) == (
+        "gig/image_or_video/4:5/1080x1350",
+        "gig",
+        "image_or_video",
+        "4:5",
+        "1080x1350",
+    )
+    assert job.specs == ["fb_feed_4x5", "ig_feed_4x5", "patreon_post_4x5"]
+    assert [d.platform for d in job.destinations] == ["facebook", "instagram", "patreon"]
+    assert job.needed_by == "2026-03-09T18:00:00+00:00"
+    assert (stats["jobs"], stats["destinations"], stats["renders_saved"]) == (1, 3, 2)
+
+
+def test_distinct_renders_and_items_get_their_own_jobs(planner_config):
+    plan = [
+        _entry("film:youtube:longform_16x9", "2026-03-12T18:00:00+00:00"),
+        _entry("film:youtube:short_9x16", "2026-03-15T17:00:00+00:00"),
+        _entry("film:instagram:reel_9x16", "2026-03-16T18:00:00+00:00"),
+        _entry("other:instagram:reel_9x16", "2026-03-11T18:00:00+00:00"),
+    ]
+
+    queue, _ = build_export_queue(plan, planner_config.export_renders, batch_size=2)
+
+    assert [(j["job_id"], j["batch"]) for j in queue] == [
+        ("other/video/9:16/1080x1920", 0),
+        ("film/image/16:9/1280x720", 0),
+        ("film/video/16:9/1920x1080", 1),
+        ("film/video/9:16/1080x1920", 1),
+    ]
+    assert [d["format"] for d in queue[3]["destinations"]] == ["short_9x16", "reel_9x16"]
+
+
+def test_run_covers_every_scheduled_draft(planner_config, monkeypatch):
+    monkeypatch.setattr(planner, "get_approval_statuses", lambda draft_ids: {})
+    items = [{"id": f"post{n}", "item_type": ["news", "bts", "film"][n % 3]} for n in range(12)]
+
+    result = planner.run_planner(items=items, planner_config=planner_config)
+
+    exported = {d.draft_id for job in result.export_queue for d in job.destinations}
+    needing_renders = {
+        e.draft_id for e in result.weekly_plan if planner_config.export_renders.get(tuple(e.draft_id.split(":")[1:]))
+    }
+    assert needing_renders and exported == needing_renders
+    assert result.metadata["export"]["jobs"] == len(result.export_queue)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from app.services import pass1_pool, planner
+from app.services.batch_scoring import numpy_available
+from app.services.pass1_pool import shutdown_pool
+from app.services.planner_config import PlannerConfig
+from benchmarks.workload import WorkloadSpec, generate_workload
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # several chunks from a few hundred items
+    monkeypatch.setattr(planner, "PARALLEL_CHUNK_ITEMS", 100)
+    yield
+    shutdown_pool()
+
+
+@pytest.mark.parametrize(
+    "backend",
+    ["scalar", pytest.param("numpy", marks=pytest.mark.skipif(not numpy_available(), reason="numpy not installed"))],
+)
+def test_pool_chunks_produce_the_serial_plan(planner_config, small_chunks, backend):
+    workload = generate_workload(WorkloadSpec(n_items=350, seed=3), planner_config.columns)
+    statuses = workload.approvals
+
+    def run(parallel: bool):
+        return planner.run_planner(
+            items=workload.items,
+            objectives=workload.objectives,
+            planner_config=planner_config,
+            scoring_backend=backend,
+            approval_lookup=lambda ids: {d: statuses[d] for d in ids if d in statuses},
+            parallel=parallel,
+        )
+
+    serial, pooled = run(False), run(True)
+
+    assert pooled.metadata["parallel"]["chunks"] == 4
+    assert serial.metadata["parallel"] is None
+    assert pooled.model_dump(exclude={"metadata"}) == serial.model_dump(exclude={"metadata"})
+
+
+def test_config_change_keeps_the_old_pool_until_its_runs_finish(configs, monkeypatch):
+    monkeypatch.setattr(pass1_pool, "PARALLEL_WORKERS", 1)
+    old, new = (PlannerConfig.from_configs(configs, fingerprint=f) for f in ("old", "new"))
+    finished = []
+
+    # most chunks are still pending when the new config replaces the pool
+    slow = threading.Thread(target=lambda: finished.extend(pass1_pool.map_chunks(old, time.sleep, [(0.05,)] * 6)))
+    slow.start()
+    time.sleep(0.1)
+    try:
+        assert list(pass1_pool.map_chunks(new, abs, [(-1,), (-2,)])) == [1, 2]
+        slow.join(30)
+        assert finished == [None] * 6
+        assert list(pass1_pool._POOL_USERS.values()) == [0]
+    finally:
+        shutdown_pool()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from contextlib import contextmanager
+from datetime import date
+
+import psycopg
+import pytest
+
+from app.services import plan_store, planner
+
+ITEMS = [
+    {"id": "launch", "item_type": "film", "assets": {"video_count": 1}},
+    {"id": "notes", "item_type": "news"},
+    {"id": "behind", "item_type": "bts", "assets": {"photo_count": 3}},
+]
+
+
+@pytest.fixture(autouse=True)
+def no_stored_approvals(monkeypatch):
+    monkeypatch.setattr(planner, "get_approval_statuses", lambda draft_ids: {})
+
+
+@pytest.fixture
+def result(planner_config):
+    return planner.run_planner(items=ITEMS, planner_config=planner_config)
+
+
+class _CopyConn:
+    """Records the plans row, the statements run and the rows written to each COPY."""
+
+    def __init__(self) -> None:
+        self.plan_row: tuple | None = None
+        self.executed: list[tuple[str, tuple | None]] = []
+        self.copies: list[tuple[str, list[tuple]]] = []
+        self.committed = False
+        self.rolled_back = False
+
+    @property
+    def copied(self) -> dict[str, list[tuple]]:
+        tables: dict[str, list[tuple]] = {}
+        for table, rows in self.copies:
+            tables.setdefault(table, []).extend(rows)
+        return tables
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def execute(self, sql, params=None) -> None:
+        self.executed.append((sql, params))
+        if "INSERT INTO plans" in sql:
+            self.plan_row = params
+
+    @contextmanager
+    def copy(self, sql):
+        rows: list[tuple] = []
+        self.copies.append((sql.split()[1], rows))
+        yield type("Copy", (), {"write_row": staticmethod(rows.append)})
+
+    def commit(self) -> None:
+        self.committed = True
+
+    def rollback(self) -> None:
+        self.rolled_back = True
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = _CopyConn()
+    monkeypatch.setattr(plan_store, "DATABASE_URL", "postgresql://unused")
+    monkeypatch.setattr(plan_store, "get_conn", contextmanager(lambda: (yield conn)))
+    monkeypatch.setattr(plan_store, "ensure_plan_partitions", lambda plan_date: None)
+    return conn
+
+
+def test_disabled_store_is_reported(result, monkeypatch):
+    monkeypatch.setattr(plan_store, "PLANNER_PLAN_STORE", False)
+    monkeypatch.setattr(plan_store, "DATABASE_URL", "postgresql://unused")
+
+    plan_store.store_plan(result)
+
+    assert result.metadata["plan_store"] == {"enabled": False, "stored": False}
+
+
+def test_failed_write_keeps_the_plan(result, monkeypatch):
+    def fail(result, config_fingerprint=None):
+        raise psycopg.OperationalError("connection refused")
+
+    monkeypatch.setattr(plan_store, "DATABASE_URL", "postgresql://unused")
+    monkeypatch.setattr(plan_store, "save_plan", fail)
+
+    plan_store.store_plan(result)
+
+    assert result.metadata["plan_store"] == {"enabled": True, "stored": False}
+    assert result.weekly_plan
+
+
+def test_save_plan_copies_rows_in_plan_order(result, conn, monkeypatch):
+    partitions = []
+    monkeypatch.setattr(plan_store, "ensure_plan_partitions", partitions.append)
+    result.metadata["timings"] = {"total_ms": 1.0}
+
+    plan_id = plan_store.save_plan(result, "cfg")
+
+    assert conn.committed and result.metadata["plan_id"] == plan_id
+    assert [str(p) for p in partitions] == [result.metadata["plan_date"]]
+    stored_metadata = json.loads(conn.plan_row[-1])
+    assert stored_metadata["plan_id"] == plan_id and "timings" not in stored_metadata
+    assert conn.plan_row[6:9] == ("cfg", len(result.weekly_plan), len(result.draft_candidates))
+
+    weekly = conn.copied["plan_weekly_entries"]
+    assert [row[2:] for row in weekly] == [
+        (n, e.draft_id, e.platform, e.scheduled_datetime) for n, e in enumerate(result.weekly_plan)
+    ]
+    assert {row[:2] for rows in conn.copied.values() for row in rows} == {(plan_id, partitions[0])}
+    assert [row[3] for row in conn.copied["plan_export_jobs"]] == [j.job_id for j in result.export_queue]
+    assert len(conn.copied["plan_candidates"]) == len(result.draft_candidates)
+
+
+def _events(planner_config):
+    return planner.iter_planner_events(items=ITEMS, planner_config=planner_config)
+
+
+def test_streamed_plan_is_copied_in_batches_and_moved_on_commit(planner_config, result, conn, monkeypatch):
+    monkeypatch.setattr(plan_store, "PLAN_STORE_COPY_ROWS", 4)
+
+    events = list(plan_store.iter_and_store_plan(_events(planner_config), "cfg"))
+
+    metadata = events[-1][1]
+    assert metadata["plan_store"] == {"enabled": True, "stored": True}
+    assert conn.committed and conn.plan_row[0] == metadata["plan_id"]
+    assert conn.plan_row[7:9] == (len(result.weekly_plan), len(result.draft_candidates))
+    # never more than one batch in flight, each into its table's staging copy
+    assert all(0 < len(rows) <= 4 for _, rows in conn.copies)
+    assert [row[0] for row in conn.copied["plan_candidates_staged"]] == list(range(len(result.draft_candidates)))
+    assert [row[1:] for row in conn.copied["plan_weekly_entries_staged"]] == [
+        (e.draft_id, e.platform, e.scheduled_datetime) for e in result.weekly_plan
+    ]
+    moves = [params for sql, params in conn.executed if sql.startswith("INSERT INTO plan_")]
+    assert len(moves) == 4 and set(moves) == {(metadata["plan_id"], date.fromisoformat(metadata["plan_date"]))}
+
+
+def test_abandoned_stream_is_rolled_back(planner_config, conn):
+    events = plan_store.iter_and_store_plan(_events(planner_config))
+    for kind, _ in events:
+        if kind == "draft_candidate":
+            break
+    events.close()
+
+    assert conn.copies and conn.rolled_back and not conn.committed
+    assert conn.plan_row is None
+
+
+def test_trimmed_stream_is_not_stored(planner_config, conn):
+    events = list(plan_store.iter_and_store_plan(_events(planner_config), complete=False))
+
+    assert events[-1][1]["plan_store"] == {"enabled": True, "stored": False}
+    assert not conn.copies and not conn.executed
+
+
+@pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="needs a Postgres DATABASE_URL")
+def test_round_trip_through_postgres(result):
+    from app.core.db import ensure_tables
+
+    ensure_tables()
+    plan_id = plan_store.save_plan(result)
+
+    stored = asyncio.run(plan_store.load_plan_async(plan_id))
+
+    assert stored.model_dump(exclude={"metadata"}) == result.model_dump(exclude={"metadata"})
+    assert asyncio.run(plan_store.list_plans_async(1))[0]["plan_id"] == plan_id
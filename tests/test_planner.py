@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from app.models.planner import Item
+from app.services import planner
+
+ITEMS = [
+    Item(id="recap", item_type="recap"),  # no assets: blocked everywhere
+    Item(id="news", item_type="news"),
+    Item(id="bts", item_type="bts"),
+]
+
+
+def _run(monkeypatch, planner_config, approvals: dict[str, str]):
+    requested: list[str] = []
+
+    def fake_statuses(draft_ids):
+        requested.extend(draft_ids)
+        return {d: approvals[d] for d in requested if d in approvals}
+
+    monkeypatch.setattr(planner, "get_approval_statuses", fake_statuses)
+    return planner.run_planner(items=ITEMS, planner_config=planner_config), requested
+
+
+def test_approvals_are_fetched_for_unblocked_drafts_only(monkeypatch, planner_config):
+    result, requested = _run(monkeypatch, planner_config, {})
+
+    unblocked = {f"{c.item_id}:{c.platform}:{c.format}" for c in result.draft_candidates if not c.blocked}
+    assert unblocked and sorted(requested) == sorted(unblocked)
+    assert not any(d.startswith("recap:") for d in requested)
+
+
+def test_rejected_drafts_are_not_scheduled(monkeypatch, planner_config):
+    baseline, _ = _run(monkeypatch, planner_config, {})
+    first = baseline.weekly_plan[0].draft_id
+
+    result, _ = _run(monkeypatch, planner_config, {first: "rejected"})
+
+    assert first not in {e.draft_id for e in result.weekly_plan}
+
+
+def test_queue_carries_stored_status(monkeypatch, planner_config):
+    baseline, _ = _run(monkeypatch, planner_config, {})
+    first = baseline.weekly_plan[0].draft_id
+
+    result, _ = _run(monkeypatch, planner_config, {first: "approved"})
+
+    statuses = {e.draft_id: e.status for e in result.approval_queue}
+    assert statuses[first] == "approved"
+    assert set(statuses.values()) == {"approved", "proposed"}
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+from datetime import date
+
+from app.models.planner import PlannerResult
+from app.services import approvals_store
+from app.services.planner_cache import PlannerResultCache, get_planner_cache
+
+PAYLOAD = {"items": [{"id": "a", "item_type": "news"}], "campaigns": [], "objectives": []}
+DAY = date(2026, 3, 2)
+
+
+def test_stored_result_is_served_with_ttl(fake_redis):
+    cache = PlannerResultCache(fake_redis, ttl_seconds=120)
+    key = cache.make_key(PAYLOAD, "cfg", DAY)
+
+    assert cache.peek(key) is None
+    cache.store(key, PlannerResult(metadata={"run": 1}))
+
+    assert cache.peek(key).metadata == {"run": 1}
+    assert 0 < fake_redis.ttl(key) <= 120
+
+
+def test_key_depends_on_payload_config_and_day(fake_redis):
+    cache = PlannerResultCache(fake_redis)
+    key = cache.make_key(PAYLOAD, "cfg", DAY)
+
+    # dict order does not matter, content does
+    assert cache.make_key(dict(reversed(PAYLOAD.items())), "cfg", DAY) == key
+    assert cache.make_key({**PAYLOAD, "objectives": [{"id": "x"}]}, "cfg", DAY) != key
+    assert cache.make_key(PAYLOAD, "other", DAY) != key
+    assert cache.make_key(PAYLOAD, "cfg", date(2026, 3, 3)) != key
+
+
+def test_lock_has_one_holder_until_released(fake_redis):
+    cache = PlannerResultCache(fake_redis, lock_seconds=30)
+    key = cache.make_key(PAYLOAD, "cfg", DAY)
+
+    token = cache.acquire(key)
+    assert token and cache.acquire(key) is None
+    cache.release(key, "someone-else")
+    assert cache.acquire(key) is None
+
+    cache.release(key, token)
+    assert cache.acquire(key)
+
+
+def test_waiter_gets_the_leaders_result_without_a_thread(fake_redis):
+    cache = PlannerResultCache(fake_redis, poll_seconds=0.01)
+    key = cache.make_key(PAYLOAD, "cfg", DAY)
+    token = cache.acquire(key)
+
+    async def leader_and_waiters():
+        async def lead():
+            await asyncio.sleep(0.1)
+            cache.store(key, PlannerResult(metadata={"by": "leader"}))
+            cache.release(key, token)
+
+        # many waiters share the loop's thread while the leader computes
+        return await asyncio.gather(lead(), *(cache.wait(key) for _ in range(20)))
+
+    _, *waited = asyncio.run(leader_and_waiters())
+
+    assert all(result.metadata == {"by": "leader"} for result in waited)
+
+
+def test_waiter_gives_up_when_the_leader_dies(fake_redis):
+    cache = PlannerResultCache(fake_redis, poll_seconds=0.01, wait_seconds=5)
+    key = cache.make_key(PAYLOAD, "cfg", DAY)
+    # a leader that died after taking the lock; its lock expires shortly
+    fake_redis.set(f"{key}:lock", "dead", px=50)
+
+    assert asyncio.run(cache.wait(key)) is None
+
+
+def test_waiter_stops_after_wait_seconds(fake_redis):
+    cache = PlannerResultCache(fake_redis, poll_seconds=0.01, wait_seconds=0.05)
+    key = cache.make_key(PAYLOAD, "cfg", DAY)
+    cache.acquire(key)
+
+    assert asyncio.run(cache.wait(key)) is None
+
+
+class _FakeConn:
+    def __init__(self) -> None:
+        self.executed: list[str] = []
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def execute(self, sql, params=None) -> None:
+        self.executed.append(sql)
+
+    def executemany(self, sql, rows) -> None:
+        self.executed.append(sql)
+
+    def commit(self) -> None:
+        pass
+
+
+def test_approval_write_invalidates_cached_plans(fake_redis, monkeypatch):
+    conn = _FakeConn()
+    monkeypatch.setattr(approvals_store, "get_conn", contextmanager(lambda: (yield conn)))
+    cache = get_planner_cache()
+    cache.store(cache.make_key(PAYLOAD, "cfg", DAY), PlannerResult(metadata={"run": 1}))
+
+    approvals_store.set_approval("a:instagram:feed_4x5", "rejected")
+
+    assert conn.executed
+    assert cache.peek(cache.make_key(PAYLOAD, "cfg", DAY)) is None
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+import redis
+
+from app.services import planner, planner_jobs
+from app.services.planner_jobs import claim_jobs, enqueue_job, ensure_group, get_job, process_job, queue_metrics
+from worker import main as worker_main
+
+
+@pytest.fixture(autouse=True)
+def no_stored_approvals(monkeypatch):
+    monkeypatch.setattr(planner, "get_approval_statuses", lambda draft_ids: {})
+
+
+def _work_one(client) -> str:
+    [(entry_id, job_id)] = claim_jobs(client, "worker-1", block_ms=10)
+    return process_job(client, entry_id, job_id)
+
+
+def test_job_runs_once_and_stores_its_result(fake_redis):
+    ensure_group(fake_redis)
+    job_id = enqueue_job(fake_redis, {"items": [{"id": "a", "item_type": "news"}]})
+    assert get_job(fake_redis, job_id)["status"] == "queued"
+
+    assert _work_one(fake_redis) == "done"
+
+    job = get_job(fake_redis, job_id)
+    assert job["status"] == "done" and job["attempts"] == 1
+    assert [c["item_id"] for c in job["result"]["draft_candidates"]][:1] == ["a"]
+    assert claim_jobs(fake_redis, "worker-1", block_ms=10) == []
+    metrics = queue_metrics(fake_redis)
+    assert (metrics["completed"], metrics["queue_depth"], metrics["in_flight"]) == (1, 0, 0)
+
+
+def test_invalid_payload_fails_without_retries(fake_redis):
+    ensure_group(fake_redis)
+    job_id = enqueue_job(fake_redis, {"items": [{"id": "a"}]})  # no item_type
+
+    assert _work_one(fake_redis) == "failed"
+
+    job = get_job(fake_redis, job_id)
+    assert job["attempts"] == 1 and "item_type" in job["error"]
+    metrics = queue_metrics(fake_redis)
+    assert (metrics["failed"], metrics["retried"], metrics["queue_depth"]) == (1, 0, 0)
+
+
+def test_failing_job_is_requeued_until_its_attempts_run_out(fake_redis, monkeypatch):
+    monkeypatch.setattr(planner_jobs, "PLANNER_JOB_MAX_ATTEMPTS", 2)
+
+    def unavailable(**kwargs):
+        raise ConnectionError("approvals database unavailable")
+
+    monkeypatch.setattr(planner_jobs, "run_planner", unavailable)
+    ensure_group(fake_redis)
+    job_id = enqueue_job(fake_redis, {"items": [{"id": "a", "item_type": "news"}]})
+
+    assert _work_one(fake_redis) == "queued"
+    assert _work_one(fake_redis) == "failed"
+
+    job = get_job(fake_redis, job_id)
+    assert job["attempts"] == 2 and "unavailable" in job["error"]
+    metrics = queue_metrics(fake_redis)
+    assert (metrics["failed"], metrics["retried"], metrics["queue_depth"]) == (1, 1, 0)
+
+
+def test_redelivered_finished_job_is_only_acked(fake_redis):
+    ensure_group(fake_redis)
+    job_id = enqueue_job(fake_redis, {})
+    [(entry_id, _)] = claim_jobs(fake_redis, "worker-1", block_ms=10)
+    process_job(fake_redis, entry_id, job_id)
+    finished_at = get_job(fake_redis, job_id)["finished_at_ms"]
+
+    assert process_job(fake_redis, entry_id, job_id) == "done"
+    assert get_job(fake_redis, job_id)["finished_at_ms"] == finished_at
+
+
+def test_unknown_job_is_none(fake_redis):
+    assert get_job(fake_redis, "nope") is None
+
+
+def _consume_until_done(client, monkeypatch, claim):
+    """Run the worker loop with ``claim`` in place of claim_jobs until one job has run."""
+    stop = threading.Event()
+    statuses = []
+
+    def process_and_stop(*args):
+        statuses.append(process_job(*args))
+        stop.set()
+        return statuses[-1]
+
+    monkeypatch.setattr(worker_main, "WORKER_ERROR_BACKOFF_SECONDS", 0.001)
+    monkeypatch.setattr(worker_main, "claim_jobs", claim)
+    monkeypatch.setattr(worker_main, "process_job", process_and_stop)
+    consumer = threading.Thread(target=worker_main.consume, args=("worker-1", stop))
+    consumer.start()
+    consumer.join(10)
+    stop.set()
+    return statuses
+
+
+def test_worker_keeps_consuming_after_errors(fake_redis, monkeypatch):
+    ensure_group(fake_redis)
+    job_id = enqueue_job(fake_redis, {"items": [{"id": "a", "item_type": "news"}]})
+    failures = [redis.ConnectionError("connection reset"), RuntimeError("bug")]
+
+    def flaky_claim(*args, **kwargs):
+        if failures:
+            raise failures.pop(0)
+        return claim_jobs(*args, **kwargs)
+
+    assert _consume_until_done(fake_redis, monkeypatch, flaky_claim) == ["done"]
+    assert get_job(fake_redis, job_id)["status"] == "done"
+
+
+def test_worker_recreates_a_lost_consumer_group(fake_redis, monkeypatch):
+    # Redis restarted empty: jobs enqueued since then have a stream but no group
+    job_id = enqueue_job(fake_redis, {"items": [{"id": "a", "item_type": "news"}]})
+
+    assert _consume_until_done(fake_redis, monkeypatch, claim_jobs) == ["done"]
+    assert get_job(fake_redis, job_id)["status"] == "done"
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.routes import planner as planner_routes
+from app.models.planner import PlannerResult
+from app.services.planner_executor import PlannerExecutor
+
+PAYLOAD = {"items": [{"id": "a", "item_type": "news"}]}
+
+
+@pytest.fixture
+def executor():
+    # one worker and no queue: a second run admitted to the executor gets a 429
+    return PlannerExecutor(1, 0, 5)
+
+
+@pytest.fixture
+def app(monkeypatch, executor):
+    monkeypatch.setattr(planner_routes, "get_planner_executor", lambda: executor)
+    monkeypatch.setattr(planner_routes, "threadsafe_approval_lookup", lambda loop: lambda draft_ids: {})
+    app = FastAPI()
+    app.include_router(planner_routes.router)
+    return app
+
+
+def _post_concurrently(app, n, url="/planner/run"):
+    async def post_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post(url, json=PAYLOAD) for _ in range(n)))
+
+    return asyncio.run(post_all())
+
+
+def test_identical_requests_wait_for_one_run_outside_the_executor(app, fake_redis, monkeypatch):
+    runs = []
+
+    def slow_run(client, **kwargs):
+        runs.append(kwargs["items"])
+        time.sleep(0.3)
+        return PlannerResult(metadata={"run": len(runs)})
+
+    monkeypatch.setattr(planner_routes, "run_and_store", slow_run)
+
+    responses = _post_concurrently(app, 3)
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    bodies = [r.json()["metadata"] for r in responses]
+    assert len(runs) == 1 and all(body["run"] == 1 for body in bodies)
+    assert sorted(body["result_cache"]["hit"] for body in bodies) == [False, True, True]
+    assert not [k for k in fake_redis.keys() if k.endswith(b":lock")]
+
+
+def test_stream_gives_its_slot_back_when_it_ends(app, executor, planner_config, monkeypatch):
+    monkeypatch.setattr(planner_routes, "get_planner_config", lambda configs, fingerprint: planner_config)
+
+    [response] = _post_concurrently(app, 1, "/planner/run?stream=true")
+
+    assert response.status_code == 200
+    assert response.text.splitlines()[-1].startswith('{"type":"metadata"')
+    assert executor.hold()  # the slot is free again
+
+
+def test_stream_is_refused_while_the_executor_is_full(app, executor):
+    executor.hold()
+
+    [response] = _post_concurrently(app, 1, "/planner/run?stream=true")
+
+    assert response.status_code == 429 and response.headers["retry-after"]
+
+
+def test_stream_slot_is_released_if_the_response_cannot_be_built(app, executor, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(planner_routes, "_HeldStreamingResponse", broken)
+
+    with pytest.raises(RuntimeError):
+        _post_concurrently(app, 1, "/planner/run?stream=true")
+
+    assert executor.hold()
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.services import planner, replanner
+from app.services.planner_config import PlannerConfig
+
+OBJECTIVES = [{"id": "event_attendance", "weight": 6}, {"id": "community_engagement", "weight": 4}]
+STORED_APPROVALS = {"item3:instagram:reel_9x16": "rejected", "item8:facebook:feed_4x5": "approved"}
+
+
+def _items() -> list[dict[str, Any]]:
+    now = datetime.now(ZoneInfo("Europe/London")).replace(minute=0, second=0, microsecond=0)
+    items = []
+    for n in range(40):
+        item: dict[str, Any] = {
+            "id": f"item{n}",
+            "item_type": ["event", "news", "bts", "event_promotion", "recap"][n % 5],
+            "assets": {"photo_count": n % 2},
+        }
+        if n % 3:
+            item["event_start"] = (now + timedelta(days=(n * 5) % 40, hours=n % 7)).isoformat()
+        if n % 8 == 0:
+            item["series_id"] = "monthly-meetup"
+        items.append(item)
+    return items
+
+
+def _lookup(statuses: dict[str, str]):
+    return lambda draft_ids: {d: statuses[d] for d in draft_ids if d in statuses}
+
+
+@pytest.fixture(autouse=True)
+def stored_approvals(monkeypatch):
+    monkeypatch.setattr(replanner, "get_approval_statuses", _lookup(STORED_APPROVALS))
+
+
+def _store(client, planner_config, mode, items=None):
+    return replanner.run_and_store(
+        client,
+        items=items or _items(),
+        campaigns=[],
+        objectives=OBJECTIVES,
+        planner_config=planner_config,
+        mode=mode,
+        approval_lookup=_lookup(STORED_APPROVALS),
+    )
+
+
+def _plan(result) -> dict[str, Any]:
+    return result.model_dump(exclude={"metadata"})
+
+
+@pytest.mark.parametrize("mode", ["baseline_only", "normal", "event_push"])
+def test_empty_delta_reuses_everything(fake_redis, planner_config, mode):
+    base = _store(fake_redis, planner_config, mode)
+
+    same = replanner.replan(fake_redis, base.metadata["plan_id"], planner_config=planner_config)
+
+    assert _plan(same) == _plan(base)
+    assert same.metadata["reuse"]["candidates"]["recomputed"] == 0
+    assert same.metadata["replan"]["parent_plan_id"] == base.metadata["plan_id"]
+    assert same.metadata["plan_id"] != base.metadata["plan_id"]
+
+
+@pytest.mark.parametrize("mode", ["baseline_only", "normal", "event_push"])
+@pytest.mark.parametrize("delta", ["reject_late_draft", "reject_early_draft", "raise_push_level", "remove_item"])
+def test_replan_equals_a_fresh_run(fake_redis, planner_config, mode, delta):
+    items = _items()
+    base = _store(fake_redis, planner_config, mode, items)
+    approvals = dict(STORED_APPROVALS)
+    kwargs: dict[str, Any] = {}
+    if delta == "reject_late_draft":
+        kwargs["approvals"] = {base.weekly_plan[-1].draft_id: "rejected"}
+    elif delta == "reject_early_draft":
+        kwargs["approvals"] = {base.weekly_plan[0].draft_id: "rejected"}
+    elif delta == "raise_push_level":
+        changed = {**items[4], "push_level": "max"}
+        kwargs["upsert_items"] = [changed]
+        items = [changed if it["id"] == changed["id"] else it for it in items]
+    else:
+        gone = base.weekly_plan[2].draft_id.split(":", 1)[0]
+        kwargs["remove_item_ids"] = [gone]
+        items = [it for it in items if it["id"] != gone]
+    approvals.update(kwargs.get("approvals", {}))
+
+    replanned = replanner.replan(fake_redis, base.metadata["plan_id"], planner_config=planner_config, **kwargs)
+    fresh = planner.run_planner(
+        items=items,
+        objectives=OBJECTIVES,
+        planner_config=planner_config,
+        mode=mode,
+        approval_lookup=_lookup(approvals),
+    )
+
+    assert _plan(replanned) == _plan(fresh)
+    assert replanned.metadata["reuse"]["candidates"]["reused"] > 0
+    if mode != "baseline_only":
+        # the flow re-plans every slot; only pass 1 is reused
+        assert replanned.metadata["reuse"]["slots"]["reused_slots"] == 0
+
+
+def test_new_items_are_scored_and_looked_up(fake_redis, planner_config, monkeypatch):
+    base = _store(fake_redis, planner_config, "baseline_only")
+    queries: list[list[str]] = []
+    monkeypatch.setattr(replanner, "get_approval_statuses", lambda ids: queries.append(ids) or {})
+
+    replanned = replanner.replan(
+        fake_redis,
+        base.metadata["plan_id"],
+        planner_config=planner_config,
+        upsert_items=[{"id": "late-addition", "item_type": "news"}],
+    )
+
+    [looked_up] = queries
+    assert any(d.startswith("late-addition:") for d in looked_up)
+    assert set(STORED_APPROVALS) <= set(looked_up)
+    assert replanned.metadata["replan"]["items"] == {"upserted": 1, "removed": 0, "dirty": 1}
+
+
+@pytest.mark.parametrize("mode", ["baseline_only", "normal"])
+def test_decisions_stored_since_the_plan_are_honoured(fake_redis, planner_config, monkeypatch, mode):
+    items = _items()
+    base = _store(fake_redis, planner_config, mode, items)
+    # decided through /approvals after the plan was stored, not passed to replan
+    now_stored = {**STORED_APPROVALS, base.weekly_plan[0].draft_id: "rejected", "item3:instagram:reel_9x16": "approved"}
+    monkeypatch.setattr(replanner, "get_approval_statuses", _lookup(now_stored))
+
+    replanned = replanner.replan(fake_redis, base.metadata["plan_id"], planner_config=planner_config)
+    fresh = planner.run_planner(
+        items=items, objectives=OBJECTIVES, planner_config=planner_config, mode=mode, approval_lookup=_lookup(now_stored)
+    )
+
+    assert base.weekly_plan[0].draft_id not in {e.draft_id for e in replanned.weekly_plan}
+    assert _plan(replanned) == _plan(fresh)
+    assert replanned.metadata["replan"]["approvals_changed"] == 2
+
+
+def test_plan_from_another_config_is_recomputed(fake_redis, planner_config, configs):
+    base = _store(fake_redis, planner_config, "normal")
+    other = PlannerConfig.from_configs(configs, fingerprint="another-config")
+
+    replanned = replanner.replan(fake_redis, base.metadata["plan_id"], planner_config=other)
+
+    assert replanned.metadata["replan"]["full_recompute_reason"] == "config_changed"
+    assert replanned.metadata["reuse"]["candidates"]["reused"] == 0
+
+
+def test_unknown_plan(fake_redis, planner_config):
+    with pytest.raises(LookupError):
+        replanner.replan(fake_redis, "missing", planner_config=planner_config)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+
+from app.core.serialization import ENCODINGS, MIN_COMPRESS_BYTES, PlannerJSONResponse, dumps, negotiate_encoding
+from app.models.planner import DraftCandidate, PlannerResult, WeeklyPlanEntry
+from app.services import planner
+
+
+def test_dumps_matches_model_dump_json_on_edge_values():
+    result = PlannerResult(
+        draft_candidates=[
+            DraftCandidate(
+                item_id="café-night ☕",
+                platform="instagram",
+                format="reel_9x16",
+                score=0.1 + 0.2,
+                score_breakdown={"nested": {"list": [1, 2.5, None, True]}, "quote": 'say "hi"\n'},
+                dependency_warnings=["needs\tphoto"],
+            ),
+            DraftCandidate(item_id="x", platform="facebook", format="feed_4x5", blocked=True, block_reason="rejected"),
+        ],
+        weekly_plan=[WeeklyPlanEntry(draft_id="x:facebook:feed_4x5", platform="facebook", scheduled_datetime="2026-03-29T01:30:00+00:00")],
+        metadata={"empty": {}, "big": 2**53 + 1, "negative_zero": -0.0},
+    )
+
+    assert dumps(result) == result.model_dump_json().encode()
+
+
+def test_numpy_scores_encode_as_plain_numbers():
+    np = pytest.importorskip("numpy")
+    cand = DraftCandidate.model_construct(item_id="a", platform="youtube", format="short_9x16", score=np.float64(12.75))
+
+    assert json.loads(dumps(cand))["score"] == 12.75
+
+
+def test_planner_run_round_trips(planner_config, monkeypatch):
+    monkeypatch.setattr(planner, "get_approval_statuses", lambda draft_ids: {})
+    items = [
+        {"id": "launch", "item_type": "film", "audiences": ["local_liverpool"], "assets": {"video_count": 1}},
+        {"id": "notes", "item_type": "news"},
+    ]
+    result = planner.run_planner(items=items, planner_config=planner_config)
+
+    assert result.weekly_plan and result.export_queue
+    assert dumps(result) == result.model_dump_json().encode()
+    assert PlannerResult.model_validate_json(dumps(result)) == PlannerResult.model_validate_json(result.model_dump_json())
+
+
+def test_large_bodies_are_compressed_small_ones_are_not():
+    big = PlannerResult(metadata={"padding": "x" * MIN_COMPRESS_BYTES})
+    small = PlannerResult()
+
+    response = PlannerJSONResponse(big, "gzip")
+    plain = PlannerJSONResponse(small, "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert json.loads(gzip.decompress(response.body)) == big.model_dump(mode="json")
+    assert "content-encoding" not in plain.headers
+    assert plain.body == small.model_dump_json().encode()
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("GZIP ; q=0.5", "gzip"),
+        ("gzip;q=0", None),
+        ("gzip;q=bogus", None),
+        ("*", ENCODINGS[0]),
+        ("*;q=0, gzip", "gzip"),
+        ("gzip, zstd", ENCODINGS[0]),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.models.planner import Item
+from app.services.planner_config import PlannerConfig
+from app.services.slot_calendar import build_slots, calendar_cache_stats, slot_calendar, to_local
+from app.services.slot_engine import EligibilityWindow, PlatformSlotPicker, build_slot_candidate
+
+TZ = ZoneInfo("Europe/London")
+# clocks go forward at 01:00 on Sunday 29 March 2026
+BEFORE_DST = datetime(2026, 3, 23, 9, 0, tzinfo=TZ)
+
+
+def test_slots_keep_their_wall_clock_time_across_dst(planner_config):
+    slots = build_slots(planner_config, BEFORE_DST, 14, "baseline_only")
+    instagram = [s for s in slots if s.platform == "instagram"]
+
+    assert [s.dt.strftime("%Y-%m-%d %H:%M") for s in instagram] == [
+        "2026-03-23 18:00",
+        "2026-03-30 18:00",
+        "2026-04-06 18:00",
+    ]
+    assert [s.dt.utcoffset() for s in instagram] == [timedelta(0), timedelta(hours=1), timedelta(hours=1)]
+    # a week apart on the calendar even though only 6 days 23 hours elapse
+    assert instagram[1].ordinal - instagram[0].ordinal == 7
+    elapsed = instagram[1].dt.astimezone(timezone.utc) - instagram[0].dt.astimezone(timezone.utc)
+    assert elapsed == timedelta(days=6, hours=23)
+
+
+def test_wall_time_skipped_by_dst_moves_past_the_gap():
+    spec = (("instagram", 6, 1, 30, "regular", None),)  # Sundays 01:30
+
+    [slot] = slot_calendar("Europe/London", date(2026, 3, 29).toordinal(), 0, spec)
+
+    assert (slot.dt.hour, slot.dt.minute, slot.dt.utcoffset()) == (2, 30, timedelta(hours=1))
+
+
+def test_calendars_are_shared_between_runs_from_the_same_day(planner_config):
+    first = build_slots(planner_config, BEFORE_DST, 28, "normal")
+    hits = calendar_cache_stats()["hits"]
+
+    again = build_slots(planner_config, BEFORE_DST.replace(hour=22), 28, "normal")
+
+    assert again is first
+    assert calendar_cache_stats()["hits"] == hits + 1
+
+
+def test_naive_datetimes_are_local_wall_time():
+    summer = to_local(datetime(2026, 7, 1, 18, 0), TZ)
+
+    assert summer.hour == 18 and summer.utcoffset() == timedelta(hours=1)
+
+
+def test_weekly_post_clears_a_six_day_cooldown_across_dst(configs):
+    settings = {**configs["planner_settings_v1"], "cooldowns": {"instagram": 6}}
+    pc = PlannerConfig.from_configs({**configs, "planner_settings_v1": settings})
+    item = Item(id="weekly", item_type="news")
+    rules = pc.eligibility_rules_for("news")
+    window = EligibilityWindow.for_item(item, rules, TZ)
+    cand = build_slot_candidate(0, item, "instagram", "feed_4x5", rules, window, (1.0, 0.0, 0.0, 0.0, 0.0), None)
+    picker = PlatformSlotPicker("instagram", pc, [cand])
+
+    mondays = [s for s in build_slots(pc, BEFORE_DST, 14, "baseline_only") if s.platform == "instagram"]
+
+    assert [picker.pick(s.dt) is cand for s in mondays] == [True, True, True]
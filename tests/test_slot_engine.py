@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from app.models.planner import Item
+from app.services.planner_config import PlannerConfig
+from app.services.slot_calendar import local_ordinal
+from app.services.slot_engine import EligibilityWindow, PlatformSlotPicker, ScheduleLedger, build_slot_candidate
+
+TZ = ZoneInfo("Europe/London")
+START = datetime(2026, 3, 2, 18, 0, tzinfo=TZ)  # a Monday
+
+
+def _config(configs: dict[str, Any], cooldown_days: int) -> PlannerConfig:
+    settings = dict(configs["planner_settings_v1"])
+    settings["cooldowns"] = {"instagram": cooldown_days}
+    return PlannerConfig.from_configs({**configs, "planner_settings_v1": settings})
+
+
+def _picker(pc: PlannerConfig, scored_items: list[tuple[Item, float]]) -> PlatformSlotPicker:
+    candidates = []
+    for idx, (item, points) in enumerate(scored_items):
+        rules = pc.eligibility_rules_for(item.item_type)
+        window = EligibilityWindow.for_item(item, rules, TZ)
+        event_ordinal = local_ordinal(item.event_start, TZ) if item.event_start else None
+        candidates.append(
+            build_slot_candidate(idx, item, "instagram", "feed_4x5", rules, window, (points, 0.0, 0.0, 0.0, 0.0), event_ordinal)
+        )
+    return PlatformSlotPicker("instagram", pc, candidates)
+
+
+def _run(picker: PlatformSlotPicker, every_days: int, count: int) -> list[str | None]:
+    picks = []
+    for n in range(count):
+        cand = picker.pick(START + timedelta(days=n * every_days))
+        picks.append(cand.item.id if cand else None)
+    return picks
+
+
+def test_urgency_step_reorders_picks_without_rescoring_every_slot(configs):
+    steady = Item(id="steady", item_type="news")
+    # 20 days out: urgency 6 + 6 = 12 < steady's 3 + 10, until 14 days out lifts it to 18
+    event = Item(id="event", item_type="news", event_start=START + timedelta(days=20, hours=2))
+    picker = _picker(_config(configs, 1), [(steady, 10.0), (event, 6.0)])
+
+    picks = _run(picker, every_days=2, count=14)
+
+    assert picks == ["steady"] * 3 + ["event"] * 8 + ["steady"] * 3
+    assert picker.rescored < len(picks)
+
+
+def test_series_cooldown_holds_every_series_member(configs):
+    first = Item(id="first", item_type="news", series_id="s")
+    second = Item(id="second", item_type="news", series_id="s")
+    fillers = [Item(id=f"filler{n}", item_type="news") for n in (1, 2, 3)]
+    picker = _picker(_config(configs, 3), [(first, 20.0), (second, 19.0), *zip(fillers, (3.0, 2.0, 1.0))])
+
+    picks = _run(picker, every_days=1, count=8)
+
+    # "s" may post again once more than 3 days have passed; "second" never outranks "first"
+    assert picks == ["first", "filler1", "filler2", "filler3"] * 2
+
+
+def test_max_posts_counts_posts_already_scheduled(configs):
+    promo = Item(id="promo", item_type="event_promotion", event_start=START + timedelta(days=30))
+    filler = Item(id="filler", item_type="news")
+    picker = _picker(_config(configs, 1), [(promo, 20.0), (filler, 0.0)])
+
+    picks = _run(picker, every_days=2, count=8)
+
+    # event_promotion allows 2 posts per platform in its window
+    assert picks[:2] == ["promo", "promo"]
+    assert "promo" not in picks[2:]
+
+
+def test_window_intervals_follow_the_eligibility_rules(planner_config):
+    event_dt = START + timedelta(days=20)
+    recap = Item(id="recap", item_type="event_recap", event_start=event_dt)
+    reminder = Item(id="reminder", item_type="event_reminder", event_start=event_dt)
+    recap_window = EligibilityWindow.for_item(recap, planner_config.eligibility_rules_for("event_recap"), TZ)
+    reminder_window = EligibilityWindow.for_item(reminder, planner_config.eligibility_rules_for("event_reminder"), TZ)
+
+    # event_recap: no pre-event lower bound, then 1 to 10 days after the event, bounds included
+    assert recap_window.status_at(START) == (True, None)
+    assert recap_window.status_at(event_dt + timedelta(hours=12)) == (False, event_dt + timedelta(days=1))
+    assert recap_window.status_at(event_dt + timedelta(days=10)) == (True, None)
+    assert recap_window.status_at(event_dt + timedelta(days=10, microseconds=1)) == (False, None)
+    # event_reminder: from 7 days before the event until it starts
+    assert reminder_window.status_at(START) == (False, event_dt - timedelta(days=7))
+    assert reminder_window.status_at(event_dt) == (True, None)
+    assert reminder_window.status_at(event_dt + timedelta(microseconds=1)) == (False, None)
+    undated = Item(id="n", item_type="news")
+    assert EligibilityWindow.for_item(undated, planner_config.eligibility_rules_for("news"), TZ).status_at(START) == (True, None)
+
+
+def test_ledger_counts_inclusive_bounds_regardless_of_insert_order():
+    ledger = ScheduleLedger()
+    for days in (9, 1, 5, 3):
+        ledger.add("a", "instagram", START + timedelta(days=days))
+    ledger.add("a", "facebook", START)
+
+    assert ledger.count("a", "instagram", START + timedelta(days=3), START + timedelta(days=9)) == 3
+    assert ledger.count("a", "instagram", None, START + timedelta(days=4)) == 2
+    assert ledger.count("a", "instagram", None, None) == 4
+    assert ledger.count("a", "facebook", START, START) == 1
+    assert ledger.count("b", "instagram", None, None) == 0
+
+
+def test_max_posts_ignores_posts_outside_the_count_window(configs):
+    event_dt = START + timedelta(days=14, hours=1)
+    reminder = Item(id="reminder", item_type="event_reminder", event_start=event_dt)
+    filler = Item(id="filler", item_type="news")
+    picker = _picker(_config(configs, 1), [(reminder, 20.0), (filler, 0.0)])
+    # one post a month earlier, before the reminder's 7-day window opens
+    picker.ledger.add("reminder", "instagram", START - timedelta(days=30))
+
+    picks = _run(picker, every_days=2, count=8)
+
+    # event_reminder allows 1 post, which the earlier one does not use up
+    assert picks.count("reminder") == 1
+    assert picks[4] == "reminder"  # first slot 7 or fewer days before the event
@@ -1,13 +1,77 @@
 import os
-import time
+import signal
+import socket
+import threading
+import traceback
+
+import redis
+
+from app.core.redis_client import get_redis, set_redis
+from app.services.pass1_pool import shutdown_pool
+from app.services.planner_jobs import claim_jobs, ensure_group, process_job
+
+WORKER_CONCURRENCY = int(os.getenv("PLANNER_WORKER_CONCURRENCY", "2"))
+# pause after a failed poll, doubled per consecutive failure up to the max
+WORKER_ERROR_BACKOFF_SECONDS = float(os.getenv("PLANNER_WORKER_ERROR_BACKOFF_SECONDS", "1"))
+WORKER_ERROR_BACKOFF_MAX_SECONDS = float(os.getenv("PLANNER_WORKER_ERROR_BACKOFF_MAX_SECONDS", "30"))
+
+
+def consume(consumer: str, stop: threading.Event) -> None:
+    """Claim and run jobs until ``stop`` is set.
+
+    Errors (Redis unreachable, or a bug outside a job's own error handling) are
+    logged and retried with backoff rather than ending the thread; a job left
+    pending is re-claimed once its visibility timeout passes.
+    """
+    client = get_redis()
+    backoff = WORKER_ERROR_BACKOFF_SECONDS
+    while not stop.is_set():
+        try:
+            for entry_id, job_id in claim_jobs(client, consumer, count=1, block_ms=2000):
+                status = process_job(client, entry_id, job_id, consumer)
+                print(f"[worker] {consumer} job={job_id} status={status}")
+        except redis.RedisError as exc:
+            print(f"[worker] {consumer} redis error: {exc!r}; retrying in {backoff:g}s")
+            if "NOGROUP" in str(exc):
+                # Redis restarted without its data: the stream and group are gone
+                try:
+                    ensure_group(client)
+                except redis.RedisError:
+                    pass
+        except Exception:  # noqa: BLE001 - keep consuming; the traceback is logged
+            print(f"[worker] {consumer} unexpected error; retrying in {backoff:g}s")
+            traceback.print_exc()
+        else:
+            backoff = WORKER_ERROR_BACKOFF_SECONDS
+            continue
+        stop.wait(backoff)
+        backoff = min(backoff * 2, WORKER_ERROR_BACKOFF_MAX_SECONDS)
 
 
 def main() -> None:
     redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
-    print(f"[worker] started with REDIS_URL={redis_url}")
-    print("[worker] placeholder loop running; no jobs are processed yet.")
-    while True:
-        time.sleep(30)
+    client = get_redis()
+    if client is None:
+        client = redis.Redis.from_url(redis_url)
+        set_redis(client)
+    ensure_group(client)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    base = f"{socket.gethostname()}-{os.getpid()}"
+    threads = [
+        threading.Thread(target=consume, args=(f"{base}-{i}", stop), daemon=True)
+        for i in range(WORKER_CONCURRENCY)
+    ]
+    print(f"[worker] started with REDIS_URL={redis_url} concurrency={WORKER_CONCURRENCY}")
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    shutdown_pool()
+    print("[worker] stopped")
 
 
 if __name__ == "__main__":